@@ -0,0 +1,281 @@
+import numpy as np
+from probes import ProbeType, ProbeIndex, calculate_base_output
+
+# Small integer codes for each ProbeType, used in the probe tables
+TYPE_CODES = {probe_type: code for code, probe_type in enumerate(ProbeType)}
+
+MINING = TYPE_CODES[ProbeType.MINING]
+RESEARCH = TYPE_CODES[ProbeType.RESEARCH]
+STORAGE = TYPE_CODES[ProbeType.STORAGE]
+BOOSTER = TYPE_CODES[ProbeType.BOOSTER]
+DUPLICATOR = TYPE_CODES[ProbeType.DUPLICATOR]
+LOCKED = TYPE_CODES[ProbeType.LOCKED]
+
+# Counts kept about each slot's neighbours: the types a duplicator copies and the boosters of each gen
+NEIGHBOUR_FIELDS = [
+    (ProbeType.MINING, None),
+    (ProbeType.RESEARCH, None),
+    (ProbeType.STORAGE, None),
+    (ProbeType.BOOSTER, 1),
+    (ProbeType.BOOSTER, 2)
+]
+NEIGHBOUR_BITS = 4      # Fewest bits per count, maps where a slot has more neighbours get wider fields
+
+class BatchEvaluator:
+    # Scores many loadouts at once with NumPy array operations.
+    #
+    # A batch of loadouts is an integer array of shape (batch, n_slots). Each entry is a probe id,
+    # which is an index into self.probes (every probe in FrontierNav.probes, in order). Slots are in
+    # the same order as FrontierNav.slot_table (self.keys holds their "Region_nodeid" names).
+    #
+    # Every stage of ProbeSlot.calculate_output is applied to the whole batch in the same order
+    # of floating point operations, so the totals match FrontierNav.calculate_total exactly.
+    #
+    # On NODE_DATA this scores about 40-45k random loadouts a second on one core, short of 10^5 and
+    # more. Most of the time goes to the link groups, labelled one map depth at a time, and to
+    # memory traffic over the (slot, loadout) arrays. Per-entry work (duplicator copies, boosters and
+    # duplicator link boosts) is only done for the few entries that need it.
+    def __init__(self, frontier_nav, chunk_size=256):
+        graph = frontier_nav.graph
+        self._build(frontier_nav.probe_index, frontier_nav.probes["locked"][0], frontier_nav.slot_keys,
+                    graph.offsets, graph.targets, [slot.node for slot in frontier_nav.slot_table], chunk_size)
+
+    @classmethod
+    def from_snapshot(cls, snapshot, chunk_size=256):
+        # The same evaluator built straight from a GameDataSnapshot's arrays (see snapshot.py), without
+        # making the Node, ProbeSlot and FrontierNav objects of the whole map
+        probes = snapshot.get_probes()
+        templates, template_ids = snapshot.get_node_templates()
+        evaluator = cls.__new__(cls)
+        evaluator._build(ProbeIndex(probes), probes["locked"][0], snapshot.get_slot_keys(),
+                         snapshot.sections["graph_offsets"], snapshot.sections["graph_targets"],
+                         [templates[i] for i in template_ids], chunk_size)
+        return evaluator
+
+    def _build(self, probe_index, locked_probe, slot_keys, offsets, targets, nodes, chunk_size):
+        # nodes holds the Node of each slot, only what a probe's output depends on is read from them
+        self.chunk_size = chunk_size    # Loadouts scored per set of array operations, limits memory use
+
+        self.probes = list(probe_index.probes)
+        self.probe_ids = {probe.name: probe_id for probe_id, probe in enumerate(self.probes)}
+        self.locked_id = probe_index.get_id(locked_probe)
+
+        # Only arrays, names and the Probe objects are kept, not the slots themselves, so an evaluator
+        # is small enough to send to other processes (see sweep.py)
+        self.keys = list(slot_keys)
+        n_slots = len(self.keys)
+
+        # Neighbours of each slot in connection order, padded with n_slots which points at an
+        # extra always-locked slot added to every loadout
+        offsets = list(offsets)
+        targets = list(targets)
+        adjacent = [targets[offsets[i]:offsets[i + 1]] for i in range(n_slots)]
+        max_degree = max((len(neighbours) for neighbours in adjacent), default=0) or 1
+        self.neighbours = np.full((n_slots, max_degree), n_slots, dtype=np.intp)
+        for i, neighbours in enumerate(adjacent):
+            self.neighbours[i, :len(neighbours)] = neighbours
+        self.has_neighbour = self.neighbours < n_slots
+
+        # Slots grouped by their breadth-first depth in each connected part of the map, with their parents.
+        # When the map has no cycles, link groups can be labelled one depth at a time from the roots down.
+        depths = {}
+        parents = {}
+        for root in range(n_slots):
+            if root in depths:
+                continue
+            depths[root] = 0
+            queue = [root]
+            for i in queue:
+                for j in adjacent[i]:
+                    if j not in depths:
+                        depths[j] = depths[i] + 1
+                        parents[j] = i
+                        queue.append(j)
+
+        levels = [[] for depth in range(max(depths.values(), default=0) + 1)]
+        for i in range(n_slots):
+            levels[depths[i]].append(i)
+        self.roots = np.array(levels[0], dtype=np.intp)
+        self.link_levels = [(np.array(level, dtype=np.intp), np.array([parents[i] for i in level], dtype=np.intp))
+                            for level in levels[1:]]
+
+        edges = sum(len(neighbours) for neighbours in adjacent) // 2
+        self.is_forest = edges == n_slots - len(self.roots)
+
+        # Probe tables
+        self.probe_types = np.array([TYPE_CODES[probe.probe_type] for probe in self.probes], dtype=np.intp)
+        self.probe_costs = np.array([probe.cost for probe in self.probes], dtype=np.int64)
+
+        # What each probe adds to a neighbour's counts, packed into one integer so a single sum over
+        # the neighbours gives all five counts. Each field is wide enough to count every neighbour of
+        # the best connected slot, so one count can never carry into the next.
+        self.neighbour_bits = max(NEIGHBOUR_BITS, max_degree.bit_length())
+        if self.neighbour_bits * len(NEIGHBOUR_FIELDS) >= np.iinfo(np.intp).bits:
+            raise ValueError(f"A slot with {max_degree} neighbours is too many for BatchEvaluator")
+        self.neighbour_codes = np.zeros(len(self.probes), dtype=np.intp)
+        for probe_id, probe in enumerate(self.probes):
+            for field, (probe_type, gen) in enumerate(NEIGHBOUR_FIELDS):
+                if probe.probe_type == probe_type and (gen is None or probe.gen == gen):
+                    self.neighbour_codes[probe_id] = 1 << (field * self.neighbour_bits)
+
+        # Nodes with the same signature get the same output from every probe (see Node.signature),
+        # so outputs are only calculated once for each signature
+        signature_nodes = {}
+        for node in nodes:
+            signature_nodes.setdefault(node.signature, node)
+        signature_ids = {signature: i for i, signature in enumerate(signature_nodes)}
+        node_signatures = np.array([signature_ids[node.signature] for node in nodes], dtype=np.intp)
+        signature_nodes = list(signature_nodes.values())
+
+        # Base output of every probe at every node, flattened so that entry probe_id * (n_slots + 1) + slot
+        # is the probe installed at that slot. Duplicators are added up from their neighbours later.
+        signature_output = np.zeros((3, len(self.probes), len(signature_nodes)))
+        for probe_id, probe in enumerate(self.probes):
+            if probe.probe_type == ProbeType.DUPLICATOR:
+                continue
+            for i, node in enumerate(signature_nodes):
+                miranium, credits, storage, prec_resources = calculate_base_output(node, probe)
+                signature_output[:, probe_id, i] = (miranium, credits, storage)
+        self.base_output = np.zeros((3, len(self.probes), n_slots + 1))
+        self.base_output[:, :, :n_slots] = signature_output[:, :, node_signatures]
+        self.base_output = self.base_output.reshape(3, -1)
+
+        # Precious resources that a Mining Probe can find at each node
+        self.resources = sorted({resource for node in signature_nodes for resource in (node.prec_resources or [])})
+        resource_index = {resource: i for i, resource in enumerate(self.resources)}
+        signature_resources = np.zeros((len(signature_nodes), len(self.resources)))
+        for i, node in enumerate(signature_nodes):
+            for resource in node.prec_resources or []:
+                signature_resources[i, resource_index[resource]] = 1
+        self.node_resources = signature_resources[node_signatures]
+
+    def encode(self, setup):
+        # Turns a saved probe setup ({"Region_nodeid": probe name}) into a row of probe ids,
+        # slots that are missing or have an unknown probe are locked
+        row = np.full(len(self.keys), self.locked_id, dtype=np.intp)
+        for i, key in enumerate(self.keys):
+            if key in setup:
+                row[i] = self.probe_ids.get(setup[key], self.locked_id)
+        return row
+
+    def decode(self, row):
+        return {key: self.probes[probe_id].name for key, probe_id in zip(self.keys, row)}
+
+    def evaluate(self, loadouts):
+        # Returns a dict of arrays with one entry per loadout, in the same units as calculate_total.
+        # "possible resources" is a (batch, len(self.resources)) boolean array.
+        loadouts = np.asarray(loadouts, dtype=np.intp)
+        if loadouts.size == 0:
+            # An empty list is no loadouts, not one loadout with no slots
+            loadouts = loadouts.reshape(0, len(self.keys))
+        elif loadouts.ndim == 1:
+            loadouts = loadouts[np.newaxis, :]
+
+        results = [self._evaluate_chunk(loadouts[start:start + self.chunk_size])
+                   for start in range(0, len(loadouts), self.chunk_size)]
+        if not results:
+            results = [self._evaluate_chunk(np.empty((0, len(self.keys)), dtype=np.intp))]
+
+        return {name: np.concatenate([result[name] for result in results]) for name in results[0]}
+
+    def _evaluate_chunk(self, ids):
+        # Works on (slot, loadout) arrays so each slot's values across the batch sit together in memory
+        batch, n_slots = ids.shape
+        ids = np.concatenate([ids.T, np.full((1, batch), self.locked_id, dtype=np.intp)])
+        own_ids = ids[:n_slots]
+        types = self.probe_types[own_ids]
+        is_mining = types == MINING
+        is_research = types == RESEARCH
+        is_storage = types == STORAGE
+        is_duplicator = types == DUPLICATOR
+        # Probes of every slot's neighbours as one (slot, neighbour, loadout) array
+        neighbour_ids = ids[self.neighbours]
+
+        counts = self.neighbour_codes[neighbour_ids].sum(axis=1)
+        mask = (1 << self.neighbour_bits) - 1
+        mining_copies, research_copies, storage_copies, boosters_g1, boosters_g2 = [
+            (counts >> (field * self.neighbour_bits)) & mask for field in range(len(NEIGHBOUR_FIELDS))]
+
+        # Base output, a duplicator adds up its neighbours' probes as if they were installed at its own node.
+        # Storage is always 3000 per Storage Probe, so it comes straight from the counts.
+        # Only the (slot, loadout) entries holding a duplicator gather their neighbours, which are added
+        # up one at a time in connection order like the single slot calculation does.
+        node_index = np.arange(n_slots)[:, np.newaxis]
+        own_index = own_ids * (n_slots + 1) + node_index
+        duplicator_slots, duplicator_loadouts = np.nonzero(is_duplicator)
+        adj_index = ids[self.neighbours[duplicator_slots], duplicator_loadouts[:, np.newaxis]] * (n_slots + 1) + duplicator_slots[:, np.newaxis]
+        output = []
+        for axis in range(2):
+            values = self.base_output[axis].take(own_index)
+            if len(duplicator_slots):
+                duplicated = self.base_output[axis].take(adj_index)
+                total = duplicated[:, 0]
+                for k in range(1, duplicated.shape[1]):
+                    total = total + duplicated[:, k]
+                values[duplicator_slots, duplicator_loadouts] = total
+            output.append(values)
+        output.append(np.where(is_duplicator, storage_copies * 3000, is_storage * 3000).astype(float))
+
+        # Booster effect, applied once per adjacent booster (and once per copied type for a duplicator).
+        # G2 boosters double the output, which is exact in floating point. A G1 booster adds half, and
+        # multiplying by 1.5 ** steps at once would round differently from adding half steps times
+        # (and so sometimes truncate to a different total), so the G1 steps are still repeated, but only
+        # for the few entries next to a G1 booster.
+        has_booster = (boosters_g1 + boosters_g2).ravel() > 0
+        for axis, (is_type, copied) in enumerate(((is_mining, mining_copies), (is_research, research_copies), (is_storage, storage_copies))):
+            copies = np.where(is_duplicator, copied, is_type).ravel()
+            boosted = np.flatnonzero(has_booster & (copies > 0))
+            if len(boosted):
+                steps = boosters_g1.ravel()[boosted] * copies[boosted]
+                values = output[axis].ravel()[boosted]
+                for step in range(int(steps.max())):
+                    values = np.where(steps > step, values + values * 0.5, values)
+                output[axis].ravel()[boosted] = np.ldexp(values, boosters_g2.ravel()[boosted] * copies[boosted])
+
+        # Link multipliers, from the size of each slot's group of connected identical probes
+        links = self._count_links(ids, batch, n_slots)
+        link_multiplier = np.select([links >= 8, links >= 5, links >= 3], [1.8, 1.5, 1.3], 1.0)
+        # Each duplicator passes its own link multiplier to its neighbours, which keep the largest
+        dupe_multiplier = np.ones((n_slots + 1, batch))
+        if len(duplicator_slots):
+            np.maximum.at(dupe_multiplier, (self.neighbours[duplicator_slots], duplicator_loadouts[:, np.newaxis]),
+                          link_multiplier[duplicator_slots, duplicator_loadouts][:, np.newaxis])
+        dupe_multiplier = dupe_multiplier[:n_slots]
+
+        totals = []
+        for axis, is_type in enumerate((is_mining, is_research, is_storage)):
+            values = np.where(is_type, output[axis] * link_multiplier * dupe_multiplier, output[axis])
+            totals.append(np.trunc(values).astype(np.int64).sum(axis=0))
+
+        return {
+            "total miranium": totals[0],
+            "total credits": totals[1],
+            "total storage": totals[2] + 6000,
+            "total cost": self.probe_costs[own_ids].sum(axis=0),
+            "possible resources": (is_mining.T.astype(float) @ self.node_resources) > 0
+        }
+
+    def _count_links(self, ids, batch, n_slots):
+        # Labels every slot with a slot from its link group, then counts the slots with each label
+        labels = np.empty((n_slots, batch), dtype=np.intp)
+        labels[self.roots] = self.roots[:, np.newaxis]
+        for level, parents in self.link_levels:
+            labels[level] = np.where(ids[level] == ids[parents], labels[parents], level[:, np.newaxis])
+
+        if not self.is_forest:
+            # With cycles, labels are joined by repeatedly taking the lowest label among linked
+            # neighbours and jumping to the label's own label until nothing changes
+            same_probe = (ids[self.neighbours] == ids[:n_slots, np.newaxis]) & self.has_neighbour[:, :, np.newaxis]
+            no_label = np.full((1, batch), n_slots)
+            batch_index = np.arange(batch)
+            while True:
+                padded_labels = np.concatenate([labels, no_label])
+                new_labels = np.minimum(labels, np.where(same_probe, padded_labels[self.neighbours], n_slots).min(axis=1))
+                new_labels = new_labels[new_labels, batch_index]
+                if np.array_equal(new_labels, labels):
+                    break
+                labels = new_labels
+
+        groups = labels * batch + np.arange(batch)
+        counts = np.bincount(groups.ravel(), minlength=n_slots * batch)
+        return counts[groups]
@@ -0,0 +1,466 @@
+import argparse
+import atexit
+import gc
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from data import NODE_DATA
+from mapgen import make_node_data, random_loadout
+from frontiernav import FrontierNav
+from probes import ProbeType
+
+# Benchmarks for the calculation engine.
+#
+#   python benchmark.py                      Runs every case and compares it with the stored baseline
+#   python benchmark.py --quick              Skips the largest synthetic maps
+#   python benchmark.py --sizes 1000000      Runs the synthetic cases on a million node map
+#   python benchmark.py --save-baseline      Runs every case and stores the results as the new baseline
+#   python benchmark.py --only sweep_scaling --workers 1 2 4 8
+#                                            Only measures how LoadoutSweep speeds up with more processes
+#
+# Results are written as JSON (benchmarks/latest.json by default). A case regresses when its
+# median time is more than --threshold (50% by default) or its peak memory more than
+# --memory-threshold (25%) above the baseline, in which case the exit code is 1. Each case's time
+# is compared relative to a fixed pure Python loop timed just before and after it (the
+# calibration), so a baseline saved on a faster or less busy machine doesn't flag every case, and
+# a slowdown has to be more than NOISE_SECONDS to count. Cases that look slower are measured again
+# (up to RECHECK_TRIES times) and only reported when they stay slower. Even so, cases on a shared
+# machine can come out 0.5x to 1.4x their baseline from one run to the next, so a tighter
+# --threshold (ex. 0.1) is only worth using on a quiet one. The exit code is also 1 when a fresh
+# interpreter takes longer than STARTUP_BUDGET_SECONDS to import the core and score one loadout,
+# or when doing so loads tkinter.
+#
+# The sweep scaling measurement (sweep.py's LoadoutSweep with 1, 2, 4, ... worker processes) is
+# reported with the speedup over one worker and the number of cores, but never counts as a regression.
+
+BENCHMARK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks")
+BASELINE_FILE = os.path.join(BENCHMARK_DIR, "baseline.json")
+LATEST_FILE = os.path.join(BENCHMARK_DIR, "latest.json")
+LOADOUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "probe_loadouts")
+
+SYNTHETIC_SIZES = [1000, 10000, 100000]
+QUICK_SYNTHETIC_SIZES = [1000, 10000]
+
+SWEEP_LOADOUTS = 100000     # Loadouts scored by each worker count in the sweep scaling measurement
+
+CALIBRATION_REPEAT = 5
+CALIBRATION_LOOPS = 50000
+RECHECK_TRIES = 2           # Times a case that looks like a regression is measured again before it's reported
+NOISE_SECONDS = 0.0005      # Slowdowns smaller than this are never regressions, they're within the jitter of the small cases
+
+STARTUP_BUDGET_SECONDS = 0.1
+STARTUP_REPEAT = 5
+GUI_MODULES = ["tkinter", "window"]
+
+# Run in a fresh interpreter: imports the calculation core, scores one saved loadout and
+# reports how long that took and which GUI modules ended up loaded
+STARTUP_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from data import NODE_DATA
+from frontiernav import FrontierNav
+frontier_nav = FrontierNav(FrontierNav.load_game_data(NODE_DATA))
+with open(sys.argv[1]) as f:
+    frontier_nav.apply_loadout(json.load(f))
+frontier_nav.calculate_total()
+seconds = time.perf_counter() - start
+print(json.dumps({"seconds": seconds, "gui_modules": [name for name in %r if name in sys.modules]}))
+""" % (GUI_MODULES,)
+
+
+def measure(function, repeat):
+    # Returns the time of each run and the peak memory of one extra run, which is traced separately
+    # because tracemalloc slows everything down
+    times = []
+    for i in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    function()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "repeat": repeat,
+        "min_seconds": min(times),
+        "median_seconds": statistics.median(times),
+        "peak_memory_bytes": peak
+    }
+
+
+def calibration_loop():
+    # Dictionary lookups, float arithmetic and function calls like the engine's, but none of its code,
+    # so its time only changes with the machine
+    table = {}
+    total = 0.0
+    for i in range(CALIBRATION_LOOPS):
+        key = i & 1023
+        table[key] = table.get(key, 0) + i * 0.5
+        total += abs(table[key] % 7)
+    return total
+
+
+def measure_calibration(repeat=CALIBRATION_REPEAT):
+    # Median time of the calibration loop
+    times = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        calibration_loop()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def measure_case(case, args, repeat):
+    # Times a case along with the calibration around it, since how fast a shared machine runs
+    # can change from one minute to the next
+    run = case(*args)
+    before = measure_calibration()
+    result = measure(run, repeat)
+    result["calibration_seconds"] = (before + measure_calibration()) / 2
+    return result
+
+
+# Each case returns a function to time, made ready so only the work being measured is timed
+
+def case_load_game_data(node_data):
+    return lambda: FrontierNav.load_game_data(node_data)
+
+def case_calculate_total(node_data, setup):
+    frontier_nav = FrontierNav(FrontierNav.load_game_data(node_data), incremental=False)
+    frontier_nav.apply_loadout(setup)
+    return frontier_nav.calculate_total
+
+def case_apply_loadout(node_data, setup):
+    # A full loadout load as the GUI does it, from a fresh map to the new totals
+    def run():
+        frontier_nav = FrontierNav(FrontierNav.load_game_data(node_data))
+        frontier_nav.apply_loadout(setup)
+        frontier_nav.calculate_total()
+    return run
+
+def case_random_loadouts(node_data, count, seed=0):
+    # Applies a series of random loadouts to one map, recalculating after each
+    frontier_nav = FrontierNav(FrontierNav.load_game_data(node_data))
+    rng = random.Random(seed)
+    setups = [random_loadout(frontier_nav, rng) for i in range(count)]
+    def run():
+        for setup in setups:
+            frontier_nav.apply_loadout(setup)
+            frontier_nav.calculate_total()
+    return run
+
+def case_random_changes(node_data, count, seed=0):
+    # Single random probe changes with a recalculation after each, the pattern the optimizer uses
+    frontier_nav = FrontierNav(FrontierNav.load_game_data(node_data))
+    frontier_nav.apply_loadout(random_loadout(frontier_nav, random.Random(seed)))
+    frontier_nav.calculate_total()
+    probes = frontier_nav.probe_index.probes
+    rng = random.Random(seed + 1)
+    changes = [(rng.choice(frontier_nav.slot_table), rng.choice(probes)) for i in range(count)]
+    def run():
+        for slot, probe in changes:
+            slot.install_probe(probe)
+            frontier_nav.calculate_total()
+    return run
+
+def case_duplicator_heavy(node_data, seed=0):
+    # Full recalculations without the output cache of a random loadout that's about 60% duplicators,
+    # so every run copies each duplicator's neighbours again
+    frontier_nav = FrontierNav(FrontierNav.load_game_data(node_data), incremental=False, output_cache_size=0)
+    duplicator = frontier_nav.probe_index.find_type(ProbeType.DUPLICATOR)
+    others = [probe for probe in frontier_nav.probe_index.probes
+              if probe.probe_type in (ProbeType.MINING, ProbeType.RESEARCH, ProbeType.BOOSTER, ProbeType.STORAGE)]
+    frontier_nav.apply_loadout(random_loadout(frontier_nav, random.Random(seed), [duplicator] * (len(others) * 3 // 2) + others))
+    return frontier_nav.calculate_total
+
+def case_write_report(node_data, output_format):
+    # Streams a report of every node to os.devnull
+    from report import write_report
+    frontier_nav = FrontierNav(FrontierNav.load_game_data(node_data))
+    return lambda: write_report(frontier_nav, os.devnull, output_format)
+
+def case_batch_evaluate(node_data, count, seed=0):
+    from batch import BatchEvaluator
+    import numpy as np
+    evaluator = BatchEvaluator(FrontierNav(FrontierNav.load_game_data(node_data)))
+    rows = np.random.default_rng(seed).integers(0, len(evaluator.probes), size=(count, len(evaluator.keys)))
+    return lambda: evaluator.evaluate(rows)
+
+def case_start_evaluator(node_data, from_snapshot):
+    # What an evaluate worker does when it starts (see cli._start_worker): builds a BatchEvaluator
+    # from the map data, or straight from a snapshot file's arrays
+    from batch import BatchEvaluator
+    from snapshot import GameDataSnapshot, write_snapshot
+    if not from_snapshot:
+        return lambda: BatchEvaluator(FrontierNav(FrontierNav.load_game_data(node_data)))
+    handle, file_name = tempfile.mkstemp(suffix=".snapshot")
+    os.close(handle)
+    atexit.register(os.remove, file_name)
+    write_snapshot(FrontierNav.load_game_data(node_data), file_name)
+    return lambda: BatchEvaluator.from_snapshot(GameDataSnapshot(file_name))
+
+
+def has_numpy():
+    try:
+        import numpy
+    except ImportError:
+        return False
+    return True
+
+
+def get_cases(quick=False, sizes=None, seed=0):
+    # Returns (name, case function, arguments, repeat) for every benchmark.
+    # sizes replaces the synthetic map sizes, seed picks other synthetic maps (see mapgen.py)
+    with open(os.path.join(LOADOUT_DIR, "all_mining_g10.json")) as f:
+        all_mining_g10 = json.load(f)
+    with open(os.path.join(LOADOUT_DIR, "jaheds_layout.json")) as f:
+        jaheds_layout = json.load(f)
+
+    cases = [
+        ("load_game_data/NODE_DATA", case_load_game_data, (NODE_DATA,), 20),
+        ("calculate_total/all_mining_g10", case_calculate_total, (NODE_DATA, all_mining_g10), 50),
+        ("calculate_total/jaheds_layout", case_calculate_total, (NODE_DATA, jaheds_layout), 50),
+        ("apply_loadout/jaheds_layout", case_apply_loadout, (NODE_DATA, jaheds_layout), 20),
+        ("random_loadouts/NODE_DATA/100", case_random_loadouts, (NODE_DATA, 100), 3),
+        ("random_changes/NODE_DATA/1000", case_random_changes, (NODE_DATA, 1000), 3),
+        ("duplicator_heavy/NODE_DATA", case_duplicator_heavy, (NODE_DATA,), 50)
+    ]
+
+    if sizes is None:
+        sizes = QUICK_SYNTHETIC_SIZES if quick else SYNTHETIC_SIZES
+    maps = [("NODE_DATA", NODE_DATA, 20)]
+    for size in sizes:
+        node_data = make_node_data(size, seed)
+        map_name = f"synthetic_{size}" if seed == 0 else f"synthetic_{size}_seed{seed}"
+        repeat = 5 if size < 100000 else 1
+        cases.append((f"load_game_data/{map_name}", case_load_game_data, (node_data,), repeat))
+        cases.append((f"calculate_total/{map_name}", case_calculate_total,
+                      (node_data, random_loadout(FrontierNav(FrontierNav.load_game_data(node_data)), random.Random(size + seed))), repeat))
+        cases.append((f"random_changes/{map_name}/1000", case_random_changes, (node_data, 1000, seed), repeat))
+        cases.append((f"duplicator_heavy/{map_name}", case_duplicator_heavy, (node_data, seed), repeat))
+        cases.append((f"write_report/{map_name}", case_write_report, (node_data, "text"), repeat))
+        maps.append((map_name, node_data, repeat))
+
+    if has_numpy():
+        cases.append(("batch_evaluate/NODE_DATA/10000", case_batch_evaluate, (NODE_DATA, 10000), 3))
+        for map_name, node_data, repeat in maps:
+            cases.append((f"start_evaluator/{map_name}/data", case_start_evaluator, (node_data, False), repeat))
+            cases.append((f"start_evaluator/{map_name}/snapshot", case_start_evaluator, (node_data, True), repeat))
+    else:
+        print("Skipping batch benchmarks, numpy is not installed", file=sys.stderr)
+
+    return cases
+
+
+def measure_startup(repeat=STARTUP_REPEAT):
+    # Times importing the core and scoring jaheds_layout.json in fresh interpreters, both inside
+    # the process and from launching it (which includes Python's own startup)
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    seconds = []
+    wall_seconds = []
+    gui_modules = set()
+    for i in range(repeat):
+        start = time.perf_counter()
+        output = subprocess.run([sys.executable, "-c", STARTUP_SCRIPT, os.path.join(LOADOUT_DIR, "jaheds_layout.json")],
+                                cwd=script_dir, capture_output=True, text=True, check=True).stdout
+        wall_seconds.append(time.perf_counter() - start)
+        result = json.loads(output)
+        seconds.append(result["seconds"])
+        gui_modules.update(result["gui_modules"])
+
+    return {
+        "repeat": repeat,
+        "min_seconds": min(seconds),
+        "median_seconds": statistics.median(seconds),
+        "min_wall_seconds": min(wall_seconds),
+        "budget_seconds": STARTUP_BUDGET_SECONDS,
+        "gui_modules": sorted(gui_modules)
+    }
+
+
+def get_worker_counts():
+    # 1, 2, 4, ... up to the number of cores (and always 2, so the multi-process path is measured
+    # even on a single core, where it can only be slower)
+    cpu_count = os.cpu_count() or 1
+    counts = [1, 2]
+    while counts[-1] * 2 <= cpu_count:
+        counts.append(counts[-1] * 2)
+    if cpu_count > counts[-1]:
+        counts.append(cpu_count)
+    return counts
+
+def measure_sweep_scaling(worker_counts=None, count=SWEEP_LOADOUTS, repeat=3, seed=0):
+    # Times LoadoutSweep.evaluate on the same random NODE_DATA loadouts with each number of worker
+    # processes, and reports the speedup over one worker. The worker pool is started before timing.
+    from sweep import LoadoutSweep
+    import numpy as np
+    frontier_nav = FrontierNav(FrontierNav.load_game_data(NODE_DATA))
+    worker_counts = worker_counts or get_worker_counts()
+
+    rows = None
+    results = {}
+    for workers in worker_counts:
+        with LoadoutSweep(frontier_nav, workers) as sweep:
+            if rows is None:
+                rows = np.random.default_rng(seed).integers(0, len(sweep.evaluator.probes), size=(count, len(sweep.evaluator.keys)))
+            sweep.evaluate(rows[:sweep.batch_size * workers * 2])
+            times = []
+            for i in range(repeat):
+                start = time.perf_counter()
+                sweep.evaluate(rows)
+                times.append(time.perf_counter() - start)
+        results[str(workers)] = {"min_seconds": min(times), "loadouts_per_second": count / min(times)}
+
+    for result in results.values():
+        result["speedup"] = results[str(worker_counts[0])]["min_seconds"] / result["min_seconds"]
+    return {"cpu_count": os.cpu_count(), "loadouts": count, "workers": results}
+
+
+def run_benchmarks(quick=False, only=None, sizes=None, seed=0, worker_counts=None):
+    results = {}
+    for name, case, args, repeat in get_cases(quick, sizes, seed):
+        if only and only not in name:
+            continue
+        print(f"{name} ...", end=" ", flush=True, file=sys.stderr)
+        results[name] = measure_case(case, args, repeat)
+        print(f"{results[name]['median_seconds'] * 1000:.2f} ms", file=sys.stderr)
+
+    startup = None
+    if not only or only in "startup":
+        print("startup ...", end=" ", flush=True, file=sys.stderr)
+        startup = measure_startup()
+        print(f"{startup['median_seconds'] * 1000:.2f} ms ({startup['min_wall_seconds'] * 1000:.2f} ms with interpreter start)", file=sys.stderr)
+
+    sweep_scaling = None
+    if (not only or only in "sweep_scaling") and has_numpy():
+        print("sweep_scaling ...", end=" ", flush=True, file=sys.stderr)
+        sweep_scaling = measure_sweep_scaling(worker_counts)
+        print(", ".join(f"{workers} workers {result['speedup']:.2f}x" for workers, result in sweep_scaling["workers"].items()) +
+              f" ({sweep_scaling['cpu_count']} cores)", file=sys.stderr)
+
+    return {
+        "python": sys.version.split()[0],
+        "platform": sys.platform,
+        "results": results,
+        "startup": startup,
+        "sweep_scaling": sweep_scaling
+    }
+
+
+def check_startup(report):
+    # Returns a list of problems with the startup measurement
+    startup = report.get("startup")
+    if not startup:
+        return []
+    problems = []
+    if startup["min_seconds"] > startup["budget_seconds"]:
+        problems.append(f"importing the core and scoring one loadout took {startup['min_seconds'] * 1000:.1f} ms, "
+                        f"over the {startup['budget_seconds'] * 1000:.0f} ms budget")
+    if startup["gui_modules"]:
+        problems.append(f"importing the core loaded GUI modules: {', '.join(startup['gui_modules'])}")
+    return problems
+
+
+def get_speed_ratio(result, old):
+    # How much slower the machine ran a case than when the baseline was saved, from the calibrations
+    # around it (1 for baselines saved without them)
+    if not old.get("calibration_seconds") or not result.get("calibration_seconds"):
+        return 1
+    return result["calibration_seconds"] / old["calibration_seconds"]
+
+
+def compare_with_baseline(report, baseline, threshold=0.5, memory_threshold=0.25):
+    # Returns a list of (case, measurement, baseline value, new value) for every regression.
+    # Baseline times are scaled by the speed ratio first, memory is compared as it is.
+    # Medians are compared because on a busy machine the best of a few runs is often a lucky one
+    regressions = []
+    for name, result in report["results"].items():
+        if name not in baseline["results"]:
+            continue
+        old = baseline["results"][name]
+        for measurement, scale, allowed, noise in (("median_seconds", get_speed_ratio(result, old), threshold, NOISE_SECONDS),
+                                                   ("peak_memory_bytes", 1, memory_threshold, 0)):
+            expected = old[measurement] * scale
+            if expected > 0 and result[measurement] > max(expected * (1 + allowed), expected + noise):
+                regressions.append((name, measurement, expected, result[measurement]))
+    return regressions
+
+
+def recheck_regressions(report, baseline, threshold, memory_threshold, quick=False, sizes=None, seed=0, tries=RECHECK_TRIES):
+    # Measures the cases that regressed on time again, keeping the faster result of each, and
+    # returns the regressions left
+    regressions = compare_with_baseline(report, baseline, threshold, memory_threshold)
+    for i in range(tries):
+        names = {name for name, measurement, old, new in regressions if measurement == "median_seconds"}
+        if not names:
+            break
+        for name, case, args, repeat in get_cases(quick, sizes, seed):
+            if name in names:
+                print(f"{name} (again) ...", end=" ", flush=True, file=sys.stderr)
+                result = measure_case(case, args, repeat)
+                print(f"{result['median_seconds'] * 1000:.2f} ms", file=sys.stderr)
+                kept = report["results"][name]
+                if result["median_seconds"] / result["calibration_seconds"] < kept["median_seconds"] / kept["calibration_seconds"]:
+                    report["results"][name] = result
+        regressions = compare_with_baseline(report, baseline, threshold, memory_threshold)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks for the FrontierNav calculation engine")
+    parser.add_argument("--quick", action="store_true", help="skip the largest synthetic maps")
+    parser.add_argument("--only", help="only run cases with this text in their name")
+    parser.add_argument("--sizes", type=int, nargs="+", help="synthetic map sizes to run (ex. --sizes 1000 1000000)")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the synthetic maps")
+    parser.add_argument("--output", default=LATEST_FILE, help="where to write the results")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="baseline results to compare with")
+    parser.add_argument("--threshold", type=float, default=0.5, help="allowed slowdown before a case counts as a regression (0.5 = 50%%)")
+    parser.add_argument("--memory-threshold", type=float, default=0.25, help="allowed growth in peak memory before a case counts as a regression")
+    parser.add_argument("--save-baseline", action="store_true", help="store the results as the new baseline")
+    parser.add_argument("--workers", type=int, nargs="+", help="worker counts for the sweep scaling measurement (ex. --workers 1 2 4 8)")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.quick, args.only, args.sizes, args.seed, args.workers)
+
+    baseline = None
+    regressions = []
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = recheck_regressions(report, baseline, args.threshold, args.memory_threshold, args.quick, args.sizes, args.seed)
+
+    output = args.baseline if args.save_baseline else args.output
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}", file=sys.stderr)
+
+    startup_problems = check_startup(report)
+    for problem in startup_problems:
+        print(f"STARTUP {problem}", file=sys.stderr)
+
+    if baseline is None:
+        return 1 if startup_problems else 0
+
+    speed_ratios = [get_speed_ratio(result, baseline["results"][name]) for name, result in report["results"].items() if name in baseline["results"]]
+    if speed_ratios:
+        print(f"This machine ran the calibration {statistics.median(speed_ratios):.2f}x as long as the baseline's", file=sys.stderr)
+    for name, measurement, old, new in regressions:
+        print(f"REGRESSION {name} {measurement}: {old:.6g} (scaled baseline) -> {new:.6g} (+{(new / old - 1) * 100:.0f}%)", file=sys.stderr)
+    if not regressions:
+        print(f"No regressions over {args.threshold * 100:.0f}% (time) or {args.memory_threshold * 100:.0f}% (memory) against {args.baseline}", file=sys.stderr)
+    return 1 if regressions or startup_problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,415 @@
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import data
+from frontiernav import FrontierNav
+
+# Headless loadout evaluation, for example:
+#
+#   python main.py evaluate probe_loadouts
+#   python main.py evaluate "probe_loadouts/*.json" --format json --output ranked.json --workers 4
+#
+# Every file is scored on its own on a fresh map (slots it doesn't mention stay locked), then the
+# totals are written as a table ranked by --sort. Nothing here imports tkinter.
+#
+#   python main.py pack archive.loadouts probe_loadouts          Appends JSON loadouts to a packed store
+#   python main.py unpack archive.loadouts 0 --output first.json   Writes one stored loadout back as JSON
+#   python main.py report --format jsonl --loadout probe_loadouts/jaheds_layout.json   Streams a report of every node
+#   python main.py pareto --generations 200 --output front.jsonl   Writes the miranium/credits/storage/cost trade-offs
+#   python main.py profile --loadout probe_loadouts/jaheds_layout.json --folded calculate.folded   Times each calculation stage
+#   python main.py plan --miranium 30000 --loadout probe_loadouts/jaheds_layout.json   Plans cheap purchases to a target
+
+COLUMNS = ["rank", "file", "miranium", "credits", "storage", "cost", "precious resources"]
+SORT_KEYS = ["miranium", "credits", "storage", "cost", "none"]
+FILES_PER_TASK = 256
+
+# Set up once in each worker process by _start_worker
+_worker_frontier_nav = None
+_worker_evaluator = None
+
+def _start_worker(data_name, snapshot_file=None):
+    global _worker_frontier_nav, _worker_evaluator
+    try:
+        from batch import BatchEvaluator
+    except ImportError:
+        # Without numpy each loadout is applied to the map and recalculated instead
+        BatchEvaluator = None
+
+    if snapshot_file:
+        from snapshot import GameDataSnapshot
+        snapshot = GameDataSnapshot(snapshot_file)
+        if BatchEvaluator is not None:
+            # The evaluator is built straight from the mapped arrays, the map's objects are never made
+            _worker_frontier_nav = None
+            _worker_evaluator = BatchEvaluator.from_snapshot(snapshot)
+            return
+        _worker_frontier_nav = FrontierNav(snapshot.to_game_data())
+    else:
+        _worker_frontier_nav = FrontierNav(FrontierNav.load_game_data(getattr(data, data_name)))
+    _worker_evaluator = None if BatchEvaluator is None else BatchEvaluator(_worker_frontier_nav)
+
+def read_loadout_file(path):
+    # Reads a saved probe setup, raising ValueError unless it's an object of "Region_nodeid": probe name
+    with open(path, "r") as f:
+        setup = json.load(f)
+    if not isinstance(setup, dict):
+        raise ValueError("expected an object of \"Region_nodeid\": probe name")
+    for key, probe_name in setup.items():
+        if not isinstance(probe_name, str):
+            raise ValueError(f"expected a probe name for {key}, got {json.dumps(probe_name)}")
+    return setup
+
+def _evaluate_files(paths):
+    # Returns a result row for every file that could be read, and a list of (path, error) for the rest
+    setups = []
+    errors = []
+    for path in paths:
+        try:
+            setups.append((path, read_loadout_file(path)))
+        except (OSError, ValueError) as e:
+            errors.append((path, str(e)))
+
+    if not setups:
+        return [], errors
+
+    if _worker_evaluator is not None:
+        totals = _worker_evaluator.evaluate([_worker_evaluator.encode(setup) for path, setup in setups])
+        resources = _worker_evaluator.resources
+        rows = [{
+            "file": path,
+            "miranium": int(totals["total miranium"][i]),
+            "credits": int(totals["total credits"][i]),
+            "storage": int(totals["total storage"][i]),
+            "cost": int(totals["total cost"][i]),
+            "precious resources": [resource for resource, possible in zip(resources, totals["possible resources"][i]) if possible]
+        } for i, (path, setup) in enumerate(setups)]
+    else:
+        frontier_nav = _worker_frontier_nav
+        rows = []
+        for path, setup in setups:
+            full_setup = dict.fromkeys(frontier_nav.slot_keys, None)
+            full_setup.update(setup)
+            frontier_nav.apply_loadout(full_setup)
+            totals = frontier_nav.calculate_total()
+            rows.append({
+                "file": path,
+                "miranium": totals["total miranium"],
+                "credits": totals["total credits"],
+                "storage": totals["total storage"],
+                "cost": totals["total cost"],
+                "precious resources": sorted(totals["possible resources"])
+            })
+
+    return rows, errors
+
+def find_loadout_files(sources):
+    # Each source is a directory (every .json file in it), a glob pattern or a single file
+    paths = []
+    for source in sources:
+        if os.path.isdir(source):
+            paths.extend(sorted(glob.glob(os.path.join(source, "*.json"))))
+        elif glob.has_magic(source):
+            paths.extend(sorted(glob.glob(source, recursive=True)))
+        else:
+            paths.append(source)
+    return paths
+
+def evaluate_files(paths, data_name="NODE_DATA", workers=None, snapshot_file=None):
+    # Yields (rows, errors) for each group of files as soon as it's done, in no particular order
+    tasks = [paths[start:start + FILES_PER_TASK] for start in range(0, len(paths), FILES_PER_TASK)]
+    workers = min(workers or os.cpu_count() or 1, max(len(tasks), 1))
+
+    if workers == 1:
+        _start_worker(data_name, snapshot_file)
+        for task in tasks:
+            yield _evaluate_files(task)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_start_worker, initargs=(data_name, snapshot_file)) as pool:
+        for future in as_completed([pool.submit(_evaluate_files, task) for task in tasks]):
+            yield future.result()
+
+
+class TableWriter:
+    # Writes result rows as CSV or as a JSON list, one row at a time
+    def __init__(self, out, output_format):
+        self.out = out
+        self.output_format = output_format
+        self.count = 0
+        if output_format == "csv":
+            self.writer = csv.writer(out)
+            self.writer.writerow(COLUMNS)
+        else:
+            out.write("[")
+
+    def write(self, row):
+        if self.output_format == "csv":
+            self.writer.writerow([row[column] if column != "precious resources" else "; ".join(row[column]) for column in COLUMNS])
+        else:
+            self.out.write(",\n  " if self.count else "\n  ")
+            self.out.write(json.dumps({column: row[column] for column in COLUMNS}))
+        self.count += 1
+
+    def close(self):
+        if self.output_format == "json":
+            self.out.write("\n]\n" if self.count else "]\n")
+        self.out.flush()
+
+
+def evaluate_command(args):
+    paths = find_loadout_files(args.sources)
+    if not paths:
+        print("No loadout files found", file=sys.stderr)
+        return 1
+
+    out = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+    writer = TableWriter(out, args.format)
+    failed = 0
+    kept = []
+    try:
+        for rows, errors in evaluate_files(paths, args.data, args.workers, args.snapshot):
+            for path, error in errors:
+                print(f"Warning: skipped {path}: {error}", file=sys.stderr)
+            failed += len(errors)
+
+            if args.sort == "none":
+                # Unranked rows are written as soon as each group of files is done
+                for row in rows:
+                    row["rank"] = writer.count + 1
+                    writer.write(row)
+            else:
+                kept.extend(rows)
+
+        if args.sort != "none":
+            kept.sort(key=lambda row: (-row[args.sort], row["file"]))
+            for rank, row in enumerate(kept, 1):
+                row["rank"] = rank
+                writer.write(row)
+        writer.close()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    print(f"Evaluated {len(paths) - failed} of {len(paths)} loadouts", file=sys.stderr)
+    return 0 if failed == 0 else 2
+
+
+def pack_command(args):
+    from loadouts import LoadoutCodec, LoadoutStore
+
+    paths = find_loadout_files(args.sources)
+    codec = LoadoutCodec.from_frontier_nav(FrontierNav(FrontierNav.load_game_data(getattr(data, args.data))))
+    setups = []
+    failed = 0
+    for path in paths:
+        try:
+            setups.append(codec.encode(read_loadout_file(path)))
+        except (OSError, ValueError) as e:
+            print(f"Warning: skipped {path}: {e}", file=sys.stderr)
+            failed += 1
+
+    with LoadoutStore(args.store, codec) as store:
+        first = store.append_packed(setups)
+        print(f"Stored {len(setups)} loadouts as {first} to {first + len(setups) - 1} in {args.store}", file=sys.stderr)
+    return 0 if failed == 0 else 2
+
+
+def unpack_command(args):
+    from loadouts import LoadoutStore
+
+    try:
+        with LoadoutStore(args.store) as store:
+            setup = store[args.index]
+    except (OSError, ValueError, IndexError) as e:
+        # A missing or damaged store, or an index past its end
+        print(e, file=sys.stderr)
+        return 1
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(setup, f, indent=2)
+    else:
+        json.dump(setup, sys.stdout, indent=2)
+        print()
+    return 0
+
+
+def report_command(args):
+    from report import write_report
+
+    if args.snapshot:
+        from snapshot import load_snapshot
+        frontier_nav = FrontierNav(load_snapshot(args.snapshot))
+    else:
+        frontier_nav = FrontierNav(FrontierNav.load_game_data(getattr(data, args.data)))
+    if args.loadout:
+        with open(args.loadout, "r") as f:
+            frontier_nav.apply_loadout(json.load(f))
+
+    write_report(frontier_nav, args.output, args.format)
+    return 0
+
+
+def pareto_command(args):
+    from pareto import ParetoExplorer
+
+    frontier_nav = FrontierNav(FrontierNav.load_game_data(getattr(data, args.data)))
+    explorer = ParetoExplorer(frontier_nav, budget=args.budget, archive_size=args.archive_size)
+    front = explorer.run(args.generations, args.seed)
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        # One JSON object per line, cheapest loadout first
+        for point in front:
+            out.write(json.dumps(point) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    print(f"Found {len(front)} loadouts on the front", file=sys.stderr)
+    return 0
+
+
+def plan_command(args):
+    frontier_nav = FrontierNav(FrontierNav.load_game_data(getattr(data, args.data)))
+    if args.loadout:
+        with open(args.loadout, "r") as f:
+            frontier_nav.apply_loadout(json.load(f))
+
+    target = {name: getattr(args, name) for name in ["miranium", "credits", "storage"] if getattr(args, name) is not None}
+    try:
+        plan = frontier_nav.plan_upgrades(target, beam_width=args.beam_width, max_steps=args.max_steps)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(plan, f, indent=2)
+    else:
+        for number, step in enumerate(plan["steps"], 1):
+            print(f"{number}. {step['slot']}: {step['from']} -> {step['to']} ({step['cost']})")
+        totals = plan["totals"]
+        print(f"Total cost {plan['cost']} (the cheapest plan found): {totals['total miranium']} miranium, "
+              f"{totals['total credits']} credits, {totals['total storage']} storage")
+
+    if not plan["reached"]:
+        print("The target couldn't be reached, this is the closest plan found", file=sys.stderr)
+        return 2
+    return 0
+
+
+def profile_command(args):
+    from profiler import EvaluationProfiler
+
+    if args.snapshot:
+        from snapshot import load_snapshot
+        frontier_nav = FrontierNav(load_snapshot(args.snapshot), incremental=not args.full, output_cache_size=0 if args.no_cache else 65536)
+    else:
+        frontier_nav = FrontierNav(FrontierNav.load_game_data(getattr(data, args.data)), incremental=not args.full,
+                                   output_cache_size=0 if args.no_cache else 65536)
+    if args.loadout:
+        with open(args.loadout, "r") as f:
+            frontier_nav.apply_loadout(json.load(f))
+
+    # The first calculation is always a full one, then each repeat recalculates every slot
+    # (with --full) or scores every single probe swap (otherwise)
+    with EvaluationProfiler(frontier_nav) as profiler:
+        frontier_nav.calculate_total()
+        for i in range(args.repeat):
+            if args.full:
+                frontier_nav.calculate_total()
+            else:
+                frontier_nav.get_marginal_gains()
+
+    print(profiler.format_summary(args.slots))
+    if args.folded:
+        profiler.write_folded(args.folded)
+        print(f"Wrote call stacks to {args.folded}", file=sys.stderr)
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="main.py", description="FrontierNav probe calculator, run with no arguments for the GUI")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    evaluate = commands.add_parser("evaluate", help="score loadout JSON files and write a ranked table")
+    evaluate.add_argument("sources", nargs="+", help="directories, glob patterns or files of saved probe setups")
+    evaluate.add_argument("--format", choices=["csv", "json"], default="csv")
+    evaluate.add_argument("--output", help="file to write to (standard output by default)")
+    evaluate.add_argument("--sort", choices=SORT_KEYS, default="miranium",
+                          help="total to rank by, highest first, or none to write rows as they finish")
+    evaluate.add_argument("--workers", type=int, help="number of worker processes (one per CPU by default)")
+    evaluate.add_argument("--data", choices=["NODE_DATA", "TEST_DATA"], default="NODE_DATA", help="map to evaluate on")
+    evaluate.add_argument("--snapshot", help="game data snapshot to load instead of --data (see snapshot.py)")
+
+    pack = commands.add_parser("pack", help="append loadout JSON files to a packed loadout store")
+    pack.add_argument("store", help="store file, created if it doesn't exist")
+    pack.add_argument("sources", nargs="+", help="directories, glob patterns or files of saved probe setups")
+    pack.add_argument("--data", choices=["NODE_DATA", "TEST_DATA"], default="NODE_DATA", help="map the loadouts are for")
+
+    unpack = commands.add_parser("unpack", help="write a loadout from a packed store as JSON")
+    unpack.add_argument("store", help="store file")
+    unpack.add_argument("index", type=int, help="position of the loadout in the store, negative counts from the end")
+    unpack.add_argument("--output", help="file to write to (standard output by default)")
+
+    report = commands.add_parser("report", help="write the data of every node as text, CSV or JSON Lines")
+    report.add_argument("--format", choices=["text", "csv", "jsonl"], default="text")
+    report.add_argument("--output", help="file to write to (standard output by default)")
+    report.add_argument("--loadout", help="saved probe setup to install before writing the report")
+    report.add_argument("--data", choices=["NODE_DATA", "TEST_DATA"], default="NODE_DATA", help="map to report on")
+    report.add_argument("--snapshot", help="game data snapshot to load instead of --data (see snapshot.py)")
+
+    pareto = commands.add_parser("pareto", help="search for the best trade-offs between miranium, credits, storage and cost")
+    pareto.add_argument("--generations", type=int, default=100, help="number of search rounds")
+    pareto.add_argument("--seed", type=int, help="random seed, for repeatable results")
+    pareto.add_argument("--budget", type=int, help="most a loadout may cost")
+    pareto.add_argument("--archive-size", type=int, default=256, help="most loadouts kept on the front")
+    pareto.add_argument("--output", help="JSON Lines file to write to (standard output by default)")
+    pareto.add_argument("--data", choices=["NODE_DATA", "TEST_DATA"], default="NODE_DATA", help="map to search")
+
+    profile = commands.add_parser("profile", help="time each stage of the calculation and write a flame graph")
+    profile.add_argument("--loadout", help="saved probe setup to install first")
+    profile.add_argument("--repeat", type=int, default=1, help="calculations to profile after the first one")
+    profile.add_argument("--full", action="store_true", help="profile full recalculations instead of the marginal gains table")
+    profile.add_argument("--no-cache", action="store_true", help="turn off the slot output cache")
+    profile.add_argument("--slots", type=int, default=10, help="number of slowest slots to list")
+    profile.add_argument("--folded", help="file to write call stacks to in the folded flame graph format")
+    profile.add_argument("--data", choices=["NODE_DATA", "TEST_DATA"], default="NODE_DATA", help="map to profile on")
+    profile.add_argument("--snapshot", help="game data snapshot to load instead of --data (see snapshot.py)")
+
+    plan = commands.add_parser("plan", help="plan cheap probe purchases that reach target totals (the cheapest found, not proven cheapest)")
+    plan.add_argument("--miranium", type=int, help="lowest acceptable miranium total")
+    plan.add_argument("--credits", type=int, help="lowest acceptable credits total")
+    plan.add_argument("--storage", type=int, help="lowest acceptable storage total")
+    plan.add_argument("--loadout", help="saved probe setup to start from (an empty map by default)")
+    plan.add_argument("--beam-width", type=int, default=3, help="partial plans kept after each purchase")
+    plan.add_argument("--max-steps", type=int, default=200, help="most search steps")
+    plan.add_argument("--output", help="JSON file to write the plan to (printed as a list by default)")
+    plan.add_argument("--data", choices=["NODE_DATA", "TEST_DATA"], default="NODE_DATA", help="map to plan on")
+
+    args = parser.parse_args(argv)
+    commands = {
+        "evaluate": evaluate_command,
+        "pack": pack_command,
+        "unpack": unpack_command,
+        "report": report_command,
+        "pareto": pareto_command,
+        "profile": profile_command,
+        "plan": plan_command
+    }
+    try:
+        return commands[args.command](args)
+    except BrokenPipeError:
+        # Standard output was closed early (ex. piped into head), which only ends the output
+        from report import silence_stdout
+        silence_stdout()
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
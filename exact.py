@@ -0,0 +1,430 @@
+import itertools
+import math
+import time
+from probes import ProbeType, LINKED_TYPES, calculate_slot_output
+from optimizer import OBJECTIVE_TOTALS, parse_objective, parse_constraints
+from memo import CopiedOutputCache
+
+# With a budget, each frontier can hold one entry per multiple of the probe costs' greatest common
+# divisor up to the budget (1000 for the game's probes), and joining two frontiers pairs up their
+# entries. The work grows about as (probe options per slot)^5 * (frontier entries)^2, and budgets
+# estimated at more than MAX_BUDGET_WORK of it are refused. On NODE_DATA with Locked, Mining G10,
+# Booster G2, Duplicator and Research G6 (14 options per slot) a budget of 100000 takes about 2.5s,
+# 300000 about 11s and 500000 about 30s; with 8 probes (23 options) 100000 takes about 40s.
+MAX_BUDGET_WORK = 1.5e11
+
+# Storage every map starts with (see FrontierNav), which the frontier scores leave out
+STARTING_STORAGE = 6000
+
+# Link group sizes that share a multiplier: 1-2, 3-4, 5-7 and 8 or more linked probes
+LINK_CLASS_MULTIPLIERS = (1, 1.3, 1.5, 1.8)
+
+def get_link_class(links):
+    if links >= 8:
+        return 3
+    elif links >= 5:
+        return 2
+    elif links >= 3:
+        return 1
+    else:
+        return 0
+
+def get_score(frontier_nav, weights):
+    # The weighted total for the last calculate_total
+    score = 0
+    for name, weight in weights.items():
+        score += weight * getattr(frontier_nav, OBJECTIVE_TOTALS[name])
+    return score
+
+class ExactSolver:
+    # Finds a provably optimal loadout with dynamic programming over the node graph.
+    #
+    # The FrontierNav map has no cycles, so every connection is a bridge and every node with
+    # more than one connection is a cut vertex. Each connected part of the map is rooted and
+    # solved bottom up: cutting the connection above a node leaves a subtree whose only tie to
+    # the rest of the map is that node's probe, the multiplier class guessed for its link group
+    # and how many of its linked probes are inside the subtree. For every such boundary state
+    # the table keeps the (cost, score) pairs that aren't beaten by a cheaper option, so the
+    # budget is handled exactly. The separate parts are joined with the same (cost, score) merge.
+    #
+    # The work grows with the number of candidate probes cubed at nodes with three connections,
+    # so large maps should be given a short list of candidate probes through constraints["probes"].
+    # A budget multiplies the work by the square of the number of costs a frontier can hold, see
+    # MAX_BUDGET_WORK.
+    def __init__(self, frontier_nav, objective, budget=None, constraints=None):
+        self.frontier_nav = frontier_nav
+        self.weights = parse_objective(objective)
+        self.budget = budget
+        self.copied_outputs = CopiedOutputCache()   # Duplicators' copied outputs, shared by every slot option
+        candidates, fixed = parse_constraints(frontier_nav, constraints)
+
+        self.slots = []
+        self.options = []
+        for region in frontier_nav.slots:
+            for node_id, slot in frontier_nav.slots[region].items():
+                key = f"{region}_{node_id}"
+                if key not in fixed:
+                    probes = candidates
+                elif fixed[key] is None:
+                    probes = [frontier_nav.probes["locked"][0]]
+                else:
+                    probes = [fixed[key]]
+
+                options = []
+                for probe in probes:
+                    if probe.probe_type in LINKED_TYPES:
+                        options.extend((probe, link_class) for link_class in range(len(LINK_CLASS_MULTIPLIERS)))
+                    else:
+                        options.append((probe, None))
+
+                self.slots.append(slot)
+                self.options.append(options)
+
+        if budget is not None:
+            work = self.estimate_budget_work()
+            if work > MAX_BUDGET_WORK:
+                raise ValueError(f"A budget of {budget} with {max(len(options) for options in self.options)} probe options "
+                                 f"per slot is too much work for the exact solver (about {work:.2g}, the limit is "
+                                 f"{MAX_BUDGET_WORK:.2g}), use fewer probes in constraints, a smaller budget or method 'anneal'")
+
+        slot_index = {slot: i for i, slot in enumerate(self.slots)}
+        self.adjacent = [[slot_index[adj_slot] for adj_slot in slot.get_adjacent_slots()] for slot in self.slots]
+
+    def estimate_budget_work(self):
+        # (probe options per slot)^5 * (frontier entries)^2, see MAX_BUDGET_WORK
+        cost_unit = 0
+        for options in self.options:
+            for probe, link_class in options:
+                cost_unit = math.gcd(cost_unit, probe.cost)
+        entries = self.budget // cost_unit + 1 if cost_unit else 1
+        return max(len(options) for options in self.options) ** 5 * entries ** 2
+
+    def run(self):
+        frontier = self._solve()
+        if not frontier:
+            raise ValueError(f"No loadout fits within the budget of {self.budget}")
+        return self._install(frontier[-1][2])
+
+    def find_cheapest(self, min_score):
+        # Installs and returns (like run) the cheapest loadout within the budget that scores at least
+        # min_score, or returns None when there is none. With a budget the final frontier holds the
+        # best score for every cost, so this is one solve rather than a search over budgets.
+        min_score -= self.weights.get("storage", 0) * STARTING_STORAGE
+        for cost, score, plan in self._solve():
+            if score >= min_score:
+                return self._install(plan)
+        return None
+
+    def _solve(self):
+        # Returns the (cost, score, plan) frontier of the whole map
+        trees = self._find_trees()
+        frontier = [(0, 0, None)]
+        for root, order, parents in trees:
+            tree_frontier = self._solve_tree(root, order, parents)
+            frontier = self._combine(frontier, tree_frontier)
+        return frontier
+
+    def _install(self, plan):
+        for i, probe in self._flatten_plan(plan):
+            if self.slots[i].installed_probe is not probe:
+                self.slots[i].install_probe(probe)
+
+        totals = self.frontier_nav.calculate_total()
+        return {
+            "score": get_score(self.frontier_nav, self.weights),
+            "totals": totals,
+            "loadout": self.frontier_nav.get_loadout()
+        }
+
+    def _find_trees(self):
+        # Splits the map into its connected parts and orders each one so children come before parents
+        trees = []
+        seen = set()
+        edges = sum(len(adjacent) for adjacent in self.adjacent) // 2
+
+        for root in range(len(self.slots)):
+            if root in seen:
+                continue
+
+            seen.add(root)
+            parents = {root: None}
+            order = [root]
+            for i in order:
+                for j in self.adjacent[i]:
+                    if j not in seen:
+                        seen.add(j)
+                        parents[j] = i
+                        order.append(j)
+
+            order.reverse()
+            trees.append((root, order, parents))
+
+        if edges != len(self.slots) - len(trees):
+            raise ValueError("The exact solver needs a map without cycles between nodes, use the annealing optimizer instead")
+        return trees
+
+    def _solve_tree(self, root, order, parents):
+        # tables[i][parent_option][boundary_state] is the frontier of the subtree below slot i
+        tables = {}
+
+        for i in order:
+            parent = parents[i]
+            children = [j for j in self.adjacent[i] if j != parent]
+            parent_options = self.options[parent] if parent is not None else [(None, None)]
+            table = {parent_option: {} for parent_option in parent_options}
+
+            for probe, link_class in self.options[i]:
+                partial = self._combine_children(i, probe, link_class, children, tables)
+
+                for parent_option in parent_options:
+                    exports = table[parent_option]
+                    for summary, frontier in partial.items():
+                        result = self._score_slot(i, probe, link_class, summary, parent, parent_option)
+                        if result is None:
+                            continue
+
+                        boundary_state, score = result
+                        best = exports.get(boundary_state)
+                        if best is None:
+                            best = exports[boundary_state] = {}
+                        self._add_shifted(best, frontier, score, (i, probe), probe.cost)
+
+            for parent_option, exports in table.items():
+                table[parent_option] = {state: self._get_frontier(best) for state, best in exports.items()}
+
+            for j in children:
+                del tables[j]
+            tables[i] = table
+
+        root_frontier = []
+        for frontier in tables[root][(None, None)].values():
+            root_frontier.extend(frontier)
+        return self._prune(root_frontier)
+
+    def _combine_children(self, i, probe, link_class, children, tables):
+        # Joins the children's frontiers, keeping only what the slot's own output needs to know about them:
+        # every child probe for a duplicator, the adjacent boosters for probes they boost, the best
+        # duplicator link class next to a probe that gets the duplicator link boost, and the number
+        # of linked probes below that belong to this slot's link group
+        partial = {((), -1, 0): [(0, 0, None)]}
+
+        for j in children:
+            child_table = tables[j][(probe, link_class)]
+            combined = {}       # Summary -> best entry for each cost (see _get_frontier)
+            for (neighbours, dupe_class, linked), frontier in partial.items():
+                for (child_probe, child_class, child_linked), child_frontier in child_table.items():
+                    new_neighbours = neighbours
+                    if probe.probe_type == ProbeType.DUPLICATOR:
+                        new_neighbours = neighbours + (child_probe,)
+                    elif probe.probe_type in LINKED_TYPES and child_probe.probe_type == ProbeType.BOOSTER:
+                        new_neighbours = tuple(sorted(neighbours + (child_probe,), key=lambda booster: booster.gen))
+
+                    new_dupe_class = dupe_class
+                    if child_probe.probe_type == ProbeType.DUPLICATOR and probe.probe_type in LINKED_TYPES:
+                        new_dupe_class = max(dupe_class, child_class)
+
+                    summary = (new_neighbours, new_dupe_class, min(8, linked + child_linked))
+                    best = combined.get(summary)
+                    if best is None:
+                        best = combined[summary] = {}
+                    self._add_combined(best, frontier, child_frontier)
+            partial = {summary: self._get_frontier(best) for summary, best in combined.items()}
+
+        return partial
+
+    def _score_slot(self, i, probe, link_class, summary, parent, parent_option):
+        # Returns the boundary state passed up to the parent and the slot's own weighted output,
+        # or None when the guessed link class doesn't match the real size of the link group
+        neighbours, dupe_class, linked = summary
+        parent_probe, parent_class = parent_option
+        links = min(8, linked + 1)
+
+        if parent_probe is not None:
+            if probe.probe_type == ProbeType.DUPLICATOR:
+                # The duplicator adds up its neighbours' output in connection order
+                position = self.adjacent[i].index(parent)
+                neighbours = neighbours[:position] + (parent_probe,) + neighbours[position:]
+            elif parent_probe.probe_type == ProbeType.BOOSTER:
+                neighbours = neighbours + (parent_probe,)
+
+            if parent_probe.probe_type == ProbeType.DUPLICATOR and probe.probe_type in LINKED_TYPES:
+                dupe_class = max(dupe_class, parent_class)
+
+        link_multiplier = 1
+        dupe_multiplier = 1
+        if link_class is not None:
+            link_multiplier = LINK_CLASS_MULTIPLIERS[link_class]
+            if dupe_class >= 0:
+                dupe_multiplier = LINK_CLASS_MULTIPLIERS[dupe_class]
+
+        if link_class is not None and parent_probe is not None and \
+            parent_probe.probe_type == probe.probe_type and parent_probe.gen == probe.gen:
+            # The link group carries on past the parent, so it's checked further up
+            if parent_class != link_class:
+                return None
+            boundary_state = (probe, link_class, links)
+        else:
+            if link_class is not None and get_link_class(links) != link_class:
+                return None
+            boundary_state = (probe, link_class if probe.probe_type == ProbeType.DUPLICATOR else None, 0)
+
+        output = calculate_slot_output(self.slots[i].node, probe, neighbours, link_multiplier, dupe_multiplier, self.copied_outputs)
+        score = self.weights.get("miranium", 0) * output[0] + \
+            self.weights.get("credits", 0) * output[1] + \
+            self.weights.get("storage", 0) * output[2]
+        return boundary_state, score
+
+    # Frontiers are built by collecting the best entry for each cost in a dict, as cost -> (score,
+    # first half of the plan, second half), and only sorting and pruning once everything is in
+
+    def _combine(self, frontier_a, frontier_b):
+        best = {}
+        self._add_combined(best, frontier_a, frontier_b)
+        return self._get_frontier(best)
+
+    def _add_combined(self, best, frontier_a, frontier_b):
+        # Adds every pair of entries from the two frontiers. They are sorted by cost, so each entry
+        # of frontier_a stops pairing as soon as the total goes over the budget.
+        budget = self.budget
+        for cost_a, score_a, plan_a in frontier_a:
+            for cost_b, score_b, plan_b in frontier_b:
+                cost = cost_a + cost_b
+                if budget is not None and cost > budget:
+                    break
+                score = score_a + score_b
+                entry = best.get(cost)
+                if entry is None or score > entry[0]:
+                    best[cost] = (score, plan_a, plan_b)
+
+    def _add_shifted(self, best, frontier, score, step, step_cost):
+        # Adds the frontier's entries with one more probe (step) bought on top of each
+        budget = self.budget
+        for cost, value, plan in frontier:
+            cost += step_cost
+            if budget is not None and cost > budget:
+                break
+            value += score
+            entry = best.get(cost)
+            if entry is None or value > entry[0]:
+                best[cost] = (value, step, plan)
+
+    def _get_frontier(self, best):
+        frontier = []
+        for cost in sorted(best):
+            score, plan_a, plan_b = best[cost]
+            if not frontier or score > frontier[-1][1]:
+                frontier.append((cost, score, (plan_a, plan_b)))
+        if self.budget is None:
+            return frontier[-1:]
+        return frontier
+
+    def _prune(self, entries):
+        # Keeps the entries that score better than every cheaper one, which is just the best entry
+        # when there is no budget
+        entries.sort(key=lambda entry: (entry[0], -entry[1]))
+        pruned = []
+        for entry in entries:
+            if self.budget is not None and entry[0] > self.budget:
+                break
+            if not pruned or entry[1] > pruned[-1][1]:
+                pruned.append(entry)
+
+        if self.budget is None:
+            return pruned[-1:]
+        return pruned
+
+    @staticmethod
+    def _flatten_plan(plan):
+        assignment = []
+        stack = [plan]
+        while stack:
+            item = stack.pop()
+            if item is None:
+                continue
+            if isinstance(item[0], int):
+                assignment.append(item)
+            else:
+                stack.extend(item)
+        return assignment
+
+
+def brute_force(frontier_nav, objective, budget=None, constraints=None):
+    # Tries every loadout, only usable on very small maps or with very few candidate probes
+    weights = parse_objective(objective)
+    candidates, fixed = parse_constraints(frontier_nav, constraints)
+
+    slots = []
+    options = []
+    for region in frontier_nav.slots:
+        for node_id, slot in frontier_nav.slots[region].items():
+            key = f"{region}_{node_id}"
+            slots.append(slot)
+            if key not in fixed:
+                options.append(candidates)
+            elif fixed[key] is None:
+                options.append([frontier_nav.probes["locked"][0]])
+            else:
+                options.append([fixed[key]])
+
+    best_score = None
+    best_probes = None
+    for probes in itertools.product(*options):
+        for slot, probe in zip(slots, probes):
+            if slot.installed_probe is not probe:
+                slot.install_probe(probe)
+
+        frontier_nav.calculate_total()
+        if budget is not None and frontier_nav.cost > budget:
+            continue
+
+        score = get_score(frontier_nav, weights)
+        if best_score is None or score > best_score:
+            best_score = score
+            best_probes = probes
+
+    if best_probes is None:
+        raise ValueError(f"No loadout fits within the budget of {budget}")
+
+    for slot, probe in zip(slots, best_probes):
+        if slot.installed_probe is not probe:
+            slot.install_probe(probe)
+
+    return {
+        "score": best_score,
+        "totals": frontier_nav.calculate_total(),
+        "loadout": frontier_nav.get_loadout()
+    }
+
+
+def compare_with_brute_force(node_data, objective, budget=None, constraints=None):
+    # Solves the same problem with the exact solver and by brute force and times both
+    from frontiernav import FrontierNav
+
+    exact_nav = FrontierNav(FrontierNav.load_game_data(node_data))
+    start = time.perf_counter()
+    exact_result = ExactSolver(exact_nav, objective, budget, constraints).run()
+    exact_time = time.perf_counter() - start
+
+    brute_nav = FrontierNav(FrontierNav.load_game_data(node_data))
+    start = time.perf_counter()
+    brute_result = brute_force(brute_nav, objective, budget, constraints)
+    brute_time = time.perf_counter() - start
+
+    return {
+        "exact score": exact_result["score"],
+        "brute force score": brute_result["score"],
+        "exact seconds": exact_time,
+        "brute force seconds": brute_time,
+        "matches": exact_result["score"] == brute_result["score"]
+    }
+
+
+if __name__ == "__main__":
+    from data import TEST_DATA
+
+    probes = ["Probe Slot Locked", "Mining G10 Probe", "Booster G2 Probe", "Duplicator Probe", "Research G6 Probe"]
+    for objective, budget in (("miranium", None), ("miranium", 150000), ({"miranium": 1, "credits": 1}, 120000)):
+        comparison = compare_with_brute_force(TEST_DATA, objective, budget, {"probes": probes})
+        print(f"{objective}, budget {budget}:")
+        print(f"    exact:       {comparison['exact score']} in {comparison['exact seconds']:.3f}s")
+        print(f"    brute force: {comparison['brute force score']} in {comparison['brute force seconds']:.3f}s")
@@ -1,13 +1,33 @@
-from nodes import Node, Connection
-from probes import ProbeSlot, Probe, ProbeType
+from nodes import Node, Connection, CompiledGraph
+from probes import ProbeSlot, Probe, ProbeType, ProbeIndex, LINKED_TYPES
+from links import LinkIndex
+from memo import OutputCache, CopiedOutputCache
 from data import PROBE_COSTS, PROBE_MAX_GEN
 
 class FrontierNav:
-    def __init__(self, game_data):
+    def __init__(self, game_data, incremental=True, output_cache_size=65536, copied_output_cache_size=65536):
         self.nodes = game_data["nodes"]
         self.connections = game_data["connections"]
         self.slots = game_data["slots"]
         self.probes = game_data["probes"]
+        self.probe_index = game_data.get("probe_index")     # Probe lookups by name, type and gen, and probe ids
+        if self.probe_index is None:
+            self.probe_index = ProbeIndex(self.probes)
+        self.graph = game_data.get("graph")
+        if self.graph is None:
+            self.graph = CompiledGraph(node for region in self.nodes for node in self.nodes[region].values())
+
+        # Every slot of this map in order, each ProbeSlot's index is its position here (which is
+        # also its node's index in self.graph). All per-slot state lives on the instance so
+        # separate maps never share anything.
+        self.slot_table = []
+        self.slot_keys = []             # "Region_nodeid" of each slot in slot_table
+        for region in self.slots:
+            for node_id, slot in self.slots[region].items():
+                slot.index = len(self.slot_table)
+                self.slot_table.append(slot)
+                self.slot_keys.append(f"{region}_{node_id}")
+        self.slot_lookup = dict(zip(self.slot_keys, self.slot_table))    # "Region_nodeid" -> ProbeSlot
 
         self.miranium = 0
         self.credits = 0
@@ -15,147 +35,299 @@ class FrontierNav:
         self.prec_resources = set()
         self.cost = 0
 
+        # When incremental is True, calculate_total only recalculates the slots affected by
+        # probe changes since the last call and applies the difference to the totals
+        self.incremental = incremental
+        self._slot_outputs = [None] * len(self.slot_table)   # (miranium, credits, storage, prec_resources, cost) of each slot from the last calculation
+        self._slot_stages = [None] * len(self.slot_table)    # Output and stages of each slot from the last calculation (see calculate_slot_stages), shared with output_cache
+        self._calculated = False        # Whether _slot_outputs holds a full calculation
+        self._dirty_slots = set()       # ProbeSlots whose cached output is out of date
+        self._resource_counts = {}      # Precious resource -> number of slots that can currently produce it
+
+        # Slot outputs are memoized by their local setup (see OutputCache), 0 turns this off
+        self.output_cache = OutputCache(output_cache_size) if output_cache_size else None
+        # and the outputs duplicators copy by node and probe (see CopiedOutputCache), 0 turns this off
+        self.copied_output_cache = CopiedOutputCache(copied_output_cache_size) if copied_output_cache_size else None
+
+        # Link components are indexed once here and then updated as probes change
+        self.link_index = LinkIndex(self.slot_table)
+
+        for slot in self.slot_table:
+            slot.listener = self
+            slot.link_index = self.link_index
+
     def calculate_total(self):
+        if not self.incremental or not self._calculated:
+            self._calculate_full_total()
+        else:
+            for slot in self._dirty_slots:
+                self._update_slot_output(slot)
+        self._dirty_slots.clear()
+
+        return {
+            "total miranium": self.miranium,
+            "total credits": self.credits,
+            "total storage": self.storage,
+            "possible resources": list(self.prec_resources),
+            "total cost": self.cost
+        }
+
+    def get_slot_outputs(self):
+        # (miranium, credits, storage, prec_resources, cost) of every slot in slot_table order from the
+        # last calculate_total, or None for each slot before the first one
+        return list(self._slot_outputs)
+
+    def _calculate_full_total(self):
         self.miranium = 0
         self.credits = 0
         self.storage = 6000
         self.prec_resources = set()
         self.cost = 0
+        self._slot_outputs = [None] * len(self.slot_table)
+        self._slot_stages = [None] * len(self.slot_table)
+        self._resource_counts = {}
 
-        for region in self.slots:
-            for node_id in self.slots[region]:
-                slot = self.slots[region][node_id]
-                current_slot_totals = slot.calculate_output()
+        for slot in self.slot_table:
+            self._update_slot_output(slot)
+        self._calculated = True
+
+    def _update_slot_output(self, slot):
+        # Replaces the slot's cached output with a fresh one and applies the difference to the totals
+        stages = self._calculate_slot_stages(slot)
+        self._slot_stages[slot.index] = stages
+        new_output = stages[:4] + (slot.installed_probe.cost,)
+        old_output = self._slot_outputs[slot.index]
+        if old_output == new_output:
+            return
+
+        if old_output:
+            self.miranium -= old_output[0]
+            self.credits -= old_output[1]
+            self.storage -= old_output[2]
+            self.cost -= old_output[4]
+            for pr in old_output[3]:
+                self._resource_counts[pr] -= 1
+                if self._resource_counts[pr] == 0:
+                    del self._resource_counts[pr]
+                    self.prec_resources.discard(pr)
+
+        self.miranium += new_output[0]
+        self.credits += new_output[1]
+        self.storage += new_output[2]
+        self.cost += new_output[4]
+        for pr in new_output[3]:
+            self._resource_counts[pr] = self._resource_counts.get(pr, 0) + 1
+            self.prec_resources.add(pr)
+
+        self._slot_outputs[slot.index] = new_output
+
+    def _calculate_slot_stages(self, slot):
+        if self.output_cache is not None:
+            return self.output_cache.get_output(slot.get_evaluation_context(), self.copied_output_cache)
+        return slot.get_evaluation_context().calculate_stages(self.copied_output_cache)
+
+    def get_marginal_gains(self, probes=None, cancelled=None):
+        # Returns what swapping the probe in one slot would change, for every slot and every probe
+        # (or only those in probes) other than the one installed: a list of dicts with the
+        # "slot" ("Region_nodeid"), "probe" name and the change in "miranium", "credits", "storage" and "cost".
+        # Each swap is installed, only the slots it affects are recalculated and compared with their
+        # current outputs, and then the old probe goes back, so the totals are never recalculated.
+        # cancelled, if given, is called before each slot; once it returns True the work stops and
+        # None is returned, with every slot left as it was.
+        if not self.incremental:
+            raise ValueError("get_marginal_gains needs a FrontierNav with incremental=True")
+        self.calculate_total()
+        probes = self.probe_index.probes if probes is None else probes
+        dirty_slots = self._dirty_slots
+        slot_outputs = self._slot_outputs
+        gains = []
+
+        for key, slot in zip(self.slot_keys, self.slot_table):
+            if cancelled is not None and cancelled():
+                return None
+            old_probe = slot.installed_probe
+            for probe in probes:
+                if probe == old_probe:
+                    continue
+
+                slot.install_probe(probe)
+                miranium = 0
+                credits = 0
+                storage = 0
+                for dirty_slot in dirty_slots:
+                    new_output = self._calculate_slot_stages(dirty_slot)
+                    old_output = slot_outputs[dirty_slot.index]
+                    miranium += new_output[0] - old_output[0]
+                    credits += new_output[1] - old_output[1]
+                    storage += new_output[2] - old_output[2]
+                gains.append({
+                    "slot": key,
+                    "probe": probe.name,
+                    "miranium": miranium,
+                    "credits": credits,
+                    "storage": storage,
+                    "cost": probe.cost - old_probe.cost
+                })
+
+                # Putting the old probe back leaves every stored output correct again
+                slot.install_probe(old_probe)
+                dirty_slots.clear()
+
+        return gains
 
-                self.miranium += current_slot_totals[0]
-                self.credits += current_slot_totals[1]
-                self.storage += current_slot_totals[2]
+    def get_breakdown(self):
+        # Calculates the totals and returns where they come from, using the stages kept by that
+        # calculation (nothing is recalculated per slot):
+        #   "slots":    "Region_nodeid" -> the slot's probe, base output, booster gain, link multiplier,
+        #               duplicator link boost, final output, possible resources and cost
+        #   "regions":  region -> subtotals of its slots (storage doesn't include the starting 6000)
+        #   "totals":   the result of calculate_total
+        # Base output and booster gain are (miranium, credits, storage) before truncating to whole numbers.
+        totals = self.calculate_total()
+        slot_breakdowns = {}
+        regions = {}
 
-                pr_output = current_slot_totals[3]
-                for pr in pr_output:
-                    self.prec_resources.add(pr)
+        for key, slot, output, stages in zip(self.slot_keys, self.slot_table, self._slot_outputs, self._slot_stages):
+            base = stages[4:7]
+            boosted = stages[7:10]
+            link_multiplier, dupe_multiplier = stages[10:12]
+            miranium, credits, storage, prec_resources, cost = output
+            slot_breakdowns[key] = {
+                "probe": slot.installed_probe.name,
+                "base output": base,
+                "booster gain": (boosted[0] - base[0], boosted[1] - base[1], boosted[2] - base[2]),
+                "link multiplier": link_multiplier,
+                "duplicator link boost": dupe_multiplier,
+                "output": (miranium, credits, storage),
+                "possible resources": list(prec_resources),
+                "cost": cost
+            }
 
-                self.cost += slot.installed_probe.cost
+            region = key.split("_", 1)[0]
+            subtotals = regions.get(region)
+            if subtotals is None:
+                subtotals = regions[region] = {
+                    "total miranium": 0,
+                    "total credits": 0,
+                    "total storage": 0,
+                    "possible resources": [],
+                    "total cost": 0
+                }
+            subtotals["total miranium"] += miranium
+            subtotals["total credits"] += credits
+            subtotals["total storage"] += storage
+            subtotals["total cost"] += cost
+            for pr in prec_resources:
+                if pr not in subtotals["possible resources"]:
+                    subtotals["possible resources"].append(pr)
 
         return {
-            "total miranium": self.miranium,
-            "total credits": self.credits,
-            "total storage": self.storage,
-            "possible resources": list(self.prec_resources),
-            "total cost": self.cost
+            "slots": slot_breakdowns,
+            "regions": regions,
+            "totals": totals
         }
 
-    def print_game_data(self):     
-        # Prints current data for FrontierNav in the terminal
-        print("---- Xenoblade Chronicles X: Definitive Edition ----")
-        print("----------------- FrontierNav Data -----------------\n")
-
-        for region in self.nodes:
-            print(f">>> {region} <<<")
-            for node_id in self.nodes[region]:
-                node = self.nodes[region][node_id]
-                print(f"{node.name}")
-                print(f"\n- Production Rank: {node.prod_rank.value[0]}")
-                print(f"- Revenue Rank: {node.rev_rank.value[0]}")
-                print(f"- Combat Rank: {node.combat_rank}")
-                
-                ssing_sites = "- Sightseeing Sites: "
-                if node.sightseeing:
-                    ssing_sites += f"{len(node.sightseeing)}"
-                    for i in range(len(node.sightseeing)):
-                        ssing_sites += f"\n     * {node.sightseeing[i]}"
-                else:
-                    ssing_sites += "0"
-                print(ssing_sites)
-
-                resources = "- Precious Resources: "
-                if node.prec_resources:
-                    resources += f"{len(node.prec_resources)}"
-                    for i in range(len(node.prec_resources)):
-                        resources += f"\n     * {node.prec_resources[i]}"
-                else:
-                    resources += "0"
-                print(resources)
-                
-                connects_to = "- Connected To: "
-                if node.connections:
-                    connects_to += f"{len(node.connections)}"
-                    for connection in node.connections:
-                        connection = repr(connection)
-                        links = connection.removeprefix("Connection(FN Site ").removesuffix(")")
-                        links = links.split(", FN Site")
-                        for link in links:
-                            link = link.strip(" ")
-                            if link != node.name.removeprefix("FN Site "):
-                                connects_to += f"\n     * {link}"
-                else:
-                    connects_to += "0"
-                print(connects_to)
-                print(f"- Installed Probe: {node.probe_slot.installed_probe.name}")
-
-
-    def save_game_data_to_file(self, file_name="current_frontiernav_game_data.txt"):
-        # Creates a .txt file with the current data for FrontierNav
-        lines = []
-        lines.append("---- Xenoblade Chronicles X: Definitive Edition ----")
-        lines.append("----------------- FrontierNav Data -----------------\n")
-
-        for region in self.nodes:
-            lines.append(f"\n>>> {region} <<<")
-            for node_id in self.nodes[region]:
-                node = self.nodes[region][node_id]
-                lines.append(f"\n{node.name}")
-                lines.append(f"- Production Rank: {node.prod_rank.value[0]}")
-                lines.append(f"- Revenue Rank: {node.rev_rank.value[0]}")
-                lines.append(f"- Combat Rank: {node.combat_rank}")
-                
-                ssing_sites = "- Sightseeing Sites: "
-                if node.sightseeing:
-                    ssing_sites += f"{len(node.sightseeing)}"
-                    for i in range(len(node.sightseeing)):
-                        ssing_sites += f"\n     * {node.sightseeing[i]}"
-                else:
-                    ssing_sites += "0"
-                lines.append(ssing_sites)
-
-                resources = "- Precious Resources: "
-                if node.prec_resources:
-                    resources += f"{len(node.prec_resources)}"
-                    for i in range(len(node.prec_resources)):
-                        resources += f"\n     * {node.prec_resources[i]}"
-                else:
-                    resources += "0"
-                lines.append(resources)
-                
-                connects_to = "- Connected To: "
-                if node.connections:
-                    connects_to += f"{len(node.connections)}"
-                    for connection in node.connections:
-                        connection = repr(connection)
-                        links = connection.removeprefix("Connection(FN Site ").removesuffix(")")
-                        links = links.split(", FN Site")
-                        for link in links:
-                            link = link.strip(" ")
-                            if link != node.name.removeprefix("FN Site "):
-                                connects_to += f"\n     * {link}"
-                else:
-                    connects_to += "0"
-                lines.append(connects_to)
-                lines.append(f"- Installed Probe: {node.probe_slot.installed_probe.name}")
-        
-        with open(file_name, "w", encoding="utf-8") as f:
-            f.write("\n".join(lines))
+    def probe_changing(self, slot):
+        # Called by a ProbeSlot right before its probe is replaced
+        self._mark_dirty(slot)
+        self.link_index.remove_slot(slot)
+
+    def probe_changed(self, slot):
+        # Called by a ProbeSlot right after its probe is replaced
+        self.link_index.add_slot(slot)
+        self._mark_dirty(slot)
+
+    def _mark_dirty(self, slot):
+        # Marks every slot whose output depends on the probe installed in slot:
+        # the slot itself, its neighbours (boosters and duplicators) and its link group.
+        # Slots next to a group of duplicators also get that group's link multiplier.
+        if not self.incremental or not self._calculated:
+            return
+
+        self._dirty_slots.add(slot)
+        self._dirty_slots.update(slot.get_adjacent_slots())
+
+        # Only these probe types use the size of their link group, so the groups of any other
+        # type (ex. a map full of Basic Probes) don't need recalculating
+        if slot.installed_probe.probe_type not in LINKED_TYPES:
+            return
+
+        for linked_slot in slot.get_linked_slots():
+            self._dirty_slots.add(linked_slot)
+            if linked_slot.installed_probe.probe_type == ProbeType.DUPLICATOR:
+                self._dirty_slots.update(linked_slot.get_adjacent_slots())
+
+    def find_probe(self, probe_name):
+        return self.probe_index.find(probe_name)
+
+    def get_loadout(self):
+        # Returns the installed probes in the same format as the GUI's saved probe setups
+        return {key: slot.installed_probe.name for key, slot in zip(self.slot_keys, self.slot_table)}
+
+    def apply_loadout(self, setup):
+        # Installs the probes from a saved probe setup, keys that aren't on this map are skipped
+        for key, probe_name in setup.items():
+            probe_slot = self.slot_lookup.get(key)
+            if probe_slot is None:
+                continue
+
+            selected_probe = self.probe_index.find(probe_name)
+            if selected_probe:
+                probe_slot.install_probe(selected_probe)
+            else:
+                probe_slot.lock_probe()
+
+    def optimize(self, objective, budget=None, constraints=None, method="anneal", restarts=4, iterations=None, seed=None):
+        # Searches for the loadout with the best weighted output and leaves it installed.
+        # objective:    "miranium", "credits", "storage" or a dict of weights (ex. {"miranium": 1, "credits": 0.5})
+        # budget:       the most the installed probes may cost in total, or None for no limit
+        # constraints:  optional dict with "probes" (probe names that may be used),
+        #               "fixed" ({"Region_nodeid": probe name}) and "locked" (["Region_nodeid"])
+        # method:       "anneal" for a fast simulated annealing search, or "exact" for a provably
+        #               optimal loadout (best used with a short list of probes in constraints)
+        # restarts, iterations and seed are for "anneal", by default the number of moves per restart
+        # grows with the number of free slots and probes (see LoadoutOptimizer.default_iterations)
+        # The solvers are imported here rather than at the top so scripts that only calculate totals start faster
+        if method == "exact":
+            from exact import ExactSolver
+            return ExactSolver(self, objective, budget, constraints).run()
+        elif method == "anneal":
+            from optimizer import LoadoutOptimizer
+            optimizer = LoadoutOptimizer(self, objective, budget, constraints)
+            return optimizer.run(restarts, iterations, seed)
+        else:
+            raise ValueError(f"Unknown optimize method '{method}', expected 'anneal' or 'exact'")
+
+    def plan_upgrades(self, target, constraints=None, beam_width=3, branching=4, max_steps=200, patience=5,
+                      exact_work=None):
+        # Plans a cheap order of probe purchases that takes the installed loadout to the target totals
+        # (ex. {"miranium": 30000}), the cheapest found rather than a proven cheapest (see planner.py).
+        # The installed loadout isn't changed.
+        from planner import UpgradePlanner, EXACT_WORK
+        if exact_work is None:
+            exact_work = EXACT_WORK
+        return UpgradePlanner(self, target, constraints, beam_width, branching, max_steps, patience, exact_work).run()
+
+    def print_game_data(self, output_format="text"):
+        # Prints current data for FrontierNav in the terminal (see report.py)
+        from report import write_report
+        write_report(self, None, output_format, terminal=True)
+
+    def save_game_data_to_file(self, file_name="current_frontiernav_game_data.txt", output_format="text"):
+        # Writes the current data for FrontierNav to a file as "text", "csv" or "jsonl" (see report.py)
+        from report import write_report
+        write_report(self, file_name, output_format)
 
     @staticmethod
     def load_game_data(node_data):
         # Creates a nodes dictionary
         nodes = {}
-        all_node_ids = set()
+        node_regions = {}       # Node id -> region, so connections can cross into any region
         for region, region_nodes_data in node_data.items():
             nodes[region] = {}
             for node_id, name, prod_rank, rev_rank, combat_rank, sightseeing, prec_resources, _ in region_nodes_data:
                 nodes[region][node_id] = Node(name, prod_rank, rev_rank, combat_rank, sightseeing, prec_resources)
-                all_node_ids.add(node_id)
+                node_regions[node_id] = region
 
         # Creates connections between nodes which are connected in game for adjacent bonuses
         connections = []
@@ -166,21 +338,11 @@ class FrontierNav:
                 connected_ids = node_info[7]
 
                 for connected_id in connected_ids:
-                    if connected_id in all_node_ids:
+                    if connected_id in node_regions:
                         if connected_id in nodes[region]:
                             connected_region = region
-                        elif connected_id.startswith("fn1"):
-                            connected_region = "Primordia"
-                        elif connected_id.startswith("fn2"):
-                            connected_region = "Noctilum"
-                        elif connected_id.startswith("fn3"):
-                            connected_region = "Oblivia"
-                        elif connected_id.startswith("fn4"):
-                            connected_region = "Sylvalum"
-                        elif connected_id.startswith("fn5"):
-                            connected_region = "Cauldros"
                         else:
-                            print(f"Warning: {connected_ids} is not in a valid region")
+                            connected_region = node_regions[connected_id]
 
                         if frozenset([node_id, connected_id]) not in made_connections:
                             connections.append(Connection(nodes[region][node_id], nodes[connected_region][connected_id]))
@@ -188,6 +350,9 @@ class FrontierNav:
                     else:
                         print(f"Warning: Cannot create Connection between {node_id} and {connected_id} as {connected_id} node does not exist!")
 
+        # Index-based copy of the map for array code (see CompiledGraph)
+        graph = CompiledGraph(node for region_nodes in nodes.values() for node in region_nodes.values())
+
         # Creates a probe slot for each node
         slots = {}
         for region, region_nodes in nodes.items():
@@ -227,6 +392,8 @@ class FrontierNav:
         return {
             "nodes": nodes,
             "connections": connections,
+            "graph": graph,
             "slots": slots,
-            "probes": probes
+            "probes": probes,
+            "probe_index": ProbeIndex(probes)
         }
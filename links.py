@@ -0,0 +1,122 @@
+from collections import deque
+from probes import ProbeType, get_links_multiplier
+
+class LinkComponent:
+    # A group of connected ProbeSlots that all have a probe of the same type and gen installed
+    def __init__(self, key):
+        self.key = key          # The (ProbeType, gen) pair shared by every slot in the component
+        self.slots = set()      # The ProbeSlots in the component
+
+    def __len__(self):
+        return len(self.slots)
+
+    def __repr__(self):
+        return f"LinkComponent({self.key}, {len(self.slots)} slots)"
+
+
+class LinkIndex:
+    # Keeps every ProbeSlot's link component so the link multiplier can be read without a search.
+    # The index is built once for a loadout, then kept up to date one probe change at a time
+    # through remove_slot (before the probe is replaced) and add_slot (after it is replaced).
+    def __init__(self, slots):
+        self.components = {}    # ProbeSlot -> LinkComponent, locked slots are not in any component
+
+        for slot in slots:
+            if slot not in self.components and self.link_key(slot) is not None:
+                self._build_component(slot)
+
+    @staticmethod
+    def link_key(slot):
+        probe = slot.installed_probe
+        if not probe or probe.probe_type is None or probe.probe_type is ProbeType.LOCKED:
+            return None
+        return (probe.probe_type, probe.gen)
+
+    def get_component(self, slot):
+        return self.components.get(slot)
+
+    def get_linked_slots(self, slot):
+        component = self.components.get(slot)
+        if component is None:
+            return {slot}
+        return component.slots
+
+    def get_multiplier(self, slot):
+        component = self.components.get(slot)
+        if component is None:
+            return 0
+        return get_links_multiplier(len(component))
+
+    def remove_slot(self, slot):
+        component = self.components.pop(slot, None)
+        if component is None:
+            return
+
+        component.slots.discard(slot)
+        linked_neighbours = [adj_slot for adj_slot in slot.get_adjacent_slots() if adj_slot in component.slots]
+        if len(linked_neighbours) <= 1:
+            # Removing a slot at the end of a chain can't split the component
+            return
+
+        # The slot may have been the only thing joining its neighbours, so each one is searched
+        # again and any part that is no longer reachable becomes its own component
+        for adj_slot in linked_neighbours[1:]:
+            if self.components[adj_slot] is component:
+                reachable = self._find_linked(adj_slot, component.slots)
+                if len(reachable) < len(component.slots):
+                    new_component = LinkComponent(component.key)
+                    new_component.slots = reachable
+                    component.slots -= reachable
+                    for linked_slot in reachable:
+                        self.components[linked_slot] = new_component
+
+    def add_slot(self, slot):
+        key = self.link_key(slot)
+        if key is None:
+            return
+
+        neighbour_components = []
+        for adj_slot in slot.get_adjacent_slots():
+            adj_component = self.components.get(adj_slot)
+            if adj_component is not None and adj_component.key == key and adj_component not in neighbour_components:
+                neighbour_components.append(adj_component)
+
+        if not neighbour_components:
+            component = LinkComponent(key)
+        else:
+            # Merges the smaller components into the largest one
+            neighbour_components.sort(key=len, reverse=True)
+            component = neighbour_components[0]
+            for other in neighbour_components[1:]:
+                for linked_slot in other.slots:
+                    self.components[linked_slot] = component
+                component.slots |= other.slots
+
+        component.slots.add(slot)
+        self.components[slot] = component
+
+    def _build_component(self, slot):
+        component = LinkComponent(self.link_key(slot))
+        component.slots = self._find_linked(slot)
+        for linked_slot in component.slots:
+            self.components[linked_slot] = component
+
+    def _find_linked(self, start_slot, allowed=None):
+        # Breadth-first search over slots with the same link key as start_slot,
+        # optionally limited to the slots in allowed
+        key = self.link_key(start_slot)
+        found = {start_slot}
+        queue = deque([start_slot])
+
+        while queue:
+            current_slot = queue.popleft()
+            for adj_slot in current_slot.get_adjacent_slots():
+                if adj_slot in found:
+                    continue
+                if allowed is not None and adj_slot not in allowed:
+                    continue
+                if self.link_key(adj_slot) == key:
+                    found.add(adj_slot)
+                    queue.append(adj_slot)
+
+        return found
@@ -0,0 +1,161 @@
+import os
+import struct
+
+# Packed loadouts: one byte per slot, holding the probe's position in a probe table.
+# Slots are in FrontierNav.slot_table order and probes are in FrontierNav.probes order, the same
+# ids BatchEvaluator uses, so stored rows can be scored without decoding them (after swapping
+# MISSING for the locked probe's id).
+#
+# A LoadoutStore file starts with a header holding its own copy of the slot keys and probe names,
+# so a store stays readable after the map or probe list changes, followed by fixed-size records
+# that are only ever appended.
+
+MAGIC = b"FNLOAD\0\0"
+VERSION = 1
+HEADER = struct.Struct("<8sIIII")     # Magic, version, slot count, probe count, length of the name table
+MISSING = 255                         # Slot not mentioned in the saved setup
+MAX_PROBES = 255
+
+class LoadoutCodec:
+    # Converts between saved probe setups ({"Region_nodeid": probe name}) and packed bytes
+    def __init__(self, slot_keys, probe_names):
+        if len(probe_names) > MAX_PROBES:
+            raise ValueError(f"Packed loadouts support up to {MAX_PROBES} probes, got {len(probe_names)}")
+        self.slot_keys = list(slot_keys)
+        self.probe_names = list(probe_names)
+        self.slot_index = {key: i for i, key in enumerate(self.slot_keys)}
+        self.probe_ids = {name: probe_id for probe_id, name in enumerate(self.probe_names)}
+
+    @classmethod
+    def from_frontier_nav(cls, frontier_nav):
+        return cls(frontier_nav.slot_keys, [probe.name for probe in frontier_nav.probe_index.probes])
+
+    def __len__(self):
+        return len(self.slot_keys)
+
+    def encode(self, setup):
+        packed = bytearray([MISSING]) * len(self.slot_keys)
+        for key, probe_name in setup.items():
+            slot = self.slot_index.get(key)
+            if slot is None:
+                raise ValueError(f"Unknown slot in loadout: {key}")
+            probe_id = self.probe_ids.get(probe_name)
+            if probe_id is None:
+                raise ValueError(f"Unknown probe in loadout: {probe_name}")
+            packed[slot] = probe_id
+        return bytes(packed)
+
+    def decode(self, packed):
+        # Returns the setup with its keys in slot order, which is also the order the GUI saves them in
+        if len(packed) != len(self.slot_keys):
+            raise ValueError(f"Packed loadout has {len(packed)} slots, expected {len(self.slot_keys)}")
+        for probe_id in packed:
+            if probe_id != MISSING and probe_id >= len(self.probe_names):
+                raise ValueError(f"Packed loadout has probe {probe_id}, the probe table only has {len(self.probe_names)}")
+        return {key: self.probe_names[probe_id] for key, probe_id in zip(self.slot_keys, packed) if probe_id != MISSING}
+
+
+class LoadoutStore:
+    # An append-only file of packed loadouts with random access by index.
+    # Opening an existing store uses the slot keys and probe names saved in it; a new store
+    # needs a codec (ex. LoadoutCodec.from_frontier_nav(frontier_nav)).
+    def __init__(self, file_name, codec=None):
+        self.file_name = file_name
+
+        if os.path.exists(file_name) and os.path.getsize(file_name) > 0:
+            with open(file_name, "rb") as f:
+                self.codec, self.data_start = self._read_header(f)
+            if codec is not None and (codec.slot_keys != self.codec.slot_keys or codec.probe_names != self.codec.probe_names):
+                raise ValueError(f"{file_name} was written for a different map or probe list")
+        elif codec is None:
+            raise ValueError(f"{file_name} doesn't exist, a codec is needed to create it")
+        else:
+            self.codec = codec
+            self.data_start = self._write_header(codec)
+
+        self.record_size = len(self.codec)
+        self._file = open(file_name, "r+b")
+
+    def _read_header(self, f):
+        header = f.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise ValueError(f"{self.file_name} is not a loadout store")
+        magic, version, slot_count, probe_count, names_length = HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError(f"{self.file_name} is not a loadout store")
+        if version != VERSION:
+            raise ValueError(f"{self.file_name} is loadout store version {version}, expected version {VERSION}")
+
+        names = f.read(names_length).decode("utf-8").split("\n")
+        codec = LoadoutCodec(names[:slot_count], names[slot_count:slot_count + probe_count])
+        return codec, HEADER.size + names_length
+
+    def _write_header(self, codec):
+        names = "\n".join(codec.slot_keys + codec.probe_names).encode("utf-8")
+        with open(self.file_name, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(codec.slot_keys), len(codec.probe_names), len(names)))
+            f.write(names)
+        return HEADER.size + len(names)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self._file.close()
+
+    def __len__(self):
+        # A record cut short (ex. by a crash while appending) isn't counted
+        self._file.seek(0, os.SEEK_END)
+        return (self._file.tell() - self.data_start) // self.record_size
+
+    def __getitem__(self, index):
+        return self.codec.decode(self.read_packed(index))
+
+    def __iter__(self):
+        for start in range(0, len(self), 4096):
+            packed = self.read_packed_range(start, start + 4096)
+            for offset in range(0, len(packed), self.record_size):
+                yield self.codec.decode(packed[offset:offset + self.record_size])
+
+    def append(self, setup):
+        # Returns the index of the new loadout
+        return self.append_packed([self.codec.encode(setup)])
+
+    def extend(self, setups):
+        # Bulk write, returns the index of the first new loadout
+        return self.append_packed([self.codec.encode(setup) for setup in setups])
+
+    def append_packed(self, rows):
+        # Writes already packed rows (bytes, or numpy rows of probe ids as uint8) in one go
+        rows = [bytes(row) for row in rows]
+        for row in rows:
+            if len(row) != self.record_size:
+                raise ValueError(f"Packed loadout has {len(row)} slots, expected {self.record_size}")
+
+        count = len(self)
+        self._file.seek(self.data_start + count * self.record_size)
+        self._file.write(b"".join(rows))
+        self._file.truncate()
+        self._file.flush()
+        return count
+
+    def read_packed(self, index):
+        count = len(self)
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError(f"Loadout {index} is out of range, the store has {count}")
+        self._file.seek(self.data_start + index * self.record_size)
+        return self._file.read(self.record_size)
+
+    def read_packed_range(self, start, stop):
+        # Returns the packed rows start to stop-1 as one bytes object of record_size bytes per row
+        # (ex. numpy.frombuffer(packed, numpy.uint8).reshape(-1, store.record_size))
+        stop = min(stop, len(self))
+        if start >= stop:
+            return b""
+        self._file.seek(self.data_start + start * self.record_size)
+        return self._file.read((stop - start) * self.record_size)
@@ -1,8 +1,15 @@
-from data import NODE_DATA, TEST_DATA 
-from frontiernav import FrontierNav
-from window import GUI
+import sys
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        # Headless commands (see cli.py), these never import tkinter
+        from cli import main
+        sys.exit(main())
+
+    # The map data is only built for the GUI, headless commands load the map they're asked for
+    from data import NODE_DATA, TEST_DATA
+    from frontiernav import FrontierNav
+
     #frontier_nav = FrontierNav(FrontierNav.load_game_data(NODE_DATA))
     # probe1 = frontier_nav.probes["mining"][5]
     # probe2 = frontier_nav.probes["booster"][1]
@@ -16,4 +23,5 @@ if __name__ == "__main__":
     # frontier_nav.nodes["Primordia"]["fn109"].probe_slot.install_probe(probe3)
     # #print(frontier_nav.calculate_total())
     #print(frontier_nav.slots)
+    from window import GUI
     GUI(NODE_DATA)
\ No newline at end of file
@@ -0,0 +1,170 @@
+import argparse
+import random
+from nodes import ProdRank, RevRank
+
+# Synthetic maps in the same format as NODE_DATA, for testing how the engine scales.
+# The same arguments and seed always give the same map, and the same seed gives the same loadouts.
+#
+#   node_data = make_node_data(100000, seed=1)
+#   frontier_nav = FrontierNav(FrontierNav.load_game_data(node_data))
+#   setup = random_loadout(frontier_nav, random.Random(1))
+#
+#   python mapgen.py 1000000 --seed 1 --output million.snapshot    Writes a map as a snapshot (see snapshot.py)
+
+REGIONS = ["Primordia", "Noctilum", "Oblivia", "Sylvalum", "Cauldros"]
+RESOURCES = ["Arc Sand Ore", "Aurorite", "Dawnstone", "Foucaultium", "White Cometite"]
+
+def make_node_data(n_nodes, seed=0, regions=REGIONS, max_degree=4, degree_weights=None,
+                   prod_weights=None, rev_weights=None, cross_region_edges=None,
+                   sightseeing_rate=0.2, resource_rate=0.3):
+    # n_nodes:              number of nodes, split evenly between the regions
+    # regions:              list of region names, or a number of regions
+    # max_degree:           most connections a node can have (NODE_DATA has at most 4)
+    # degree_weights:       optional {connections: weight}, each node's most connections is picked
+    #                       from these instead of using max_degree for every node
+    # prod_weights:         optional {ProdRank: weight}, every rank is equally likely by default
+    # rev_weights:          optional {RevRank: weight}, every rank is equally likely by default
+    # cross_region_edges:   None grows one tree over the whole map, so connections cross between
+    #                       regions wherever they happen to. A number grows a tree per region, joins
+    #                       the regions in a chain and then adds that many extra connections between
+    #                       random nodes of different regions (which makes the map no longer a tree).
+    # sightseeing_rate:     chance of a node having a sightseeing spot
+    # resource_rate:        chance of a node having 1 to 3 precious resources
+    rng = random.Random(seed)
+    if isinstance(regions, int):
+        regions = [REGIONS[i] if i < len(REGIONS) else f"Region {i + 1}" for i in range(regions)]
+    node_ids = [f"sn{i}" for i in range(n_nodes)]
+    node_regions = [i * len(regions) // n_nodes for i in range(n_nodes)]
+    connected = [[] for i in range(n_nodes)]
+
+    if degree_weights is None:
+        capacity = [max_degree] * n_nodes
+    else:
+        degrees = list(degree_weights)
+        weights = [degree_weights[degree] for degree in degrees]
+        capacity = [max(1, degree) for degree in rng.choices(degrees, weights, k=n_nodes)]
+
+    if cross_region_edges is None:
+        _grow_tree(range(n_nodes), capacity, connected, node_ids, rng)
+    else:
+        region_starts = [0]
+        for i in range(1, n_nodes):
+            if node_regions[i] != node_regions[i - 1]:
+                region_starts.append(i)
+        region_starts.append(n_nodes)
+        for start, stop in zip(region_starts, region_starts[1:]):
+            _grow_tree(range(start, stop), capacity, connected, node_ids, rng)
+
+        # Joins each region to the one before it, then adds the extra connections
+        for r in range(1, len(region_starts) - 1):
+            a = _pick_open_node(region_starts[r - 1], region_starts[r], capacity, connected, rng)
+            b = _pick_open_node(region_starts[r], region_starts[r + 1], capacity, connected, rng)
+            _connect(a, b, connected, node_ids)
+        if len(region_starts) > 2:
+            added = 0
+            attempts = 0
+            while added < cross_region_edges and attempts < cross_region_edges * 20:
+                attempts += 1
+                a = rng.randrange(n_nodes)
+                b = rng.randrange(n_nodes)
+                if node_regions[a] == node_regions[b] or node_ids[b] in connected[a]:
+                    continue
+                if len(connected[a]) >= capacity[a] or len(connected[b]) >= capacity[b]:
+                    continue
+                _connect(a, b, connected, node_ids)
+                added += 1
+
+    prod_ranks = list(ProdRank)
+    rev_ranks = list(RevRank)
+    prod_rank_weights = None if prod_weights is None else [prod_weights.get(rank, 0) for rank in prod_ranks]
+    rev_rank_weights = None if rev_weights is None else [rev_weights.get(rank, 0) for rank in rev_ranks]
+
+    node_data = {region: [] for region in regions}
+    for i, node_id in enumerate(node_ids):
+        sightseeing = ["Sightseeing Spot"] if rng.random() < sightseeing_rate else None
+        prec_resources = rng.sample(RESOURCES, rng.randint(1, 3)) if rng.random() < resource_rate else None
+        if prod_rank_weights is None:
+            prod_rank = rng.choice(prod_ranks)
+        else:
+            prod_rank = rng.choices(prod_ranks, prod_rank_weights)[0]
+        if rev_rank_weights is None:
+            rev_rank = rng.choice(rev_ranks)
+        else:
+            rev_rank = rng.choices(rev_ranks, rev_rank_weights)[0]
+        node_data[regions[node_regions[i]]].append((node_id, f"Synthetic Site {i}", prod_rank, rev_rank,
+                                                    "B", sightseeing, prec_resources, connected[i]))
+    return node_data
+
+def _grow_tree(indices, capacity, connected, node_ids, rng):
+    # Joins each node in turn to a random earlier node that still has room for another connection.
+    # open_nodes is kept unordered with open_positions so full nodes are removed in constant time.
+    indices = list(indices)
+    if not indices:
+        return
+    open_nodes = [indices[0]]
+    open_positions = {indices[0]: 0}
+    for i in indices[1:]:
+        if not open_nodes:
+            # Every earlier node is full (only possible with degree_weights), so the newest one takes another
+            parent = i - 1
+        else:
+            parent = rng.choice(open_nodes)
+        _connect(parent, i, connected, node_ids)
+        if len(connected[parent]) >= capacity[parent] and parent in open_positions:
+            position = open_positions.pop(parent)
+            last = open_nodes.pop()
+            if last != parent:
+                open_nodes[position] = last
+                open_positions[last] = position
+        if len(connected[i]) < capacity[i]:
+            open_positions[i] = len(open_nodes)
+            open_nodes.append(i)
+
+def _pick_open_node(start, stop, capacity, connected, rng):
+    # A random node from start to stop-1 with room for another connection, or any of them if
+    # none turn up after a few tries
+    for attempt in range(100):
+        i = rng.randrange(start, stop)
+        if len(connected[i]) < capacity[i]:
+            return i
+    return rng.randrange(start, stop)
+
+def _connect(a, b, connected, node_ids):
+    connected[a].append(node_ids[b])
+    connected[b].append(node_ids[a])
+
+
+def random_loadout(frontier_nav, rng, probes=None):
+    # A probe picked at random from probes (every probe by default) for every slot of the map
+    probes = probes or frontier_nav.probe_index.probes
+    return {key: rng.choice(probes).name for key in frontier_nav.slot_keys}
+
+def random_loadouts(frontier_nav, count, seed=0, probes=None):
+    # Yields count random loadouts, the same ones for the same seed
+    rng = random.Random(seed)
+    for i in range(count):
+        yield random_loadout(frontier_nav, rng, probes)
+
+
+def main(argv=None):
+    from frontiernav import FrontierNav
+    from snapshot import write_snapshot
+
+    parser = argparse.ArgumentParser(description="Generate a synthetic FrontierNav map and write it as a snapshot")
+    parser.add_argument("nodes", type=int, help="number of nodes")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--regions", type=int, default=len(REGIONS), help="number of regions")
+    parser.add_argument("--max-degree", type=int, default=4, help="most connections a node can have")
+    parser.add_argument("--cross-region-edges", type=int,
+                        help="grow each region separately and add this many extra connections between regions")
+    parser.add_argument("--output", default="synthetic.snapshot", help="snapshot file to write")
+    args = parser.parse_args(argv)
+
+    node_data = make_node_data(args.nodes, args.seed, args.regions, args.max_degree,
+                               cross_region_edges=args.cross_region_edges)
+    write_snapshot(FrontierNav.load_game_data(node_data), args.output)
+    print(f"Wrote {args.nodes} nodes to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+from collections import OrderedDict
+from probes import calculate_base_output
+
+class OutputCache:
+    # A size-limited memo of slot outputs, keyed by everything a slot's output depends on:
+    # the node's ranks, sightseeing and precious resources, the probe, the neighbouring probes
+    # in order and the link multipliers (see EvaluationContext.signature). Slots on different
+    # nodes with the same local setup share an entry.
+    #
+    # The least recently used entry is dropped once maxsize entries are stored.
+    def __init__(self, maxsize=65536):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()    # Signature -> output and stages (see calculate_slot_stages)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __repr__(self):
+        return f"OutputCache({len(self.entries)}/{self.maxsize} entries, {self.hits} hits, {self.misses} misses, {self.evictions} evictions)"
+
+    def get_output(self, context, copied_outputs=None):
+        # Returns the output and stages for an EvaluationContext (see calculate_slot_stages),
+        # calculating them only on a miss (with copied_outputs, a CopiedOutputCache, if given).
+        # The prec_resources list is shared, so it must not be changed.
+        signature = context.signature()
+        output = self.entries.get(signature)
+        if output is not None:
+            self.hits += 1
+            self.entries.move_to_end(signature)
+            return output
+
+        self.misses += 1
+        output = context.calculate_stages(copied_outputs)
+        self.entries[signature] = output
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+        return output
+
+    def clear(self):
+        self.entries.clear()
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit rate": self.hits / lookups if lookups else 0.0
+        }
+
+
+class CopiedOutputCache:
+    # A size-limited memo of the base outputs duplicators copy, keyed by (node signature, probe).
+    # A duplicator copies a neighbour's probe as if it were installed on the duplicator's own node,
+    # and a non-duplicator's base output only depends on those two, so an entry never goes out of
+    # date and every duplicator on a node with the same signature next to the same probe reuses it.
+    #
+    # Every entry is dropped at once when maxsize entries are stored, which keeps lookups to a
+    # single dict access.
+    def __init__(self, maxsize=65536):
+        self.maxsize = maxsize
+        self.entries = {}               # (node signature, probe) -> base output (see calculate_base_output)
+        self.hits = 0
+        self.misses = 0
+        self.clears = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __repr__(self):
+        return f"CopiedOutputCache({len(self.entries)}/{self.maxsize} entries, {self.hits} hits, {self.misses} misses, {self.clears} clears)"
+
+    def get_output(self, node, probe):
+        # The base output a duplicator at node copies from a neighbouring probe (which must not be
+        # a duplicator). The prec_resources list is shared, so it must not be changed.
+        key = (node.signature, probe)
+        output = self.entries.get(key)
+        if output is not None:
+            self.hits += 1
+            return output
+
+        self.misses += 1
+        output = calculate_base_output(node, probe)
+        if len(self.entries) >= self.maxsize:
+            self.entries.clear()
+            self.clears += 1
+        self.entries[key] = output
+        return output
+
+    def clear(self):
+        self.entries.clear()
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.clears = 0
+
+    def get_stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "clears": self.clears,
+            "hit rate": self.hits / lookups if lookups else 0.0
+        }
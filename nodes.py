@@ -1,4 +1,5 @@
 from enum import Enum
+from array import array
 
 class ProdRank(Enum):
     A = ("A", 500)    # Baseline of 500 miranium per tick
@@ -24,19 +25,19 @@ class Node:
         self.sightseeing = sightseeing              # A list of the node's sightseeing spots
         self.prec_resources = prec_resources        # A list of available precious resources from the node
 
+        # Everything about the node that a probe's output depends on, used to share cached outputs between nodes.
+        # The ranks are kept as their values, which hash much faster than the enum members.
+        self.signature = (prod_rank.value, rev_rank.value, len(sightseeing or []), tuple(prec_resources or []))
+
         self.connections = []       # List of Connection objects, not nodes
+        self.adjacent_nodes = ()    # Tuple of the connected nodes in connection order, kept up to date by Connection
 
         self.probe_slot = None      # The ProbeSlot that a Node is linked to
+        self.index = None           # Position of the node in its CompiledGraph
 
     def get_adjacent_nodes(self):
-        # Return a list of node objects that are connected to self
-        adjacent = []
-        for connection in self.connections:
-            if connection.node1 == self:
-                adjacent.append(connection.node2)
-            else:
-                adjacent.append(connection.node1)
-        return adjacent
+        # Return a tuple of node objects that are connected to self, shared rather than rebuilt on every call
+        return self.adjacent_nodes
     
     def __repr__(self):
         return f"Node({self.name}, {self.prod_rank}, {self.rev_rank}, {self.combat_rank}, {self.sightseeing}, {self.prec_resources})"
@@ -50,6 +51,8 @@ class Connection:
 
         node1.connections.append(self)
         node2.connections.append(self)
+        node1.adjacent_nodes += (node2,)
+        node2.adjacent_nodes += (node1,)
 
     def __repr__(self):
         return f"Connection({self.node1.name}, {self.node2.name})"
@@ -62,4 +65,52 @@ class Connection:
         else:
             raise ValueError(f"Node {node.name} is not part of this connection")
 
-  
\ No newline at end of file
+
+class CompiledGraph:
+    # A flat, index-based copy of a map for code that works on whole arrays of nodes.
+    # Node i's neighbours are targets[offsets[i]:offsets[i + 1]], in the same order as
+    # node.get_adjacent_nodes(), and every other array has one entry per node.
+    def __init__(self, nodes, arrays=None):
+        # arrays can hold ready-made "offsets", "targets", "prod_values", "rev_values",
+        # "sightseeing_counts" and "prec_resource_counts" sequences (ex. memoryviews of a
+        # snapshot file, see snapshot.py), which are used as they are instead of being built
+        self.nodes = list(nodes)
+
+        for i, node in enumerate(self.nodes):
+            node.index = i
+
+        if arrays is not None:
+            self.offsets = arrays["offsets"]
+            self.targets = arrays["targets"]
+            self.prod_values = arrays["prod_values"]
+            self.rev_values = arrays["rev_values"]
+            self.sightseeing_counts = arrays["sightseeing_counts"]
+            self.prec_resource_counts = arrays["prec_resource_counts"]
+            return
+
+        self.offsets = array("l", [0])
+        self.targets = array("l")
+        self.prod_values = array("d")               # Baseline miranium of each node's production rank
+        self.rev_values = array("d")                # Baseline credits of each node's revenue rank
+        self.sightseeing_counts = array("l")
+        self.prec_resource_counts = array("l")
+
+        for node in self.nodes:
+            self.targets.extend(adj_node.index for adj_node in node.adjacent_nodes)
+            self.offsets.append(len(self.targets))
+            self.prod_values.append(node.prod_rank.value[1])
+            self.rev_values.append(node.rev_rank.value[1])
+            self.sightseeing_counts.append(len(node.sightseeing or []))
+            self.prec_resource_counts.append(len(node.prec_resources or []))
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __repr__(self):
+        return f"CompiledGraph({len(self.nodes)} nodes, {len(self.targets) // 2} connections)"
+
+    def get_degree(self, index):
+        return self.offsets[index + 1] - self.offsets[index]
+
+    def get_neighbours(self, index):
+        return self.targets[self.offsets[index]:self.offsets[index + 1]]
@@ -0,0 +1,268 @@
+import math
+import random
+
+# Names accepted in an objective and the FrontierNav attribute holding each total
+OBJECTIVE_TOTALS = {
+    "miranium": "miranium",
+    "credits": "credits",
+    "storage": "storage"
+}
+
+def parse_objective(objective):
+    # An objective is either a single total ("miranium") or a dict of weights ({"miranium": 1, "credits": 0.5})
+    if isinstance(objective, str):
+        objective = {objective: 1}
+
+    for name in objective:
+        if name not in OBJECTIVE_TOTALS:
+            raise ValueError(f"Unknown objective '{name}', expected one of {list(OBJECTIVE_TOTALS)}")
+    return dict(objective)
+
+def parse_constraints(frontier_nav, constraints):
+    # Returns the probes that may be installed (every probe in the game by default) and a dict of
+    # "Region_nodeid" -> Probe for the slots the search may not change, where None keeps the slot locked
+    constraints = constraints or {}
+
+    if "probes" in constraints:
+        candidates = []
+        for probe_name in constraints["probes"]:
+            probe = frontier_nav.find_probe(probe_name)
+            if probe is None:
+                raise ValueError(f"Unknown probe in constraints: {probe_name}")
+            candidates.append(probe)
+    else:
+        candidates = list(frontier_nav.probe_index.probes)
+
+    fixed = {}
+    for key, probe_name in constraints.get("fixed", {}).items():
+        probe = frontier_nav.find_probe(probe_name)
+        if probe is None:
+            raise ValueError(f"Unknown probe in constraints: {probe_name}")
+        fixed[key] = probe
+    for key in constraints.get("locked", []):
+        fixed[key] = None
+
+    return candidates, fixed
+
+# Without an iterations count, each restart makes ITERATIONS_PER_OPTION moves per free slot and
+# candidate probe (about 48000 on NODE_DATA with every probe), at least MIN_ITERATIONS and at most
+# MAX_ITERATIONS. Fewer moves leave link groups half built: on NODE_DATA with a budget of 29000,
+# 3000 moves reached 23630 miranium and 48000 reach about 29000-29700.
+ITERATIONS_PER_OPTION = 20
+MIN_ITERATIONS = 3000
+MAX_ITERATIONS = 200000
+
+class LoadoutOptimizer:
+    # Searches for the probe loadout with the best weighted output using simulated annealing.
+    # Every move changes one slot and is scored with FrontierNav's incremental calculate_total,
+    # so only the slots around the change are recalculated.
+    def __init__(self, frontier_nav, objective, budget=None, constraints=None):
+        self.frontier_nav = frontier_nav
+        self.weights = parse_objective(objective)
+        self.budget = budget
+
+        self.candidates, self.fixed = parse_constraints(frontier_nav, constraints)
+
+        self.free_slots = []
+        for region in frontier_nav.slots:
+            for node_id, slot in frontier_nav.slots[region].items():
+                if f"{region}_{node_id}" not in self.fixed:
+                    self.free_slots.append(slot)
+
+    def score(self):
+        self.frontier_nav.calculate_total()
+        score = 0
+        for name, weight in self.weights.items():
+            score += weight * getattr(self.frontier_nav, OBJECTIVE_TOTALS[name])
+        return score
+
+    def run(self, restarts=4, iterations=None, seed=None):
+        rng = random.Random(seed)
+        frontier_nav = self.frontier_nav
+        if iterations is None:
+            iterations = self.default_iterations()
+
+        for region in frontier_nav.slots:
+            for node_id, slot in frontier_nav.slots[region].items():
+                key = f"{region}_{node_id}"
+                if key in self.fixed:
+                    if self.fixed[key] is None:
+                        slot.lock_probe()
+                    else:
+                        slot.install_probe(self.fixed[key])
+
+        for slot in self.free_slots:
+            slot.lock_probe()
+
+        frontier_nav.calculate_total()
+        if self.budget is not None and frontier_nav.cost > self.budget:
+            raise ValueError(f"The fixed probes cost {frontier_nav.cost}, which is over the budget of {self.budget}")
+
+        best_score = None
+        best_probes = None
+        for restart in range(restarts):
+            self._random_start(rng)
+            score, probes = self._anneal(rng, iterations)
+            if best_score is None or score > best_score:
+                best_score = score
+                best_probes = probes
+
+        # Leaves the best loadout found installed, after a final local search
+        for slot, probe in zip(self.free_slots, best_probes):
+            if slot.installed_probe is not probe:
+                slot.install_probe(probe)
+        best_score = self._hill_climb()
+
+        return {
+            "score": best_score,
+            "totals": frontier_nav.calculate_total(),
+            "loadout": frontier_nav.get_loadout()
+        }
+
+    def default_iterations(self):
+        iterations = ITERATIONS_PER_OPTION * len(self.free_slots) * len(self.candidates)
+        return min(max(iterations, MIN_ITERATIONS), MAX_ITERATIONS)
+
+    def _random_start(self, rng):
+        # Installs random probes in a random order, skipping any that would go over the budget
+        for slot in self.free_slots:
+            slot.lock_probe()
+        self.frontier_nav.calculate_total()
+
+        cost = self.frontier_nav.cost
+        order = list(self.free_slots)
+        rng.shuffle(order)
+        for slot in order:
+            probe = rng.choice(self.candidates)
+            if self.budget is None or cost + probe.cost <= self.budget:
+                slot.install_probe(probe)
+                cost += probe.cost
+
+    def _anneal(self, rng, iterations):
+        score = self.score()
+        cost = self.frontier_nav.cost
+        best_score = score
+        best_probes = [slot.installed_probe for slot in self.free_slots]
+
+        if not self.free_slots or len(self.candidates) < 2:
+            return best_score, best_probes
+
+        # Starts hot enough to accept an average bad move most of the time, then cools geometrically
+        start_temperature = self._estimate_temperature(rng, score)
+        end_temperature = start_temperature * 0.001
+        cooling = (end_temperature / start_temperature) ** (1 / max(iterations - 1, 1))
+
+        for i in range(iterations):
+            temperature = start_temperature * cooling ** i
+            slot = rng.choice(self.free_slots)
+            new_probe = rng.choice(self.candidates)
+            if new_probe is slot.installed_probe:
+                continue
+
+            changes = self._plan_move(rng, slot, new_probe, cost)
+            if changes is None:
+                continue
+
+            for changed_slot, old_probe, probe in changes:
+                changed_slot.install_probe(probe)
+            new_score = self.score()
+            change = new_score - score
+
+            if change >= 0 or rng.random() < math.exp(change / temperature):
+                score = new_score
+                cost = self.frontier_nav.cost
+                if score > best_score:
+                    best_score = score
+                    best_probes = [slot.installed_probe for slot in self.free_slots]
+            else:
+                for changed_slot, old_probe, probe in reversed(changes):
+                    changed_slot.install_probe(old_probe)
+
+        return best_score, best_probes
+
+    def _hill_climb(self):
+        # Tries every candidate in every free slot and keeps any change that improves the score,
+        # until a full pass finds nothing better
+        score = self.score()
+        cost = self.frontier_nav.cost
+        free_slots = set(self.free_slots)
+        improved = True
+        while improved:
+            improved = False
+            for slot in self.free_slots:
+                for probe in self.candidates:
+                    old_probe = slot.installed_probe
+                    if probe is old_probe:
+                        continue
+                    if self.budget is not None and cost - old_probe.cost + probe.cost > self.budget:
+                        continue
+
+                    slot.install_probe(probe)
+                    new_score = self.score()
+                    if new_score > score:
+                        score = new_score
+                        cost = self.frontier_nav.cost
+                        improved = True
+                    else:
+                        slot.install_probe(old_probe)
+
+            # Swapping the probes of two neighbouring slots keeps the cost, so a full budget can
+            # still move probes along the connections to join or leave link groups
+            for slot in self.free_slots:
+                for other_slot in slot.get_adjacent_slots():
+                    if other_slot is None or other_slot not in free_slots:
+                        continue
+                    probe = slot.installed_probe
+                    other_probe = other_slot.installed_probe
+                    if probe is other_probe:
+                        continue
+
+                    slot.install_probe(other_probe)
+                    other_slot.install_probe(probe)
+                    new_score = self.score()
+                    if new_score > score:
+                        score = new_score
+                        improved = True
+                    else:
+                        other_slot.install_probe(other_probe)
+                        slot.install_probe(probe)
+
+        self.score()
+        return score
+
+    def _plan_move(self, rng, slot, new_probe, cost):
+        # Returns the (slot, old probe, new probe) changes for a move. When the new probe doesn't fit
+        # in the budget, a few other random slots are swapped to the cheapest candidate to make room,
+        # otherwise a full budget would block every upgrade. Returns None if there's still no room.
+        changes = [(slot, slot.installed_probe, new_probe)]
+        new_cost = cost - slot.installed_probe.cost + new_probe.cost
+        if self.budget is None or new_cost <= self.budget:
+            return changes
+
+        cheapest = min(self.candidates, key=lambda probe: probe.cost)
+        changed_slots = {slot}
+        for attempt in range(4):
+            other_slot = rng.choice(self.free_slots)
+            if other_slot in changed_slots or other_slot.installed_probe.cost <= cheapest.cost:
+                continue
+
+            changes.append((other_slot, other_slot.installed_probe, cheapest))
+            changed_slots.add(other_slot)
+            new_cost -= other_slot.installed_probe.cost - cheapest.cost
+            if new_cost <= self.budget:
+                return changes
+
+        return None
+
+    def _estimate_temperature(self, rng, score):
+        changes = []
+        for i in range(20):
+            slot = rng.choice(self.free_slots)
+            old_probe = slot.installed_probe
+            slot.install_probe(rng.choice(self.candidates))
+            changes.append(abs(self.score() - score))
+            slot.install_probe(old_probe)
+
+        self.score()
+        average = sum(changes) / len(changes)
+        return average if average > 0 else 1.0
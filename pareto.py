@@ -0,0 +1,171 @@
+import numpy as np
+from batch import BatchEvaluator
+from optimizer import parse_constraints
+
+# Trade-offs between the four totals players care about: more miranium, credits and storage for
+# less probe cost. A loadout dominates another when it's at least as good on all four and better on
+# at least one; the Pareto front is every loadout nothing else dominates.
+#
+#   explorer = ParetoExplorer(frontier_nav)
+#   front = explorer.run(generations=200, seed=1)
+#
+# Loadouts are scored in batches by BatchEvaluator, and the front found so far is kept in a
+# ParetoArchive of at most archive_size loadouts, so memory stays the same however long it runs.
+
+AXES = ["total miranium", "total credits", "total storage", "total cost"]
+SIGNS = np.array([1, 1, 1, -1])      # Cost is minimized, so it's negated to make every axis "higher is better"
+
+def get_non_dominated(points, chunk_size=256):
+    # Returns a boolean mask of the rows of points (higher is better on every column) that no other
+    # row dominates. Rows are compared a chunk at a time to limit the size of the comparison arrays.
+    points = np.asarray(points)
+    keep = np.ones(len(points), dtype=bool)
+    for start in range(0, len(points), chunk_size):
+        chunk = points[start:start + chunk_size, np.newaxis, :]
+        at_least = (points[np.newaxis, :, :] >= chunk).all(axis=2)
+        better = (points[np.newaxis, :, :] > chunk).any(axis=2)
+        keep[start:start + chunk_size] = ~(at_least & better).any(axis=1)
+    return keep
+
+def get_crowding_distances(points):
+    # NSGA-II crowding distance: how far apart each point's neighbours are along every axis.
+    # The ends of each axis get infinity, so the extremes of the front are always kept.
+    count, n_axes = points.shape
+    distances = np.zeros(count)
+    if count <= 2:
+        distances[:] = np.inf
+        return distances
+
+    for axis in range(n_axes):
+        order = np.argsort(points[:, axis], kind="stable")
+        values = points[order, axis].astype(float)
+        spread = values[-1] - values[0]
+        distances[order[0]] = np.inf
+        distances[order[-1]] = np.inf
+        if spread > 0:
+            distances[order[1:-1]] += (values[2:] - values[:-2]) / spread
+    return distances
+
+
+class ParetoArchive:
+    # The non-dominated loadouts seen so far, as rows of probe ids with their totals.
+    # When more than maxsize loadouts are on the front, the most crowded ones are dropped.
+    def __init__(self, n_slots, maxsize=256):
+        self.maxsize = maxsize
+        self.rows = np.empty((0, n_slots), dtype=np.intp)
+        self.points = np.empty((0, len(AXES)), dtype=np.int64)     # Totals with the cost negated
+
+    def __len__(self):
+        return len(self.rows)
+
+    def add(self, rows, totals):
+        # Merges a batch of scored loadouts (totals as from BatchEvaluator.evaluate) into the archive.
+        # Returns the number of new loadouts that made it onto the front.
+        points = np.stack([totals[name] for name in AXES], axis=1) * SIGNS
+        points = np.concatenate([points, self.points])
+        rows = np.concatenate([np.asarray(rows, dtype=np.intp), self.rows])
+
+        # Loadouts with the same totals are only kept once, preferring the one already archived
+        points, first = np.unique(points[::-1], axis=0, return_index=True)
+        rows = rows[::-1][first]
+
+        keep = get_non_dominated(points)
+        points = points[keep]
+        rows = rows[keep]
+        if len(points) > self.maxsize:
+            keep = np.argsort(-get_crowding_distances(points), kind="stable")[:self.maxsize]
+            points = points[keep]
+            rows = rows[keep]
+
+        old_rows = {row.tobytes() for row in self.rows}
+        added = sum(1 for row in rows if row.tobytes() not in old_rows)
+        self.rows = rows
+        self.points = points
+        return added
+
+    def get_totals(self):
+        # The archived totals as a dict of arrays keyed like calculate_total
+        totals = self.points * SIGNS
+        return {name: totals[:, axis] for axis, name in enumerate(AXES)}
+
+
+class ParetoExplorer:
+    # An evolutionary search for the Pareto front. Each generation builds batch_size new loadouts
+    # from the archive, by changing a few random slots of one archived loadout or by mixing two of them,
+    # scores them all at once and merges them into the archive.
+    def __init__(self, frontier_nav, constraints=None, budget=None, archive_size=256, batch_size=1024):
+        self.evaluator = BatchEvaluator(frontier_nav)
+        self.budget = budget            # Loadouts costing more than this are never archived
+        self.batch_size = batch_size
+        self.archive = ParetoArchive(len(self.evaluator.keys), archive_size)
+
+        # Constraints work as in FrontierNav.optimize ("probes", "fixed" and "locked")
+        candidates, fixed = parse_constraints(frontier_nav, constraints)
+        evaluator = self.evaluator
+        self.candidates = np.array(sorted({evaluator.probe_ids[probe.name] for probe in candidates}), dtype=np.intp)
+        self.fixed_slots = []
+        self.fixed_ids = []
+        for key, probe in fixed.items():
+            if key not in evaluator.keys:
+                raise ValueError(f"Unknown slot in constraints: {key}")
+            self.fixed_slots.append(evaluator.keys.index(key))
+            self.fixed_ids.append(evaluator.locked_id if probe is None else evaluator.probe_ids[probe.name])
+        self.fixed_slots = np.array(self.fixed_slots, dtype=np.intp)
+        self.fixed_ids = np.array(self.fixed_ids, dtype=np.intp)
+
+    def run(self, generations=100, seed=None):
+        # Returns the front found, cheapest first, as a list of {"totals", "loadout"}
+        rng = np.random.default_rng(seed)
+        n_slots = len(self.evaluator.keys)
+
+        # Starts from an empty map and random loadouts of every density, so cheap and expensive
+        # parts of the front are both explored from the beginning
+        empty = np.full((1, n_slots), self.evaluator.locked_id, dtype=np.intp)
+        density = rng.random((self.batch_size - 1, 1))
+        rows = np.where(rng.random((self.batch_size - 1, n_slots)) < density,
+                        rng.choice(self.candidates, size=(self.batch_size - 1, n_slots)), self.evaluator.locked_id)
+        self._add(np.concatenate([empty, rows]))
+        if not len(self.archive):
+            raise ValueError(f"The fixed probes cost more than the budget of {self.budget}")
+
+        for generation in range(generations):
+            self._add(self._make_children(rng))
+
+        return self.get_front()
+
+    def _add(self, rows):
+        rows[:, self.fixed_slots] = self.fixed_ids
+        totals = self.evaluator.evaluate(rows)
+        if self.budget is not None:
+            affordable = totals["total cost"] <= self.budget
+            rows = rows[affordable]
+            totals = {name: values[affordable] for name, values in totals.items()}
+        return self.archive.add(rows, totals)
+
+    def _make_children(self, rng):
+        archive_rows = self.archive.rows
+        count = self.batch_size
+        n_slots = archive_rows.shape[1]
+        parents = archive_rows[rng.integers(len(archive_rows), size=count)]
+
+        # About a third are mixes of two archived loadouts, slot by slot
+        mixed = rng.random(count) < 0.3
+        others = archive_rows[rng.integers(len(archive_rows), size=count)]
+        from_other = mixed[:, np.newaxis] & (rng.random((count, n_slots)) < 0.5)
+        children = np.where(from_other, others, parents)
+
+        # Then every child gets one to a few slots changed, to a candidate probe or back to locked
+        changes = rng.geometric(0.5, size=count)
+        changed = rng.random((count, n_slots)) < (changes / n_slots)[:, np.newaxis]
+        changed[np.arange(count), rng.integers(n_slots, size=count)] = True
+        new_ids = rng.choice(self.candidates, size=(count, n_slots))
+        new_ids = np.where(rng.random((count, n_slots)) < 0.1, self.evaluator.locked_id, new_ids)
+        return np.where(changed, new_ids, children)
+
+    def get_front(self):
+        totals = self.archive.get_totals()
+        order = np.lexsort([-totals["total miranium"], totals["total cost"]])
+        return [{
+            "totals": {name: int(totals[name][i]) for name in AXES},
+            "loadout": self.evaluator.decode(self.archive.rows[i])
+        } for i in order]
@@ -0,0 +1,341 @@
+import math
+from probes import ProbeType
+from optimizer import OBJECTIVE_TOTALS, parse_constraints
+
+# Plans a cheap order of probe purchases that takes the installed loadout to a target, such
+# as {"miranium": 30000} or {"miranium": 30000, "credits": 50000}. Each purchase installs one probe
+# in one slot and costs that probe's price (nothing is refunded for the probe it replaces).
+#
+# The search is a beam search over purchase sequences. Every plan in the beam is scored with
+# FrontierNav.get_marginal_gains, so each possible purchase is evaluated with the incremental
+# calculation around its slot rather than a full recalculation. Besides single purchases, each
+# plan also tries bundles of purchases in one step, so long runs of cheap purchases (ex. a map of
+# free Basic Probes) don't need one search step each.
+#
+# The beam only looks a few purchases ahead, so on its own it misses plans that pay off late, like
+# building up a link group: to 30000 miranium from an empty NODE_DATA it finds a plan costing 30000,
+# where one costing 26000 exists. For a target on a single total, the cost of the beam's plan is then
+# used as the budget for ExactSolver.find_cheapest over a few of the cheapest candidate probes (as
+# many as EXACT_WORK allows, see exact.py), and its end state is bought instead when it's cheaper.
+# That finds the 26000 plan above in about 6s more. Targets on several totals, and maps with
+# cycles, are planned by the beam alone. Neither search looks at every probe, so a plan is the
+# cheapest one found, not a proven cheapest one.
+
+EXACT_WORK = 6e8        # Most work (as in exact.MAX_BUDGET_WORK) for the exact solver's plan, about 6s on NODE_DATA
+
+def parse_target(target):
+    # A target is a dict of the lowest acceptable totals, keyed like an objective
+    target = dict(target)
+    if not target:
+        raise ValueError("A target needs at least one total")
+    for name in target:
+        if name not in OBJECTIVE_TOTALS:
+            raise ValueError(f"Unknown target '{name}', expected one of {list(OBJECTIVE_TOTALS)}")
+    return target
+
+class UpgradePlanner:
+    # beam_width:   how many partial plans are kept after each purchase
+    # branching:    how many of the most cost-effective purchases are tried from each partial plan
+    # max_steps:    the most search steps (each adding one purchase or one bundle of purchases)
+    # patience:     search steps without finding a plan at least 1% cheaper before the search stops
+    # exact_work:   most work for the exact solver's plan (see EXACT_WORK), 0 only uses the beam
+    def __init__(self, frontier_nav, target, constraints=None, beam_width=3, branching=4, max_steps=200, patience=5,
+                 exact_work=EXACT_WORK):
+        self.frontier_nav = frontier_nav
+        self.target = parse_target(target)
+        self.beam_width = beam_width
+        self.branching = branching
+        self.max_steps = max_steps
+        self.patience = patience
+        self.exact_work = exact_work
+
+        # Constraints work as in FrontierNav.optimize, fixed and locked slots are never bought for.
+        # Only probes that can add to a target total are tried, locking a slot isn't a purchase.
+        candidates, fixed = parse_constraints(frontier_nav, constraints)
+        useful_types = {ProbeType.BOOSTER, ProbeType.DUPLICATOR}
+        if "miranium" in self.target or "credits" in self.target:
+            useful_types.update((ProbeType.BASIC, ProbeType.MINING, ProbeType.RESEARCH))
+        if "storage" in self.target:
+            useful_types.add(ProbeType.STORAGE)
+        self.candidates = [probe for probe in candidates if probe.probe_type in useful_types]
+        self.fixed = set(fixed)
+
+    def run(self):
+        # Returns {"reached", "cost", "steps", "totals", "loadout"}, where steps lists each purchase in
+        # order with the totals after it. When the target can't be reached within max_steps, the plan
+        # that got closest is returned with "reached" False. The installed loadout is left as it was.
+        frontier_nav = self.frontier_nav
+        start = [slot.installed_probe for slot in frontier_nav.slot_table]
+        start_totals = frontier_nav.calculate_total()
+        self.start_deficits = self._get_deficits(start_totals)
+
+        if self._get_remaining(self.start_deficits) == 0:
+            return self._describe(start, [], True)
+
+        best_plan = None            # (cost, purchases) of the cheapest plan that reaches the target
+        closest_plan = (self._get_remaining(self.start_deficits), 0, [])
+        beam = [(0, [])]            # (cost so far, purchases), a purchase being (slot index, probe)
+        steps_without_better = 0
+
+        try:
+            for step in range(self.max_steps):
+                children = {}
+                previous_best_cost = best_plan[0] if best_plan is not None else None
+                for cost, purchases in beam:
+                    self._install(start, purchases)
+                    for child_cost, child_estimate, child_purchases, remaining in self._expand(cost, purchases):
+                        if remaining == 0:
+                            if best_plan is None or child_cost < best_plan[0]:
+                                best_plan = (child_cost, child_purchases)
+                            continue
+                        if best_plan is not None and child_estimate >= best_plan[0]:
+                            continue
+                        if (remaining, child_cost) < closest_plan[:2]:
+                            closest_plan = (remaining, child_cost, child_purchases)
+
+                        # Two orders of the same purchases end up the same, only the cheaper one is kept
+                        key = frozenset(self._get_final_probes(child_purchases).items())
+                        if key not in children or child_estimate < children[key][0]:
+                            children[key] = (child_estimate, child_cost, child_purchases)
+
+                beam = [(child_cost, child_purchases) for child_estimate, child_cost, child_purchases
+                        in sorted(children.values(), key=lambda child: child[:2])[:self.beam_width]]
+                if not beam:
+                    break
+                if best_plan is not None:
+                    if previous_best_cost is None or best_plan[0] < previous_best_cost * 0.99:
+                        steps_without_better = 0
+                    else:
+                        steps_without_better += 1
+                    if steps_without_better >= self.patience:
+                        break
+
+            if best_plan is not None:
+                exact_plan = self._plan_exactly(start, best_plan[0])
+                if exact_plan is not None and exact_plan[0] < best_plan[0]:
+                    best_plan = exact_plan
+                return self._describe(start, best_plan[1], True)
+            return self._describe(start, closest_plan[2], False)
+        finally:
+            self._install(start, [])
+            frontier_nav.calculate_total()
+
+    def _expand(self, cost, purchases):
+        # Yields (cost, estimated total cost, purchases, remaining) for the next purchases to try:
+        # the most cost-effective single purchases, every free purchase at once, and a greedy bundle
+        # of the most cost-effective purchases that should cover the rest of the target. Bundles are
+        # checked with a real calculation, as purchases next to each other can change each other's gains.
+        # The estimate assumes the rest of the target is reached as cost-effectively as this step.
+        frontier_nav = self.frontier_nav
+        deficits = self._get_deficits(frontier_nav.calculate_total())
+        remaining = self._get_remaining(deficits)
+
+        options = []
+        for gain in frontier_nav.get_marginal_gains(self.candidates):
+            if gain["slot"] in self.fixed:
+                continue
+            new_deficits = {name: deficit - gain[name] for name, deficit in deficits.items()}
+            new_remaining = self._get_remaining(new_deficits)
+            progress = remaining - new_remaining
+            if progress <= 0:
+                continue
+            probe = frontier_nav.find_probe(gain["probe"])
+            options.append((probe.cost / progress, probe.cost, progress, new_remaining, frontier_nav.slot_lookup[gain["slot"]], probe))
+        options.sort(key=lambda option: option[:2])
+
+        singles = [option for option in options if option[1] > 0][:self.branching]
+        for price_per_progress, price, progress, new_remaining, slot, probe in singles:
+            yield cost + price, cost + price + new_remaining * price_per_progress, purchases + [(slot.index, probe)], new_remaining
+
+        for bundle in (self._get_bundle(options, remaining, free_only=True), self._get_bundle(options, remaining)):
+            if len(bundle) < 2:
+                continue
+            price = sum(probe.cost for slot, probe in bundle)
+            old_probes = [slot.installed_probe for slot, probe in bundle]
+            for slot, probe in bundle:
+                slot.install_probe(probe)
+            new_remaining = self._get_remaining(self._get_deficits(frontier_nav.calculate_total()))
+            for (slot, probe), old_probe in zip(bundle, old_probes):
+                slot.install_probe(old_probe)
+            frontier_nav.calculate_total()
+
+            progress = remaining - new_remaining
+            if progress <= 0:
+                continue
+            yield (cost + price, cost + price + new_remaining * price / progress,
+                   purchases + [(slot.index, probe) for slot, probe in bundle], new_remaining)
+
+    def _get_bundle(self, options, remaining, free_only=False):
+        # Picks one purchase per slot so the combined progress covers what remains for as little as
+        # possible (or every free purchase when free_only), and returns them as (slot, probe) pairs.
+        # For each slot only the purchases on the upper convex hull of (price, progress) are worth
+        # considering, and going one step along a hull has a price per progress that only rises, so
+        # taking the steps of every slot in order of price per progress upgrades each slot in turn.
+        by_slot = {}
+        for price_per_progress, price, progress, new_remaining, slot, probe in options:
+            by_slot.setdefault(slot, []).append((price, -progress, probe))
+
+        steps = []
+        for slot, slot_options in by_slot.items():
+            slot_options.sort(key=lambda option: option[:2])
+            hull = [(0, 0, None)]           # (price, progress, probe), starting from buying nothing
+            for price, negative_progress, probe in slot_options:
+                progress = -negative_progress
+                if progress <= hull[-1][1]:
+                    continue
+                while len(hull) >= 2 and ((hull[-1][1] - hull[-2][1]) * (price - hull[-2][0])
+                                          <= (progress - hull[-2][1]) * (hull[-1][0] - hull[-2][0])):
+                    hull.pop()
+                hull.append((price, progress, probe))
+            for i in range(1, len(hull)):
+                price = hull[i][0] - hull[i - 1][0]
+                progress = hull[i][1] - hull[i - 1][1]
+                steps.append((price / progress, i, price, progress, slot, hull[i][2]))
+        steps.sort(key=lambda step: step[:2])
+
+        bundle = {}
+        total_progress = 0
+        for price_per_progress, i, price, progress, slot, probe in steps:
+            if free_only and price > 0:
+                break
+            if not free_only and total_progress >= remaining:
+                break
+            bundle[slot] = probe
+            total_progress += progress
+        return list(bundle.items())
+
+    def _plan_exactly(self, start, budget):
+        # Returns (cost, purchases) that reach the target for at most budget, from the cheapest end
+        # state ExactSolver finds, or None. Slots with a bought probe (and fixed and locked slots)
+        # keep it, the others may stay as they are (Locked is an option) or get one candidate probe.
+        if len(self.target) != 1 or not self.exact_work or budget == 0:
+            return None
+        from exact import ExactSolver
+
+        frontier_nav = self.frontier_nav
+        locked = frontier_nav.probes["locked"][0]
+        fixed = {}
+        fixed_cost = 0
+        for key, probe in zip(frontier_nav.slot_keys, start):
+            if key in self.fixed or probe.cost > 0:
+                fixed[key] = probe.name
+                fixed_cost += probe.cost
+
+        # The cheapest probe of each type first, then the rest by price, for as long as the work allows
+        by_price = sorted(self.candidates, key=lambda probe: probe.cost)
+        cheapest = {}
+        for probe in by_price:
+            cheapest.setdefault(probe.probe_type, probe)
+        ordered = list(cheapest.values()) + [probe for probe in by_price if probe not in cheapest.values()]
+
+        (name, value), = self.target.items()
+        probes = [locked]
+        solver = None
+        for probe in ordered:
+            try:
+                next_solver = ExactSolver(frontier_nav, name, fixed_cost + budget,
+                                          {"probes": [probe.name for probe in probes + [probe]], "fixed": fixed})
+            except ValueError:
+                break
+            if next_solver.estimate_budget_work() > self.exact_work:
+                break
+            probes.append(probe)
+            solver = next_solver
+        if solver is None:
+            return None
+
+        try:
+            result = solver.find_cheapest(value)
+        except ValueError:
+            # Maps with cycles
+            result = None
+        end = [slot.installed_probe for slot in frontier_nav.slot_table]
+        self._install(start, [])
+        if result is None:
+            return None
+
+        purchases = [(i, probe) for i, (old_probe, probe) in enumerate(zip(start, end)) if probe is not old_probe and probe is not locked]
+        purchases = self._order_purchases(start, purchases)
+        self._install(start, purchases)
+        reached = self._get_remaining(self._get_deficits(frontier_nav.calculate_total())) == 0
+        self._install(start, [])
+        if not reached:
+            return None
+        return sum(probe.cost for slot_index, probe in purchases), purchases
+
+    def _order_purchases(self, start, purchases):
+        # Puts the purchases in a good order to buy them in: each next one is the one that makes the
+        # most progress for its price at that point (free ones first)
+        frontier_nav = self.frontier_nav
+        ordered = []
+        left = list(purchases)
+        while left:
+            self._install(start, ordered)
+            remaining = self._get_remaining(self._get_deficits(frontier_nav.calculate_total()))
+            best = None
+            for purchase in left:
+                slot_index, probe = purchase
+                slot = frontier_nav.slot_table[slot_index]
+                old_probe = slot.installed_probe
+                slot.install_probe(probe)
+                progress = remaining - self._get_remaining(self._get_deficits(frontier_nav.calculate_total()))
+                slot.install_probe(old_probe)
+                key = (probe.cost / progress if progress > 0 else math.inf, probe.cost)
+                if best is None or key < best[0]:
+                    best = (key, purchase)
+            ordered.append(best[1])
+            left.remove(best[1])
+        return ordered
+
+    def _get_deficits(self, totals):
+        return {name: max(value - totals[f"total {name}"], 0) for name, value in self.target.items()}
+
+    def _get_remaining(self, deficits):
+        # How much of the target is still missing, as a fraction of what was missing at the start
+        # averaged over the target totals (0 once every total is reached)
+        remaining = 0
+        for name, deficit in deficits.items():
+            if deficit > 0 and self.start_deficits[name] > 0:
+                remaining += deficit / self.start_deficits[name]
+        return remaining / len(deficits)
+
+    def _get_final_probes(self, purchases):
+        final_probes = {}
+        for slot_index, probe in purchases:
+            final_probes[slot_index] = probe
+        return final_probes
+
+    def _install(self, start, purchases):
+        # Installs the starting loadout with the purchases on top, only touching slots that differ
+        probes = list(start)
+        for slot_index, probe in purchases:
+            probes[slot_index] = probe
+        for slot, probe in zip(self.frontier_nav.slot_table, probes):
+            if slot.installed_probe != probe:
+                slot.install_probe(probe)
+
+    def _describe(self, start, purchases, reached):
+        frontier_nav = self.frontier_nav
+        self._install(start, [])
+        steps = []
+        cost = 0
+        for slot_index, probe in purchases:
+            slot = frontier_nav.slot_table[slot_index]
+            old_probe = slot.installed_probe
+            slot.install_probe(probe)
+            cost += probe.cost
+            steps.append({
+                "slot": frontier_nav.slot_keys[slot_index],
+                "from": old_probe.name,
+                "to": probe.name,
+                "cost": probe.cost,
+                "totals": frontier_nav.calculate_total()
+            })
+
+        return {
+            "reached": reached,
+            "cost": cost,
+            "steps": steps,
+            "totals": frontier_nav.calculate_total(),
+            "loadout": frontier_nav.get_loadout()
+        }
@@ -1,4 +1,5 @@
 from enum import Enum
+from collections import deque
 
 class ProbeType(Enum):
     BASIC = "Basic Probe"
@@ -11,222 +12,227 @@ class ProbeType(Enum):
     LOCKED = "Node not yet unlocked"
     # Need to adjust logic to account for Locked probes/nodes
 
+# Probe types whose own output, or whose neighbours' output for duplicators, depends on the size of their link group
+LINKED_TYPES = (ProbeType.MINING, ProbeType.RESEARCH, ProbeType.STORAGE, ProbeType.DUPLICATOR)
+
+def get_links_multiplier(links):
+    # The output multiplier for a group of linked probes of the same type and gen
+    if links >= 8:
+        return 1.8
+    elif links >= 5:
+        return 1.5
+    elif links >= 3:
+        return 1.3
+    else:
+        return 1
+
 class Probe:
+    # Probes are shared between every slot they're installed in (and between threads and processes),
+    # so they can't be changed after they're made. Two probes with the same values are equal.
+    __slots__ = ("probe_type", "gen", "name", "cost", "_hash")
+
     def __init__(self, probe_type, gen=None, name=None, cost=0):
-        self.probe_type = probe_type    # The type of probe this instance contains, which is a member of the ProbeType enum
-        self.gen = gen                  # The generation of the probe, used for calculations (ex. 1 = G1, 2 = G2, 3 = G3, etc)
-        self.name = name                # The name of the probe as a string
-        self.cost = cost                # The cost to install the probe
-        self.boosted = 0
+        object.__setattr__(self, "probe_type", probe_type)  # The type of probe this instance contains, which is a member of the ProbeType enum
+        object.__setattr__(self, "gen", gen)                # The generation of the probe, used for calculations (ex. 1 = G1, 2 = G2, 3 = G3, etc)
+        object.__setattr__(self, "name", name)              # The name of the probe as a string
+        object.__setattr__(self, "cost", cost)              # The cost to install the probe
+        object.__setattr__(self, "_hash", hash((probe_type, gen, name, cost)))
 
+    def __setattr__(self, name, value):
+        raise AttributeError(f"Probe is immutable, cannot set '{name}'")
 
-    def __repr__(self):
-        return f"Probe({self.probe_type}, {self.gen}, {self.name})"
+    def __delattr__(self, name):
+        raise AttributeError(f"Probe is immutable, cannot delete '{name}'")
 
-class ProbeSlot:
-    node_to_slot = {}
+    def __eq__(self, other):
+        if not isinstance(other, Probe):
+            return NotImplemented
+        return (self.probe_type, self.gen, self.name, self.cost) == (other.probe_type, other.gen, other.name, other.cost)
 
-    def __init__(self, node):
-        self.node = node
-        self.installed_probe = Probe(ProbeType.LOCKED, None, "Probe Slot Locked")     # Initializes with all slots locked
-        ProbeSlot.node_to_slot[node] = self               # Adds the ProbeSlot node to a list of Nodes with a ProbeSlot
-        node.probe_slot = self                            # Tells the Node which ProbeSlot it's linked to
+    def __hash__(self):
+        return self._hash
 
-    def __repr__(self):
-        return f"ProbeSlot(node={self.node}, probe={self.installed_probe})"
+    def __reduce__(self):
+        return (Probe, (self.probe_type, self.gen, self.name, self.cost))
 
-    def __str__(self):
-        return f"ProbeSlot(node={self.node}, probe={self.installed_probe})"
+    def __repr__(self):
+        return f"Probe({self.probe_type}, {self.gen}, {self.name})"
 
-    def install_probe(self, probe):
-        self.installed_probe = probe
-        probe.boosted = 0
+class ProbeIndex:
+    # Lookups over every probe in the game, built once from a FrontierNav.probes dict.
+    # Probe ids are positions in self.probes (FrontierNav.probes order), which stay the same for the
+    # same probe data, so they can be stored or shared with other processes (see batch.py, loadouts.py).
+    def __init__(self, probes):
+        self.probes = [probe for generations in probes.values() for probe in generations.values()]   # Probe id -> Probe
+        self.ids = {}           # Probe -> probe id
+        self.by_name = {}       # Probe name -> Probe
+        self.by_type = {}       # (ProbeType, gen) -> Probe, gen is None for probes without generations
 
-    def lock_probe(self):
-        self.installed_probe = Probe(ProbeType.LOCKED, None, "Probe Slot is Locked")     # Used to block off probes that have not been unlocked yet
+        for probe_id, probe in enumerate(self.probes):
+            # The first probe wins when two share a name or type, like a search in order would
+            self.ids.setdefault(probe, probe_id)
+            self.by_name.setdefault(probe.name, probe)
+            self.by_type.setdefault((probe.probe_type, probe.gen), probe)
 
-    def get_adjacent_probes(self):
-        # Return a list of Probe objects that are installed in adjacent slots
-        adjacent_probes = []
-        adjacent_nodes = self.node.get_adjacent_nodes()
+    def __len__(self):
+        return len(self.probes)
 
-        for adj_node in adjacent_nodes:
-            adj_slot = adj_node.probe_slot
+    def __iter__(self):
+        return iter(self.probes)
 
-            if adj_slot.installed_probe:
-                adjacent_probes.append(adj_slot.installed_probe)
+    def find(self, probe_name):
+        return self.by_name.get(probe_name)
 
-        return adjacent_probes
-    
+    def find_type(self, probe_type, gen=None):
+        return self.by_type.get((probe_type, gen))
 
-    def calculate_output(self):
-        miranium, credits, storage, prec_resources = self._calculate_base_output()
-        miranium, credits, storage = self._apply_booster_effect(miranium, credits, storage)
-        miranium, credits, storage = self._apply_link_multiplier(miranium, credits, storage)
-        return int(miranium), int(credits), int(storage), prec_resources
+    def get_id(self, probe):
+        return self.ids[probe]
 
-    
-    def _calculate_base_output(self):
-        miranium = 0
-        credits = 0
-        storage = 0
-        precious_resources = []
+    def get_probe(self, probe_id):
+        return self.probes[probe_id]
 
-        match self.installed_probe.probe_type:
+# Installed in every slot that hasn't been unlocked
+LOCKED_PROBE = Probe(ProbeType.LOCKED, None, "Probe Slot Locked")
 
-            case ProbeType.BASIC:
-                miranium = self.node.prod_rank.value[1] * 0.50
-                credits = self.node.rev_rank.value[1] * 0.50
+class EvaluationContext:
+    # Everything one slot's output depends on, gathered from the slot and its neighbours before
+    # the calculation. Nothing is written anywhere while calculating, so contexts can be
+    # evaluated from any thread, and equal contexts always give the same output.
+    __slots__ = ("node", "probe", "adjacent_probes", "link_multiplier", "dupe_multiplier")
 
+    def __init__(self, node, probe, adjacent_probes, link_multiplier=1, dupe_multiplier=1):
+        object.__setattr__(self, "node", node)
+        object.__setattr__(self, "probe", probe)
+        object.__setattr__(self, "adjacent_probes", tuple(adjacent_probes))
+        object.__setattr__(self, "link_multiplier", link_multiplier)
+        object.__setattr__(self, "dupe_multiplier", dupe_multiplier)
 
-            case ProbeType.MINING:
-                if self.installed_probe.gen <= 0:
-                    gen_multiplier = 1.0
-                elif self.installed_probe.gen <= 8:
-                    gen_multiplier = 1 + (0.2 * (self.installed_probe.gen - 1))
-                elif self.installed_probe.gen == 9:
-                    gen_multiplier = 1.1 + (0.2 * (self.installed_probe.gen - 1))
-                elif self.installed_probe.gen == 10:
-                    gen_multiplier = 1.2 + (0.2 * (self.installed_probe.gen - 1))
-                else:
-                    gen_multiplier = 3.0
+    def __setattr__(self, name, value):
+        raise AttributeError(f"EvaluationContext is immutable, cannot set '{name}'")
 
-                miranium = self.node.prod_rank.value[1] * gen_multiplier
-                credits = self.node.rev_rank.value[1] * 0.30 
+    def key(self):
+        return (self.node, self.probe, self.adjacent_probes, self.link_multiplier, self.dupe_multiplier)
 
-                if self.node.prec_resources:
-                    precious_resources = list(self.node.prec_resources)
+    def signature(self):
+        # Like key, but with the node's values in place of the node, so the same setup on
+        # two nodes with the same ranks and resources gives the same signature
+        return (self.node.signature, self.probe, self.adjacent_probes, self.link_multiplier, self.dupe_multiplier)
 
+    def __eq__(self, other):
+        if not isinstance(other, EvaluationContext):
+            return NotImplemented
+        return self.key() == other.key()
 
-            case ProbeType.RESEARCH:
-                if self.installed_probe.gen <= 1:
-                    gen_multiplier = 1.5
-                elif self.installed_probe.gen <= 6:
-                    gen_multiplier = 0.5 * (self.installed_probe.gen + 3)
-                else:
-                    gen_multiplier = 4.5
+    def __hash__(self):
+        return hash(self.key())
 
-                miranium = self.node.prod_rank.value[1] * 0.50 
-                credits += self.node.rev_rank.value[1] * gen_multiplier
+    def __repr__(self):
+        return f"EvaluationContext({self.node.name}, {self.probe.name}, links={self.link_multiplier}, dupe={self.dupe_multiplier})"
 
-                if self.node.sightseeing:
-                    credits = len(self.node.sightseeing) * (500 * (self.installed_probe.gen + 3))
+    def calculate_output(self, copied_outputs=None):
+        return calculate_slot_output(self.node, self.probe, self.adjacent_probes, self.link_multiplier, self.dupe_multiplier, copied_outputs)
 
+    def calculate_stages(self, copied_outputs=None):
+        return calculate_slot_stages(self.node, self.probe, self.adjacent_probes, self.link_multiplier, self.dupe_multiplier, copied_outputs)
 
-            case ProbeType.BOOSTER:
-                miranium = self.node.prod_rank.value[1] * 0.10
-                credits = self.node.rev_rank.value[1] * 0.10
+class ProbeSlot:
+    def __init__(self, node, index=None):
+        self.node = node
+        self.index = index                                # Position of the slot in its FrontierNav's slot_table
+        self.installed_probe = LOCKED_PROBE               # Initializes with all slots locked
+        node.probe_slot = self                            # Tells the Node which ProbeSlot it's linked to
+        self.listener = None                              # Object told before and after the installed probe changes (ex. FrontierNav)
+        self.link_index = None                            # LinkIndex used to look up link components, searched for when None
+        self._adjacent_slots = ()                         # Cached result of get_adjacent_slots
+        self._adjacent_source = None                      # The node.adjacent_nodes tuple the cache was built from
 
+    def __repr__(self):
+        return f"ProbeSlot(node={self.node}, probe={self.installed_probe})"
 
-            case ProbeType.DUPLICATOR:
-                adjacent_probes = self.get_adjacent_probes()
+    def __str__(self):
+        return f"ProbeSlot(node={self.node}, probe={self.installed_probe})"
 
-                for adj_probe in adjacent_probes:
-                    if adj_probe.probe_type != ProbeType.DUPLICATOR:
-                        original_probe = self.installed_probe
-                        self.installed_probe = adj_probe
+    def install_probe(self, probe):
+        if self.listener:
+            self.listener.probe_changing(self)
+        self.installed_probe = probe
+        if self.listener:
+            self.listener.probe_changed(self)
 
-                        duped_output = self._calculate_base_output()
+    def lock_probe(self):
+        if self.listener:
+            self.listener.probe_changing(self)
+        self.installed_probe = LOCKED_PROBE               # Used to block off probes that have not been unlocked yet
+        if self.listener:
+            self.listener.probe_changed(self)
+
+    def get_adjacent_slots(self):
+        # Return a tuple of ProbeSlot objects linked to adjacent nodes, built once and reused
+        # until the node's connections change
+        adjacent_nodes = self.node.adjacent_nodes
+        if self._adjacent_source is not adjacent_nodes:
+            self._adjacent_slots = tuple(adj_node.probe_slot for adj_node in adjacent_nodes)
+            if None not in self._adjacent_slots:
+                self._adjacent_source = adjacent_nodes
+        return self._adjacent_slots
 
-                        miranium += duped_output[0] # Using the adjacent probe, adds the miranium produced to the node's total output
-                        credits += duped_output[1]  # Using the adjacent probe, adds the credits produced to the node's total output
-                        storage += duped_output[2]  # Using the adjacent probe, adds the storage alloted to the node's total output
+    def get_adjacent_probes(self):
+        # Return a tuple of Probe objects that are installed in adjacent slots
+        return tuple(adj_slot.installed_probe for adj_slot in self.get_adjacent_slots() if adj_slot.installed_probe)
 
-                        if (adj_probe.probe_type == ProbeType.MINING and duped_output[3]) and len(precious_resources) != 0:   # If using the adjacent probe has a chance to produce any precious resources, adds them to the list of the node's output
-                            precious_resources = duped_output[3]
+    def calculate_output(self):
+        return self.get_evaluation_context().calculate_output()
+
+    def get_evaluation_context(self):
+        # Reads the installed probe, the neighbouring probes and the link multipliers that apply to this slot
+        probe = self.installed_probe
+        link_multiplier = 1
+        dupe_multiplier = 1
+        match probe.probe_type:
+            case ProbeType.MINING | ProbeType.RESEARCH | ProbeType.STORAGE:
+                link_multiplier = self._calculate_links_multiplier()
+                dupe_multiplier = self._duplicator_link_boost()
 
-                        self.installed_probe = original_probe
+            case __:
+                # A duplicator's own link multiplier only affects its neighbours
+                pass
 
+        return EvaluationContext(self.node, probe, self.get_adjacent_probes(), link_multiplier, dupe_multiplier)
 
-            case ProbeType.STORAGE:
-                miranium = self.node.prod_rank.value[1] * 0.10
-                credits = self.node.rev_rank.value[1] * 0.10
-                storage = 3000
+    def get_linked_slots(self):
+        # Return the set of ProbeSlots connected to this one through probes of the same type and gen,
+        # which is the group that shares a link multiplier
+        if self.link_index:
+            return self.link_index.get_linked_slots(self)
 
-            case ProbeType.COMBAT:
-                miranium = self.node.prod_rank.value[1] * 0.10
-                credits = self.node.rev_rank.value[1] * 0.10
+        current_probe = self.installed_probe
+        if not current_probe or current_probe.probe_type is None or current_probe.probe_type is ProbeType.LOCKED:
+            return {self}
 
-            case ProbeType.LOCKED:
-                return 0, 0, 0, []
+        return {node.probe_slot for node in self._find_linked_nodes()}
 
-            case __:
-                pass
-        return miranium, credits, storage, precious_resources
-
-    def _apply_booster_effect(self, miranium, credits, storage):
-        # If any adjacent nodes are installed with Booster Probes
-        # that bonus is calculated into the output here
-        if self.installed_probe.probe_type != ProbeType.BOOSTER and \
-            self.installed_probe.probe_type != ProbeType.BASIC and \
-            self.installed_probe.probe_type != ProbeType.COMBAT and \
-            self.installed_probe.probe_type != ProbeType.LOCKED:
-            adjacent_nodes = self.node.get_adjacent_nodes()
-
-            for adj_node in adjacent_nodes:
-                if adj_node in ProbeSlot.node_to_slot:
-                    adj_slot = ProbeSlot.node_to_slot[adj_node]
-                    if adj_slot.installed_probe.probe_type == ProbeType.BOOSTER:
-
-                        self.installed_probe.boosted = adj_slot.installed_probe.gen
-
-                        if self.installed_probe.boosted == 1:
-                            if self.installed_probe.probe_type == ProbeType.MINING:
-                                miranium += miranium * 0.5
-                            elif self.installed_probe.probe_type == ProbeType.RESEARCH:
-                                credits += credits * 0.5
-                            elif self.installed_probe.probe_type == ProbeType.STORAGE:
-                                storage += storage * 0.5
-                            elif self.installed_probe.probe_type == ProbeType.DUPLICATOR:
-                                types = self._duplicator_copied_types()
-                                for type in types:
-                                    if type == ProbeType.MINING:
-                                        miranium += miranium * 0.5
-                                    elif type == ProbeType.RESEARCH:
-                                        credits += credits * 0.5
-                                    elif type == ProbeType.STORAGE:
-                                        storage += storage * 0.5
-
-                            
-                        elif self.installed_probe.boosted == 2:
-                            if self.installed_probe.probe_type == ProbeType.MINING:
-                                miranium += miranium * 1.0
-                            elif self.installed_probe.probe_type == ProbeType.RESEARCH:
-                                credits += credits * 1.0
-                            elif self.installed_probe.probe_type == ProbeType.STORAGE:
-                                storage += storage * 1.0
-                            elif self.installed_probe.probe_type == ProbeType.DUPLICATOR:
-                                types = self._duplicator_copied_types()
-                                for type in types:
-                                    if type == ProbeType.MINING:
-                                        pass
-                                        miranium += miranium * 1.0
-                                    elif type == ProbeType.RESEARCH:
-                                        pass
-                                        credits += credits * 1.0
-                                    elif type == ProbeType.STORAGE:
-                                        pass
-                                        storage += storage * 1.0
-                            
-            self.installed_probe.boosted = 0
-
-        return miranium, credits, storage
-    
-    
     def _calculate_links_multiplier(self):
-        same = set()
-        queue = [self.node]
-        visited_nodes = {self.node}
+        if self.link_index:
+            return self.link_index.get_multiplier(self)
 
         current_probe = self.installed_probe
         if not current_probe or current_probe.probe_type is None or current_probe.probe_type is ProbeType.LOCKED:
             return 0
-        
+
+        return get_links_multiplier(len(self._find_linked_nodes()))
+
+    def _find_linked_nodes(self):
+        same = set()
+        queue = deque([self.node])
+        visited_nodes = {self.node}
+
+        current_probe = self.installed_probe
         starting_probe_type = current_probe.probe_type
         starting_probe_gen = current_probe.gen
         
         while queue:
-            current_node = queue.pop(0)
+            current_node = queue.popleft()
 
             if current_node.probe_slot.installed_probe.probe_type == starting_probe_type and current_node.probe_slot.installed_probe.gen == starting_probe_gen:
                 same.add(current_node)
@@ -238,57 +244,199 @@ class ProbeSlot:
                             visited_nodes.add(adj_node)
                             queue.append(adj_node)         
 
-        links = len(same)
-        if links >= 8:
-            return 1.8
-        elif links >= 5:
-            return 1.5
-        elif links >= 3:
-            return 1.3
-        else:
-            return 1
+        return same
 
     
     
-    def _apply_link_multiplier(self, miranium, credits, storage):
-        # If a probe is of a type that recieves a link multiplier from adjacent prodes of the same type and gen
-        # that bonus is used to calculate the final output here
-
-        match self.installed_probe.probe_type:
-            case ProbeType.MINING | ProbeType.RESEARCH | ProbeType.DUPLICATOR | ProbeType.STORAGE:
-                link_multiplier = self._calculate_links_multiplier()
-                dupe_multiplier = self._duplicator_link_boost()
-
-            case __:
-                pass
-
-        match self.installed_probe.probe_type:
-            case ProbeType.MINING:
-                miranium = miranium * link_multiplier * dupe_multiplier
-            case ProbeType.RESEARCH:
-                credits = credits * link_multiplier * dupe_multiplier
-            case ProbeType.STORAGE:
-                storage = storage * link_multiplier * dupe_multiplier
-            case ProbeType.DUPLICATOR:
-                pass
-
-        return miranium, credits, storage
-    
-    def _duplicator_copied_types(self):
-        adjacent_probes = self.get_adjacent_probes()
-        copied_types = []
-        for adj_probe in adjacent_probes:
-            if adj_probe.probe_type != ProbeType.DUPLICATOR:
-                copied_types.append(adj_probe.probe_type)
-        return copied_types
-
     def _duplicator_link_boost(self):
         if self.installed_probe.probe_type != ProbeType.DUPLICATOR:
-            adjacent_nodes = self.node.get_adjacent_nodes()
             dupe_link_boost = 1
-            for adj_node in adjacent_nodes:
-                if adj_node.probe_slot.installed_probe.probe_type == ProbeType.DUPLICATOR:
-                    boost = adj_node.probe_slot._calculate_links_multiplier()
+            for adj_slot in self.get_adjacent_slots():
+                if adj_slot.installed_probe.probe_type == ProbeType.DUPLICATOR:
+                    boost = adj_slot._calculate_links_multiplier()
                     if boost > dupe_link_boost:
                         dupe_link_boost = boost
-            return dupe_link_boost
\ No newline at end of file
+            return dupe_link_boost
+
+
+# The output stages below only read the node and probes they are given, so a probe can be
+# scored at a node without installing it (ProbeSlot passes in its own node and neighbours).
+# copied_outputs, if given, is a CopiedOutputCache (see memo.py) for the outputs duplicators copy.
+
+def calculate_slot_output(node, probe, adjacent_probes, link_multiplier=1, dupe_multiplier=1, copied_outputs=None):
+    miranium, credits, storage, prec_resources = calculate_base_output(node, probe, adjacent_probes, copied_outputs)
+    miranium, credits, storage = apply_booster_effect(probe, adjacent_probes, miranium, credits, storage)
+    miranium, credits, storage = apply_link_multiplier(probe, miranium, credits, storage, link_multiplier, dupe_multiplier)
+    return int(miranium), int(credits), int(storage), prec_resources
+
+def calculate_slot_stages(node, probe, adjacent_probes, link_multiplier=1, dupe_multiplier=1, copied_outputs=None):
+    # The same calculation as calculate_slot_output, also keeping the output before the boosters
+    # (base) and before the link multipliers (boosted), as one flat tuple so it can be stored for
+    # every slot without building more tuples:
+    # (miranium, credits, storage, prec_resources, base miranium, base credits, base storage,
+    #  boosted miranium, boosted credits, boosted storage, link_multiplier, dupe_multiplier)
+    base_miranium, base_credits, base_storage, prec_resources = calculate_base_output(node, probe, adjacent_probes, copied_outputs)
+    boosted_miranium, boosted_credits, boosted_storage = apply_booster_effect(probe, adjacent_probes, base_miranium, base_credits, base_storage)
+    miranium, credits, storage = apply_link_multiplier(probe, boosted_miranium, boosted_credits, boosted_storage, link_multiplier, dupe_multiplier)
+    return (int(miranium), int(credits), int(storage), prec_resources, base_miranium, base_credits, base_storage,
+            boosted_miranium, boosted_credits, boosted_storage, link_multiplier, dupe_multiplier)
+
+def calculate_base_output(node, probe, adjacent_probes=(), copied_outputs=None):
+    miranium = 0
+    credits = 0
+    storage = 0
+    precious_resources = []
+
+    match probe.probe_type:
+
+        case ProbeType.BASIC:
+            miranium = node.prod_rank.value[1] * 0.50
+            credits = node.rev_rank.value[1] * 0.50
+
+
+        case ProbeType.MINING:
+            if probe.gen <= 0:
+                gen_multiplier = 1.0
+            elif probe.gen <= 8:
+                gen_multiplier = 1 + (0.2 * (probe.gen - 1))
+            elif probe.gen == 9:
+                gen_multiplier = 1.1 + (0.2 * (probe.gen - 1))
+            elif probe.gen == 10:
+                gen_multiplier = 1.2 + (0.2 * (probe.gen - 1))
+            else:
+                gen_multiplier = 3.0
+
+            miranium = node.prod_rank.value[1] * gen_multiplier
+            credits = node.rev_rank.value[1] * 0.30 
+
+            if node.prec_resources:
+                precious_resources = list(node.prec_resources)
+
+
+        case ProbeType.RESEARCH:
+            if probe.gen <= 1:
+                gen_multiplier = 1.5
+            elif probe.gen <= 6:
+                gen_multiplier = 0.5 * (probe.gen + 3)
+            else:
+                gen_multiplier = 4.5
+
+            miranium = node.prod_rank.value[1] * 0.50 
+            credits += node.rev_rank.value[1] * gen_multiplier
+
+            if node.sightseeing:
+                credits = len(node.sightseeing) * (500 * (probe.gen + 3))
+
+
+        case ProbeType.BOOSTER:
+            miranium = node.prod_rank.value[1] * 0.10
+            credits = node.rev_rank.value[1] * 0.10
+
+
+        case ProbeType.DUPLICATOR:
+            for adj_probe in adjacent_probes:
+                if adj_probe.probe_type != ProbeType.DUPLICATOR:
+                    if copied_outputs is not None:
+                        duped_output = copied_outputs.get_output(node, adj_probe)
+                    else:
+                        duped_output = calculate_base_output(node, adj_probe)
+
+                    miranium += duped_output[0] # Using the adjacent probe, adds the miranium produced to the node's total output
+                    credits += duped_output[1]  # Using the adjacent probe, adds the credits produced to the node's total output
+                    storage += duped_output[2]  # Using the adjacent probe, adds the storage alloted to the node's total output
+
+                    if (adj_probe.probe_type == ProbeType.MINING and duped_output[3]) and len(precious_resources) != 0:   # If using the adjacent probe has a chance to produce any precious resources, adds them to the list of the node's output
+                        precious_resources = duped_output[3]
+
+
+        case ProbeType.STORAGE:
+            miranium = node.prod_rank.value[1] * 0.10
+            credits = node.rev_rank.value[1] * 0.10
+            storage = 3000
+
+        case ProbeType.COMBAT:
+            miranium = node.prod_rank.value[1] * 0.10
+            credits = node.rev_rank.value[1] * 0.10
+
+        case ProbeType.LOCKED:
+            return 0, 0, 0, []
+
+        case __:
+            pass
+    return miranium, credits, storage, precious_resources
+
+def apply_booster_effect(probe, adjacent_probes, miranium, credits, storage):
+    # If any adjacent nodes are installed with Booster Probes
+    # that bonus is calculated into the output here
+    if probe.probe_type != ProbeType.BOOSTER and \
+        probe.probe_type != ProbeType.BASIC and \
+        probe.probe_type != ProbeType.COMBAT and \
+        probe.probe_type != ProbeType.LOCKED:
+        for adj_probe in adjacent_probes:
+            if adj_probe.probe_type == ProbeType.BOOSTER:
+
+                boosted = adj_probe.gen
+
+                if boosted == 1:
+                    if probe.probe_type == ProbeType.MINING:
+                        miranium += miranium * 0.5
+                    elif probe.probe_type == ProbeType.RESEARCH:
+                        credits += credits * 0.5
+                    elif probe.probe_type == ProbeType.STORAGE:
+                        storage += storage * 0.5
+                    elif probe.probe_type == ProbeType.DUPLICATOR:
+                        types = get_copied_types(adjacent_probes)
+                        for type in types:
+                            if type == ProbeType.MINING:
+                                miranium += miranium * 0.5
+                            elif type == ProbeType.RESEARCH:
+                                credits += credits * 0.5
+                            elif type == ProbeType.STORAGE:
+                                storage += storage * 0.5
+
+                    
+                elif boosted == 2:
+                    if probe.probe_type == ProbeType.MINING:
+                        miranium += miranium * 1.0
+                    elif probe.probe_type == ProbeType.RESEARCH:
+                        credits += credits * 1.0
+                    elif probe.probe_type == ProbeType.STORAGE:
+                        storage += storage * 1.0
+                    elif probe.probe_type == ProbeType.DUPLICATOR:
+                        types = get_copied_types(adjacent_probes)
+                        for type in types:
+                            if type == ProbeType.MINING:
+                                pass
+                                miranium += miranium * 1.0
+                            elif type == ProbeType.RESEARCH:
+                                pass
+                                credits += credits * 1.0
+                            elif type == ProbeType.STORAGE:
+                                pass
+                                storage += storage * 1.0
+
+    return miranium, credits, storage
+
+def apply_link_multiplier(probe, miranium, credits, storage, link_multiplier=1, dupe_multiplier=1):
+    # If a probe is of a type that recieves a link multiplier from adjacent prodes of the same type and gen
+    # that bonus is used to calculate the final output here
+
+    match probe.probe_type:
+        case ProbeType.MINING:
+            miranium = miranium * link_multiplier * dupe_multiplier
+        case ProbeType.RESEARCH:
+            credits = credits * link_multiplier * dupe_multiplier
+        case ProbeType.STORAGE:
+            storage = storage * link_multiplier * dupe_multiplier
+        case ProbeType.DUPLICATOR:
+            pass
+
+    return miranium, credits, storage
+
+def get_copied_types(adjacent_probes):
+    # The probe types a duplicator copies from its neighbours
+    copied_types = []
+    for adj_probe in adjacent_probes:
+        if adj_probe.probe_type != ProbeType.DUPLICATOR:
+            copied_types.append(adj_probe.probe_type)
+    return copied_types
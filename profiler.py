@@ -0,0 +1,186 @@
+import time
+import probes
+from probes import ProbeSlot
+from links import LinkIndex
+from memo import OutputCache, CopiedOutputCache
+from frontiernav import FrontierNav
+
+# Where the time of a calculation goes, stage by stage and slot by slot.
+#
+#   with EvaluationProfiler(frontier_nav) as profiler:
+#       frontier_nav.calculate_total()
+#   print(profiler.format_summary())
+#   profiler.write_folded("calculate.folded")      For flamegraph.pl, speedscope or inferno
+#
+# While a profiler is running, each stage of the calculation below is replaced with a wrapper that
+# records its calls, wall time and the nodes it visits, and the originals are put back when it stops.
+# Nothing is checked on the calculation path otherwise, so there is no cost while no profiler runs.
+# The stages are replaced for every map, not only frontier_nav (which is used to name the slots).
+#
+# BatchEvaluator, ExactSolver and CopiedOutputCache import calculate_base_output and
+# calculate_slot_output directly, so their own calls aren't recorded.
+
+# (owner, attribute, stage name, slot the call is for, nodes visited by the call)
+# Node visits count the neighbours read by adjacency lookups and evaluation contexts, and the slots
+# reached by link searches.
+STAGES = [
+    (FrontierNav, "calculate_total", "calculate_total", None, None),
+    (FrontierNav, "get_marginal_gains", "get_marginal_gains", None, None),
+    (FrontierNav, "_update_slot_output", "update_slot_output", lambda args: args[1], None),
+    (ProbeSlot, "install_probe", "install_probe", lambda args: args[0], None),
+    (OutputCache, "get_output", "output_cache", lambda args: args[1].node.probe_slot, None),
+    (ProbeSlot, "get_evaluation_context", "get_evaluation_context", lambda args: args[0], lambda context: len(context.adjacent_probes)),
+    (ProbeSlot, "get_adjacent_slots", "get_adjacent_slots", lambda args: args[0], len),
+    (ProbeSlot, "get_adjacent_probes", "get_adjacent_probes", lambda args: args[0], len),
+    (ProbeSlot, "_calculate_links_multiplier", "links_multiplier", lambda args: args[0], None),
+    (ProbeSlot, "_find_linked_nodes", "find_linked_nodes", lambda args: args[0], len),
+    (ProbeSlot, "_duplicator_link_boost", "duplicator_link_boost", lambda args: args[0], None),
+    (LinkIndex, "get_multiplier", "link_index_multiplier", lambda args: args[1], None),
+    (LinkIndex, "add_slot", "link_index_add", lambda args: args[1], None),
+    (LinkIndex, "remove_slot", "link_index_remove", lambda args: args[1], None),
+    (LinkIndex, "_find_linked", "link_index_search", lambda args: args[1], len),
+    (probes, "calculate_slot_stages", "calculate_slot_stages", lambda args: args[0].probe_slot, None),
+    (probes, "calculate_base_output", "calculate_base_output", lambda args: args[0].probe_slot, None),
+    (CopiedOutputCache, "get_output", "copied_output_cache", lambda args: args[1].probe_slot, None),
+    (probes, "apply_booster_effect", "apply_booster_effect", None, None),
+    (probes, "apply_link_multiplier", "apply_link_multiplier", None, None),
+]
+
+_running = None         # The EvaluationProfiler whose wrappers are installed, only one can run at a time
+
+class EvaluationProfiler:
+    def __init__(self, frontier_nav=None):
+        # Slots are named "Region_nodeid" when they belong to frontier_nav, by node name otherwise
+        self.slot_names = {}
+        if frontier_nav is not None:
+            self.slot_names = {slot: key for key, slot in zip(frontier_nav.slot_keys, frontier_nav.slot_table)}
+        self.originals = []
+        self.reset()
+
+    def reset(self):
+        self.stages = {}        # Stage -> [calls, seconds, self seconds, node visits]
+        self.slots = {}         # (stage, ProbeSlot) -> [calls, seconds, node visits]
+        self.stacks = {}        # Tuple of stage names from the outermost call -> self seconds
+        self._frames = []       # [stage, seconds spent in calls made from it] of each call in progress
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def start(self):
+        global _running
+        if _running is not None:
+            raise RuntimeError("Another EvaluationProfiler is already running")
+        _running = self
+        for owner, attribute, stage, get_slot, get_visits in STAGES:
+            function = getattr(owner, attribute)
+            self.originals.append((owner, attribute, function))
+            setattr(owner, attribute, self._wrap(function, stage, get_slot, get_visits))
+
+    def stop(self):
+        global _running
+        for owner, attribute, function in reversed(self.originals):
+            setattr(owner, attribute, function)
+        self.originals = []
+        self._frames = []
+        if _running is self:
+            _running = None
+
+    def _wrap(self, function, stage, get_slot, get_visits):
+        frames = self._frames
+        perf_counter = time.perf_counter
+
+        def profiled(*args, **kwargs):
+            frame = [stage, 0.0]
+            frames.append(frame)
+            start = perf_counter()
+            try:
+                result = function(*args, **kwargs)
+            finally:
+                seconds = perf_counter() - start
+                path = tuple(outer[0] for outer in frames)
+                frames.pop()
+                if frames:
+                    frames[-1][1] += seconds
+            visits = get_visits(result) if get_visits is not None and result is not None else 0
+            self._record(path, stage, get_slot(args) if get_slot is not None else None, seconds, frame[1], visits)
+            return result
+        return profiled
+
+    def _record(self, path, stage, slot, seconds, child_seconds, visits):
+        stats = self.stages.get(stage)
+        if stats is None:
+            stats = self.stages[stage] = [0, 0.0, 0.0, 0]
+        stats[0] += 1
+        if stage not in path[:-1]:
+            # A recursive call's time is already part of the outer call to the same stage
+            stats[1] += seconds
+        stats[2] += seconds - child_seconds
+        stats[3] += visits
+        self.stacks[path] = self.stacks.get(path, 0.0) + seconds - child_seconds
+
+        if slot is not None:
+            slot_stats = self.slots.get((stage, slot))
+            if slot_stats is None:
+                slot_stats = self.slots[(stage, slot)] = [0, 0.0, 0]
+            slot_stats[0] += 1
+            slot_stats[1] += seconds
+            slot_stats[2] += visits
+
+    def get_summary(self):
+        # One dict per stage that was called, the most time first. "seconds" includes the calls it
+        # made, "self seconds" doesn't.
+        rows = [{
+            "stage": stage,
+            "calls": calls,
+            "seconds": seconds,
+            "self seconds": self_seconds,
+            "node visits": visits,
+            "microseconds per call": seconds / calls * 1e6
+        } for stage, (calls, seconds, self_seconds, visits) in self.stages.items()]
+        rows.sort(key=lambda row: -row["seconds"])
+        return rows
+
+    def get_slot_summary(self, stage="get_evaluation_context", count=None):
+        # The slots that took the most time in one stage, as dicts with the slot's name. Every
+        # calculation of a slot's output gets its evaluation context first, so by default this is
+        # the time spent gathering each slot's neighbours and link multipliers.
+        rows = [{
+            "slot": self._get_slot_name(slot),
+            "calls": calls,
+            "seconds": seconds,
+            "node visits": visits
+        } for (slot_stage, slot), (calls, seconds, visits) in self.slots.items() if slot_stage == stage]
+        rows.sort(key=lambda row: -row["seconds"])
+        return rows[:count] if count is not None else rows
+
+    def _get_slot_name(self, slot):
+        name = self.slot_names.get(slot)
+        return name if name is not None else slot.node.name
+
+    def format_summary(self, slot_count=10):
+        # The stage table followed by the slowest slots, as text
+        lines = [f"{'stage':<24} {'calls':>10} {'seconds':>10} {'self':>10} {'us/call':>10} {'visits':>10}"]
+        for row in self.get_summary():
+            lines.append(f"{row['stage']:<24} {row['calls']:>10} {row['seconds']:>10.4f} {row['self seconds']:>10.4f} "
+                         f"{row['microseconds per call']:>10.2f} {row['node visits']:>10}")
+
+        slot_rows = self.get_slot_summary(count=slot_count)
+        if slot_rows:
+            lines.append("")
+            lines.append(f"{'slowest slots':<32} {'calls':>10} {'seconds':>10} {'visits':>10}")
+            for row in slot_rows:
+                lines.append(f"{row['slot']:<32} {row['calls']:>10} {row['seconds']:>10.4f} {row['node visits']:>10}")
+        return "\n".join(lines)
+
+    def write_folded(self, file_name):
+        # Writes the time of each call stack in the "folded" format flame graph tools read: the stage
+        # names from the outermost call joined with ";", then the self time in microseconds
+        with open(file_name, "w") as f:
+            for path, seconds in sorted(self.stacks.items()):
+                microseconds = round(seconds * 1e6)
+                if microseconds > 0:
+                    f.write(f"{';'.join(path)} {microseconds}\n")
@@ -0,0 +1,115 @@
+import csv
+import json
+import os
+import sys
+
+# Streaming game data reports. iter_report yields one record per node straight from the map,
+# and ReportWriter writes each record as soon as it gets it, so a report never holds more than
+# one node in memory however large the map is.
+#
+#   write_report(frontier_nav)                                  Text report on standard output
+#   write_report(frontier_nav, "nodes.csv", "csv")
+#   write_report(frontier_nav, "nodes.jsonl", "jsonl")
+#
+# The text format has two layouts, both from before this module existed: the one saved to files
+# (a blank line before each region and node name) and the one FrontierNav.print_game_data prints
+# (a blank line after each node name instead), chosen with terminal=True.
+
+FORMATS = ["text", "csv", "jsonl"]
+COLUMNS = ["region", "node id", "name", "production rank", "revenue rank", "combat rank",
+           "sightseeing", "precious resources", "connected to", "installed probe"]
+TITLE = ["---- Xenoblade Chronicles X: Definitive Edition ----",
+         "----------------- FrontierNav Data -----------------"]
+
+def iter_report(frontier_nav):
+    # Yields a dict with COLUMNS as keys for every node, region by region
+    for region, region_nodes in frontier_nav.nodes.items():
+        for node_id, node in region_nodes.items():
+            yield {
+                "region": region,
+                "node id": node_id,
+                "name": node.name,
+                "production rank": node.prod_rank.value[0],
+                "revenue rank": node.rev_rank.value[0],
+                "combat rank": node.combat_rank,
+                "sightseeing": list(node.sightseeing or []),
+                "precious resources": list(node.prec_resources or []),
+                "connected to": [connection.get_other_node(node).name for connection in node.connections],
+                "installed probe": node.probe_slot.installed_probe.name
+            }
+
+
+class ReportWriter:
+    # Writes report records as text, CSV or JSON Lines, one record at a time
+    def __init__(self, out, output_format="text", terminal=False):
+        if output_format not in FORMATS:
+            raise ValueError(f"Unknown report format '{output_format}', expected one of {', '.join(FORMATS)}")
+        self.out = out
+        self.output_format = output_format
+        self.terminal = terminal        # Text in print_game_data's layout
+        self.region = None
+        if output_format == "text":
+            out.write("\n".join(TITLE) + "\n\n")
+        elif output_format == "csv":
+            self.writer = csv.writer(out)
+            self.writer.writerow(COLUMNS)
+
+    def write(self, record):
+        if self.output_format == "text":
+            self._write_text(record)
+        elif self.output_format == "csv":
+            # Lists are joined with "; " like the evaluate command's precious resources column
+            self.writer.writerow([
+                "; ".join(record[column]) if isinstance(record[column], list) else record[column]
+                for column in COLUMNS
+            ])
+        else:
+            self.out.write(json.dumps(record) + "\n")
+
+    def _write_text(self, record):
+        write = self.out.write
+        if record["region"] != self.region:
+            self.region = record["region"]
+            write(f">>> {self.region} <<<\n" if self.terminal else f"\n>>> {self.region} <<<\n")
+
+        write(f"{record['name']}\n\n" if self.terminal else f"\n{record['name']}\n")
+        write(f"- Production Rank: {record['production rank']}\n")
+        write(f"- Revenue Rank: {record['revenue rank']}\n")
+        write(f"- Combat Rank: {record['combat rank']}\n")
+        self._write_text_list("- Sightseeing Sites: ", record["sightseeing"])
+        self._write_text_list("- Precious Resources: ", record["precious resources"])
+        self._write_text_list("- Connected To: ", [name.removeprefix("FN Site ") for name in record["connected to"]])
+        write(f"- Installed Probe: {record['installed probe']}\n")
+
+    def _write_text_list(self, label, values):
+        self.out.write(f"{label}{len(values)}\n")
+        for value in values:
+            self.out.write(f"     * {value}\n")
+
+    def close(self):
+        self.out.flush()
+
+
+def silence_stdout():
+    # Points standard output at os.devnull once its reader has gone (ex. piped into head), so
+    # the flush when Python exits doesn't raise BrokenPipeError again
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, sys.stdout.fileno())
+
+
+def write_report(frontier_nav, file_name=None, output_format="text", terminal=False):
+    # Writes a report of every node to file_name, or to standard output when it's None.
+    # A reader that stops early (ex. python main.py report | head) just ends the report.
+    out = open(file_name, "w", newline="", encoding="utf-8") if file_name else sys.stdout
+    try:
+        writer = ReportWriter(out, output_format, terminal)
+        for record in iter_report(frontier_nav):
+            writer.write(record)
+        writer.close()
+    except BrokenPipeError:
+        if out is not sys.stdout:
+            raise
+        silence_stdout()
+    finally:
+        if out is not sys.stdout:
+            out.close()
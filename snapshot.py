@@ -0,0 +1,297 @@
+import argparse
+import mmap
+import os
+import struct
+import sys
+from array import array
+from nodes import Node, Connection, CompiledGraph, ProdRank, RevRank
+from probes import ProbeSlot, Probe, ProbeType, ProbeIndex
+
+# A precompiled, memory-mappable copy of the output of FrontierNav.load_game_data.
+#
+#   python snapshot.py                              Writes NODE_DATA to frontiernav.snapshot
+#   python snapshot.py --data TEST_DATA --output test.snapshot
+#
+# File layout (native byte order, which is recorded in the header and checked on load):
+#   header     MAGIC, format version, byte order, section count
+#   sections   (name, item format, offset, item count) for each section
+#   data       every section as a flat array, each starting on an 8 byte boundary
+#
+# Strings (region names, node ids and names, sightseeing spots, precious resources, probe names
+# and enum member names) are stored once in a UTF-8 blob and referred to by number. Ranks and
+# probe types are stored by enum member name, so reordering an enum doesn't break old files.
+#
+# GameDataSnapshot maps the file read-only and reads the arrays straight out of the mapping, so
+# worker processes opening the same file share one copy in the page cache. load_snapshot (for
+# FrontierNav) still builds every Node, Connection, ProbeSlot and Probe object, and takes about as
+# long as FrontierNav.load_game_data. Workers that only score loadouts (python main.py evaluate
+# --snapshot) skip those objects with BatchEvaluator.from_snapshot, which only makes a Node for each
+# distinct set of ranks and resources (see get_node_templates). `python benchmark.py --only
+# start_evaluator` compares the two ways to start: about the same on NODE_DATA, where building the
+# evaluator's tables is most of the time, 1.5x faster on a 10000 node map and 4x on 100000 nodes.
+
+MAGIC = b"FNSNAP\0\0"
+VERSION = 1
+DEFAULT_SNAPSHOT_FILE = "frontiernav.snapshot"
+
+HEADER = struct.Struct("<8sIBxxxI")
+SECTION = struct.Struct("<16s4sQQ")
+BYTE_ORDERS = {"little": 0, "big": 1}
+
+class SnapshotError(Exception):
+    pass
+
+
+def write_snapshot(game_data, file_name=DEFAULT_SNAPSHOT_FILE):
+    # Writes game data from FrontierNav.load_game_data to file_name
+    strings = []
+    string_ids = {}
+
+    def string_id(text):
+        if text not in string_ids:
+            string_ids[text] = len(strings)
+            strings.append(text)
+        return string_ids[text]
+
+    def add_lists(lists, offsets_name, items_name, none_name):
+        # A list per node, or None, as offsets into one flat array of string ids
+        offsets = array("q", [0])
+        items = array("q")
+        is_none = array("B")
+        for values in lists:
+            is_none.append(values is None)
+            items.extend(string_id(value) for value in values or [])
+            offsets.append(len(items))
+        sections[offsets_name] = offsets
+        sections[items_name] = items
+        sections[none_name] = is_none
+
+    graph = game_data["graph"]
+    nodes = graph.nodes
+    node_keys = {}
+    for region, region_nodes in game_data["nodes"].items():
+        for node_id, node in region_nodes.items():
+            node_keys[node] = (region, node_id)
+
+    sections = {}
+    sections["regions"] = array("q", [string_id(region) for region in game_data["nodes"]])
+    sections["node_region"] = array("q", [string_id(node_keys[node][0]) for node in nodes])
+    sections["node_id"] = array("q", [string_id(node_keys[node][1]) for node in nodes])
+    sections["node_name"] = array("q", [string_id(node.name) for node in nodes])
+    sections["prod_rank"] = array("q", [string_id(node.prod_rank.name) for node in nodes])
+    sections["rev_rank"] = array("q", [string_id(node.rev_rank.name) for node in nodes])
+    sections["combat_rank"] = array("q", [string_id(node.combat_rank) for node in nodes])
+    add_lists([node.sightseeing for node in nodes], "sight_offsets", "sight_items", "sight_none")
+    add_lists([node.prec_resources for node in nodes], "prec_offsets", "prec_items", "prec_none")
+
+    # Connections in the order they were made, which decides each node's neighbour order
+    sections["connection_a"] = array("q", [connection.node1.index for connection in game_data["connections"]])
+    sections["connection_b"] = array("q", [connection.node2.index for connection in game_data["connections"]])
+
+    sections["graph_offsets"] = array("q", graph.offsets)
+    sections["graph_targets"] = array("q", graph.targets)
+    sections["prod_values"] = array("d", graph.prod_values)
+    sections["rev_values"] = array("d", graph.rev_values)
+    sections["sight_counts"] = array("q", graph.sightseeing_counts)
+    sections["prec_counts"] = array("q", graph.prec_resource_counts)
+
+    probe_groups = list(game_data["probes"])
+    sections["probe_groups"] = array("q", [string_id(group) for group in probe_groups])
+    probe_rows = [(group_index, gen_key, probe) for group_index, group in enumerate(probe_groups)
+                  for gen_key, probe in game_data["probes"][group].items()]
+    sections["probe_group"] = array("q", [group_index for group_index, gen_key, probe in probe_rows])
+    sections["probe_gen_key"] = array("q", [gen_key for group_index, gen_key, probe in probe_rows])
+    sections["probe_type"] = array("q", [string_id(probe.probe_type.name) for group_index, gen_key, probe in probe_rows])
+    sections["probe_gen"] = array("q", [-1 if probe.gen is None else probe.gen for group_index, gen_key, probe in probe_rows])
+    sections["probe_cost"] = array("q", [probe.cost for group_index, gen_key, probe in probe_rows])
+    sections["probe_name"] = array("q", [string_id(probe.name) for group_index, gen_key, probe in probe_rows])
+
+    encoded = [text.encode("utf-8") for text in strings]
+    string_offsets = array("q", [0])
+    for text in encoded:
+        string_offsets.append(string_offsets[-1] + len(text))
+    sections["string_offsets"] = string_offsets
+    sections["strings"] = array("B", b"".join(encoded))
+
+    table_size = HEADER.size + SECTION.size * len(sections)
+    position = _align(table_size)
+    table = []
+    for name, values in sections.items():
+        table.append((name, values, position))
+        position = _align(position + len(values) * values.itemsize)
+
+    # Written to a temporary file first so a reader never maps a half-written snapshot
+    temp_name = file_name + ".tmp"
+    with open(temp_name, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, BYTE_ORDERS[sys.byteorder], len(sections)))
+        for name, values, offset in table:
+            f.write(SECTION.pack(name.encode("ascii"), values.typecode.encode("ascii"), offset, len(values)))
+        for name, values, offset in table:
+            f.write(b"\0" * (offset - f.tell()))
+            values.tofile(f)
+    os.replace(temp_name, file_name)
+
+
+def _align(position):
+    return (position + 7) & ~7
+
+
+class GameDataSnapshot:
+    # A read-only view of a snapshot file, with every section as a memoryview into the mapping
+    def __init__(self, file_name):
+        self.file_name = file_name
+        with open(file_name, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        buffer = memoryview(self._mmap)
+        if len(buffer) < HEADER.size:
+            raise SnapshotError(f"{file_name} is not a FrontierNav snapshot")
+        magic, version, byte_order, section_count = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise SnapshotError(f"{file_name} is not a FrontierNav snapshot")
+        if version != VERSION:
+            raise SnapshotError(f"{file_name} is snapshot version {version}, expected version {VERSION}")
+        if byte_order != BYTE_ORDERS[sys.byteorder]:
+            raise SnapshotError(f"{file_name} was written on a machine with a different byte order")
+
+        self.sections = {}
+        for i in range(section_count):
+            name, typecode, offset, count = SECTION.unpack_from(buffer, HEADER.size + i * SECTION.size)
+            typecode = typecode.rstrip(b"\0").decode("ascii")
+            size = count * array(typecode).itemsize
+            self.sections[name.rstrip(b"\0").decode("ascii")] = buffer[offset:offset + size].cast(typecode)
+
+        # Every string is decoded once, the rest of the file is read in place
+        blob = bytes(self.sections["strings"])
+        offsets = self.sections["string_offsets"].tolist()
+        self.strings = [blob[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(len(offsets) - 1)]
+
+    def __len__(self):
+        return len(self.sections["node_id"])
+
+    def _get_strings(self, name):
+        strings = self.strings
+        return [strings[string_id] for string_id in self.sections[name].tolist()]
+
+    def _get_lists(self, offsets_name, items_name, none_name):
+        offsets = self.sections[offsets_name].tolist()
+        items = self._get_strings(items_name)
+        is_none = self.sections[none_name].tolist()
+        return [None if is_none[i] else items[offsets[i]:offsets[i + 1]] for i in range(len(is_none))]
+
+    def get_slot_keys(self):
+        # "Region_nodeid" of every node, in the same order as FrontierNav.slot_keys
+        return [f"{region}_{node_id}" for region, node_id in zip(self._get_strings("node_region"), self._get_strings("node_id"))]
+
+    def get_probes(self):
+        # The "probes" dict of FrontierNav.load_game_data
+        sections = self.sections
+        probe_groups = self._get_strings("probe_groups")
+        probes = {group: {} for group in probe_groups}
+        for group_index, gen_key, probe_type, gen, cost, name in zip(
+                sections["probe_group"].tolist(), sections["probe_gen_key"].tolist(), self._get_strings("probe_type"),
+                sections["probe_gen"].tolist(), sections["probe_cost"].tolist(), self._get_strings("probe_name")):
+            probes[probe_groups[group_index]][gen_key] = Probe(ProbeType[probe_type], None if gen < 0 else gen, name, cost)
+        return probes
+
+    def get_node_templates(self):
+        # Returns one Node for each distinct set of ranks, sightseeing spot count and precious resources,
+        # and the position of each node's template in that list. A template gives the same probe outputs
+        # as every node it stands for (they share a Node.signature), so code that only scores probes
+        # (ex. BatchEvaluator.from_snapshot) doesn't need a Node for every node of a large map.
+        sections = self.sections
+        strings = self.strings
+        sight_offsets = sections["sight_offsets"].tolist()
+        sight_none = sections["sight_none"].tolist()
+        sight_items = sections["sight_items"].tolist()
+        prec_offsets = sections["prec_offsets"].tolist()
+        prec_none = sections["prec_none"].tolist()
+        prec_items = sections["prec_items"].tolist()
+        node_names = sections["node_name"].tolist()
+        combat_ranks = sections["combat_rank"].tolist()
+
+        templates = []
+        template_ids = []
+        known = {}
+        for i, (prod_rank, rev_rank) in enumerate(zip(sections["prod_rank"].tolist(), sections["rev_rank"].tolist())):
+            prec_resources = None if prec_none[i] else tuple(prec_items[prec_offsets[i]:prec_offsets[i + 1]])
+            key = (prod_rank, rev_rank, sight_none[i], sight_offsets[i + 1] - sight_offsets[i], prec_resources)
+            template_id = known.get(key)
+            if template_id is None:
+                template_id = known[key] = len(templates)
+                sightseeing = None if sight_none[i] else [strings[item] for item in sight_items[sight_offsets[i]:sight_offsets[i + 1]]]
+                templates.append(Node(strings[node_names[i]], ProdRank[strings[prod_rank]], RevRank[strings[rev_rank]],
+                                      strings[combat_ranks[i]], sightseeing,
+                                      None if prec_resources is None else [strings[item] for item in prec_resources]))
+            template_ids.append(template_id)
+        return templates, template_ids
+
+    def to_game_data(self):
+        # Builds the same dict as FrontierNav.load_game_data
+        sections = self.sections
+        strings = self.strings
+        sightseeing = self._get_lists("sight_offsets", "sight_items", "sight_none")
+        prec_resources = self._get_lists("prec_offsets", "prec_items", "prec_none")
+        prod_ranks = {name: ProdRank[name] for name in set(self._get_strings("prod_rank"))}
+        rev_ranks = {name: RevRank[name] for name in set(self._get_strings("rev_rank"))}
+
+        nodes = {region: {} for region in self._get_strings("regions")}
+        node_list = []
+        for name, prod_rank, rev_rank, combat_rank, node_sightseeing, node_prec_resources, region, node_id in zip(
+                self._get_strings("node_name"), self._get_strings("prod_rank"), self._get_strings("rev_rank"),
+                self._get_strings("combat_rank"), sightseeing, prec_resources,
+                self._get_strings("node_region"), self._get_strings("node_id")):
+            node = Node(name, prod_ranks[prod_rank], rev_ranks[rev_rank], combat_rank, node_sightseeing, node_prec_resources)
+            nodes[region][node_id] = node
+            node_list.append(node)
+
+        connections = [Connection(node_list[a], node_list[b])
+                       for a, b in zip(sections["connection_a"].tolist(), sections["connection_b"].tolist())]
+
+        graph = CompiledGraph(node_list, {
+            "offsets": sections["graph_offsets"],
+            "targets": sections["graph_targets"],
+            "prod_values": sections["prod_values"],
+            "rev_values": sections["rev_values"],
+            "sightseeing_counts": sections["sight_counts"],
+            "prec_resource_counts": sections["prec_counts"]
+        })
+
+        slots = {}
+        for region, region_nodes in nodes.items():
+            slots[region] = {}
+            for node_id, node in region_nodes.items():
+                slots[region][node_id] = ProbeSlot(node)
+
+        probes = self.get_probes()
+
+        return {
+            "nodes": nodes,
+            "connections": connections,
+            "graph": graph,
+            "slots": slots,
+            "probes": probes,
+            "probe_index": ProbeIndex(probes)
+        }
+
+
+def load_snapshot(file_name=DEFAULT_SNAPSHOT_FILE):
+    # Returns game data for FrontierNav from a snapshot file (ex. FrontierNav(load_snapshot()))
+    return GameDataSnapshot(file_name).to_game_data()
+
+
+def main(argv=None):
+    import data
+    from frontiernav import FrontierNav
+
+    parser = argparse.ArgumentParser(description="Compile FrontierNav game data into a binary snapshot")
+    parser.add_argument("--data", choices=["NODE_DATA", "TEST_DATA"], default="NODE_DATA", help="map to compile")
+    parser.add_argument("--output", default=DEFAULT_SNAPSHOT_FILE, help="snapshot file to write")
+    args = parser.parse_args(argv)
+
+    write_snapshot(FrontierNav.load_game_data(getattr(data, args.data)), args.output)
+    print(f"Wrote {args.data} to {args.output} ({os.path.getsize(args.output)} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+import os
+import heapq
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from batch import BatchEvaluator
+from optimizer import parse_objective
+
+# Set up once in each worker process by _start_worker, then only read
+_worker_evaluator = None
+
+def _start_worker(evaluator):
+    global _worker_evaluator
+    _worker_evaluator = evaluator
+
+def _evaluate_rows(loadouts):
+    return _worker_evaluator.evaluate(loadouts)
+
+def _sweep_range(base_row, slot_indices, options, weights, start, stop, top):
+    # Builds and scores the combinations numbered start to stop-1, keeping only the best few
+    evaluator = _worker_evaluator
+    best = []
+    for chunk_start in range(start, stop, evaluator.chunk_size):
+        numbers = np.arange(chunk_start, min(chunk_start + evaluator.chunk_size, stop))
+        rows = get_combinations(base_row, slot_indices, options, numbers)
+        totals = evaluator.evaluate(rows)
+        scores = get_scores(totals, weights)
+
+        for i in np.argsort(scores)[::-1][:top]:
+            item = (float(scores[i]), -int(numbers[i]))
+            if len(best) < top:
+                heapq.heappush(best, item)
+            elif item > best[0]:
+                heapq.heapreplace(best, item)
+
+    return best
+
+def get_combinations(base_row, slot_indices, options, numbers):
+    # Combination number n picks options[k][digit k of n], reading n in a mixed base
+    # where the last slot changes fastest
+    rows = np.repeat(base_row[np.newaxis, :], len(numbers), axis=0)
+    numbers = np.array(numbers, dtype=np.int64)
+    for slot_index, slot_options in reversed(list(zip(slot_indices, options))):
+        rows[:, slot_index] = slot_options[numbers % len(slot_options)]
+        numbers = numbers // len(slot_options)
+    return rows
+
+def get_scores(totals, weights):
+    scores = np.zeros(len(totals["total cost"]))
+    for name, weight in weights.items():
+        scores += weight * totals[f"total {name}"]
+    return scores
+
+class LoadoutSweep:
+    # Spreads large what-if sweeps over several processes.
+    #
+    # Each worker gets a BatchEvaluator once when it starts (plain arrays and probe names, nothing
+    # from the live FrontierNav), so the work sent afterwards is just loadout rows or a range of
+    # combination numbers. Use it as a context manager, or call close() when done.
+    #
+    # How much faster more workers are depends on the machine, measure it with
+    # python benchmark.py --only sweep_scaling (on a single core, 2 workers run at about 0.7x).
+    def __init__(self, frontier_nav, workers=None, batch_size=8192):
+        self.evaluator = BatchEvaluator(frontier_nav)
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size    # Loadouts handed to a worker at a time
+        self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def _get_pool(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_start_worker,
+                                             initargs=(self.evaluator,))
+        return self._pool
+
+    def evaluate(self, loadouts):
+        # Same as BatchEvaluator.evaluate, with the batches scored in parallel
+        loadouts = np.asarray(loadouts, dtype=np.intp)
+        if self.workers == 1 or len(loadouts) <= self.batch_size:
+            return self.evaluator.evaluate(loadouts)
+
+        batches = [loadouts[start:start + self.batch_size] for start in range(0, len(loadouts), self.batch_size)]
+        results = list(self._get_pool().map(_evaluate_rows, batches))
+        return {name: np.concatenate([result[name] for result in results]) for name in results[0]}
+
+    def sweep(self, choices, objective, base=None, top=10):
+        # Scores every combination of the probes in choices ({"Region_nodeid": [probe names]}) on top
+        # of the base setup (all locked by default) and returns the best few. Workers build their own
+        # combinations from a range of numbers and send back only their best, so nothing grows with
+        # the size of the sweep.
+        weights = parse_objective(objective)
+        evaluator = self.evaluator
+        base_row = evaluator.encode(base or {})
+
+        slot_indices = []
+        options = []
+        for key, probe_names in choices.items():
+            if key not in evaluator.keys:
+                raise ValueError(f"Unknown slot in sweep: {key}")
+            for probe_name in probe_names:
+                if probe_name not in evaluator.probe_ids:
+                    raise ValueError(f"Unknown probe in sweep: {probe_name}")
+            slot_indices.append(evaluator.keys.index(key))
+            options.append(np.array([evaluator.probe_ids[probe_name] for probe_name in probe_names], dtype=np.intp))
+
+        count = 1
+        for slot_options in options:
+            count *= len(slot_options)
+
+        ranges = [(start, min(start + self.batch_size, count)) for start in range(0, count, self.batch_size)]
+        if self.workers == 1 or len(ranges) <= 1:
+            _start_worker(evaluator)
+            results = [_sweep_range(base_row, slot_indices, options, weights, start, stop, top) for start, stop in ranges]
+        else:
+            pool = self._get_pool()
+            futures = [pool.submit(_sweep_range, base_row, slot_indices, options, weights, start, stop, top)
+                       for start, stop in ranges]
+            results = [future.result() for future in futures]
+
+        # Highest score first, ties go to the lowest combination number
+        best = heapq.nlargest(top, (item for result in results for item in result))
+        numbers = [-number for score, number in best]
+        rows = get_combinations(base_row, slot_indices, options, numbers)
+        totals = evaluator.evaluate(rows) if numbers else {}
+
+        return {
+            "count": count,
+            "best": [{
+                "score": score,
+                "totals": {name: int(totals[name][i]) for name in ("total miranium", "total credits", "total storage", "total cost")},
+                "loadout": evaluator.decode(rows[i])
+            } for i, (score, number) in enumerate(best)]
+        }
@@ -0,0 +1,38 @@
+import unittest
+from benchmark import compare_with_baseline
+
+# compare_with_baseline scales each baseline time by the calibrations timed around the case
+
+def make_report(calibration, seconds, memory=1000):
+    return {"results": {"case": {"median_seconds": seconds, "peak_memory_bytes": memory, "calibration_seconds": calibration}}}
+
+class CompareWithBaselineTest(unittest.TestCase):
+
+    def test_slower_machine(self):
+        # Everything twice as slow, calibration included, isn't a regression
+        self.assertEqual(compare_with_baseline(make_report(0.2, 0.02), make_report(0.1, 0.01)), [])
+
+    def test_slower_code(self):
+        regressions = compare_with_baseline(make_report(0.2, 0.04), make_report(0.1, 0.01))
+        self.assertEqual([(name, measurement) for name, measurement, old, new in regressions], [("case", "median_seconds")])
+
+    def test_memory(self):
+        regressions = compare_with_baseline(make_report(0.1, 0.01, 2000), make_report(0.1, 0.01, 1000))
+        self.assertEqual([measurement for name, measurement, old, new in regressions], ["peak_memory_bytes"])
+
+    def test_noise(self):
+        # A tiny case 50% slower by less than NOISE_SECONDS
+        self.assertEqual(compare_with_baseline(make_report(0.1, 0.0003), make_report(0.1, 0.0002)), [])
+
+    def test_baseline_without_calibration(self):
+        baseline = make_report(None, 0.01)
+        del baseline["results"]["case"]["calibration_seconds"]
+        self.assertEqual(len(compare_with_baseline(make_report(0.5, 0.02), baseline)), 1)
+
+    def test_threshold(self):
+        report, baseline = make_report(0.1, 0.012), make_report(0.1, 0.01)
+        self.assertEqual(compare_with_baseline(report, baseline), [])
+        self.assertEqual(len(compare_with_baseline(report, baseline, threshold=0.1)), 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import random
+import unittest
+from data import NODE_DATA
+from mapgen import make_node_data, random_loadout
+from frontiernav import FrontierNav
+from probes import apply_link_multiplier
+from test_equivalence import get_totals
+
+# FrontierNav.get_breakdown checked against the totals and slot outputs of a full recalculation:
+# slot outputs add up to their region's subtotals, and those to the map's totals
+
+class BreakdownTest(unittest.TestCase):
+
+    def check_breakdown(self, node_data, count, seed):
+        frontier_nav = FrontierNav(FrontierNav.load_game_data(node_data))
+        reference = FrontierNav(FrontierNav.load_game_data(node_data), incremental=False, output_cache_size=0)
+        rng = random.Random(seed)
+        names = [probe.name for probe in frontier_nav.probe_index.probes]
+
+        for i in range(count):
+            setup = random_loadout(frontier_nav, rng, [frontier_nav.find_probe(name) for name in rng.sample(names, 4)])
+            frontier_nav.apply_loadout(setup)
+            reference.apply_loadout(setup)
+            breakdown = frontier_nav.get_breakdown()
+            self.assertEqual(get_totals(breakdown["totals"]), get_totals(reference.calculate_total()))
+
+            regions = {}
+            for key, output in zip(reference.slot_keys, reference.get_slot_outputs()):
+                slot = breakdown["slots"][key]
+                self.assertEqual(slot["probe"], setup[key])
+                self.assertEqual(slot["output"], output[:3])
+                self.assertEqual(sorted(slot["possible resources"]), sorted(output[3]))
+                self.assertEqual(slot["cost"], output[4])
+
+                # The kept stages give the output: base and booster gain, then the link multipliers, truncated
+                boosted = [base + gain for base, gain in zip(slot["base output"], slot["booster gain"])]
+                final = apply_link_multiplier(frontier_nav.find_probe(slot["probe"]), *boosted,
+                                              slot["link multiplier"], slot["duplicator link boost"])
+                self.assertEqual(tuple(int(value) for value in final), slot["output"])
+
+                subtotals = regions.setdefault(key.split("_", 1)[0], [0, 0, 0, 0, set()])
+                for axis in range(3):
+                    subtotals[axis] += output[axis]
+                subtotals[3] += output[4]
+                subtotals[4] |= set(output[3])
+
+            self.assertEqual({region: (subtotals["total miranium"], subtotals["total credits"], subtotals["total storage"],
+                                       subtotals["total cost"], set(subtotals["possible resources"]))
+                              for region, subtotals in breakdown["regions"].items()},
+                             {region: tuple(subtotals) for region, subtotals in regions.items()})
+            self.assertEqual(sum(subtotals["total storage"] for subtotals in breakdown["regions"].values()) + 6000,
+                             breakdown["totals"]["total storage"])
+
+    def test_node_data(self):
+        self.check_breakdown(NODE_DATA, 30, seed=1)
+
+    def test_map_with_cycles(self):
+        self.check_breakdown(make_node_data(200, seed=2, cross_region_edges=40), 30, seed=2)
+
+if __name__ == "__main__":
+    unittest.main()
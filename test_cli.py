@@ -0,0 +1,110 @@
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from data import NODE_DATA
+from frontiernav import FrontierNav
+import cli
+
+# The command line tools run in-process on temporary files
+
+LOADOUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "probe_loadouts")
+
+class CliTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write_file(self, name, content):
+        path = os.path.join(self.directory, name)
+        with open(path, "w") as f:
+            f.write(content if isinstance(content, str) else json.dumps(content))
+        return path
+
+    def run_cli(self, *argv):
+        # Returns the exit code and what was printed to standard error
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            code = cli.main(list(argv))
+        return code, stderr.getvalue()
+
+class EvaluateTest(CliTestCase):
+
+    def test_scores_and_skips(self):
+        for name in os.listdir(LOADOUT_DIR):
+            shutil.copy(os.path.join(LOADOUT_DIR, name), self.directory)
+        self.write_file("list.json", [1, 2])
+        self.write_file("values.json", {"Primordia_fn101": ["x"]})
+        self.write_file("broken.json", "{")
+        output = os.path.join(self.directory, "ranked.out")
+
+        code, stderr = self.run_cli("evaluate", self.directory, "--format", "json", "--output", output, "--workers", "1")
+        self.assertEqual(code, 2)
+        for name in ["list.json", "values.json", "broken.json"]:
+            self.assertIn(f"skipped {os.path.join(self.directory, name)}", stderr)
+
+        with open(output) as f:
+            rows = json.load(f)
+        self.assertEqual(sorted(os.path.basename(row["file"]) for row in rows), sorted(os.listdir(LOADOUT_DIR)))
+        self.assertEqual([row["rank"] for row in rows], [1, 2])
+        self.assertGreaterEqual(rows[0]["miranium"], rows[1]["miranium"])
+
+        # The same totals as installing each loadout on the map
+        for row in rows:
+            frontier_nav = FrontierNav(FrontierNav.load_game_data(NODE_DATA))
+            frontier_nav.apply_loadout(cli.read_loadout_file(row["file"]))
+            totals = frontier_nav.calculate_total()
+            self.assertEqual([row["miranium"], row["credits"], row["storage"], row["cost"]],
+                             [totals["total miranium"], totals["total credits"], totals["total storage"], totals["total cost"]])
+
+    def test_snapshot(self):
+        # Workers starting from a snapshot file score the same as from the map data
+        from snapshot import write_snapshot
+        snapshot_file = os.path.join(self.directory, "map.snapshot")
+        write_snapshot(FrontierNav.load_game_data(NODE_DATA), snapshot_file)
+
+        outputs = []
+        for option, value in (("--data", "NODE_DATA"), ("--snapshot", snapshot_file)):
+            output = os.path.join(self.directory, f"ranked{len(outputs)}.out")
+            code, stderr = self.run_cli("evaluate", LOADOUT_DIR, "--output", output, "--workers", "1", option, value)
+            self.assertEqual(code, 0, stderr)
+            with open(output) as f:
+                outputs.append(f.read())
+        self.assertEqual(outputs[0], outputs[1])
+
+class PackTest(CliTestCase):
+
+    def test_pack_and_unpack(self):
+        store = os.path.join(self.directory, "archive.loadouts")
+        self.write_file("list.json", [1, 2])
+        self.write_file("values.json", {"Primordia_fn101": 3})
+        code, stderr = self.run_cli("pack", store, LOADOUT_DIR, os.path.join(self.directory, "*.json"))
+        self.assertEqual(code, 2)
+        self.assertEqual(stderr.count("Warning: skipped"), 2)
+
+        # Each stored loadout comes back as the file it was packed from
+        for index, name in enumerate(sorted(os.listdir(LOADOUT_DIR))):
+            output = os.path.join(self.directory, f"{index}.out")
+            self.assertEqual(self.run_cli("unpack", store, str(index), "--output", output)[0], 0)
+            with open(output) as f, open(os.path.join(LOADOUT_DIR, name)) as original:
+                self.assertEqual(json.load(f), json.load(original))
+
+        code, stderr = self.run_cli("unpack", store, "2")
+        self.assertEqual(code, 1)
+        self.assertIn("out of range", stderr)
+
+    def test_unpack_bad_store(self):
+        corrupt = self.write_file("corrupt.loadouts", "not a loadout store")
+        for store in (os.path.join(self.directory, "missing.loadouts"), corrupt):
+            code, stderr = self.run_cli("unpack", store, "0")
+            self.assertEqual(code, 1)
+            self.assertIn(store, stderr)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import random
+import unittest
+from data import NODE_DATA, TEST_DATA
+from nodes import ProdRank, RevRank
+from mapgen import make_node_data, random_loadout
+from frontiernav import FrontierNav
+from batch import BatchEvaluator
+
+# Randomized checks that the faster ways of calculating the totals agree with the full recalculation:
+# the incremental calculate_total after random probe changes, and BatchEvaluator on random loadouts.
+# Besides the game's maps (which are trees), a synthetic map with connections between regions
+# (so with cycles) and a hub with more neighbours than any game node are checked.
+#
+#   python -m unittest test_equivalence        or        python -m pytest test_equivalence.py
+
+TOTAL_KEYS = ("total miranium", "total credits", "total storage", "total cost")
+
+def make_cyclic_node_data(seed=0):
+    return make_node_data(300, seed=seed, cross_region_edges=40)
+
+def make_hub_node_data(leaf_count=18):
+    # One node connected to leaf_count leaves
+    leaves = [f"l{i}" for i in range(leaf_count)]
+    return {"Primordia": [("hub", "Hub", ProdRank.A, RevRank.S, "B", None, None, leaves)] +
+            [(leaf, f"Leaf {leaf}", ProdRank.B, RevRank.A, "B", None, None, ["hub"]) for leaf in leaves]}
+
+def get_totals(totals):
+    # calculate_total's result with the resources in a fixed order
+    result = {key: totals[key] for key in TOTAL_KEYS}
+    result["possible resources"] = sorted(totals["possible resources"])
+    return result
+
+class IncrementalEquivalenceTest(unittest.TestCase):
+    # Random probe changes (and locks) are made to an incremental and a full FrontierNav of the
+    # same map, and their totals are compared every few changes
+
+    def check_random_changes(self, node_data, steps, seed):
+        incremental = FrontierNav(FrontierNav.load_game_data(node_data))
+        full = FrontierNav(FrontierNav.load_game_data(node_data), incremental=False)
+        keys = incremental.slot_keys
+        names = [probe.name for probe in incremental.probe_index.probes]
+        rng = random.Random(seed)
+
+        pool = names
+        for step in range(steps):
+            if step % 100 == 0:
+                # Changes from a few probes at a time build up links and duplicator groups
+                pool = rng.sample(names, rng.choice([1, 2, 3, 5, len(names)]))
+            key = rng.choice(keys)
+            change = {key: "Probe Slot Locked" if rng.random() < 0.05 else rng.choice(pool)}
+            incremental.apply_loadout(change)
+            full.apply_loadout(change)
+            if rng.random() < 0.3:
+                self.assertEqual(get_totals(incremental.calculate_total()), get_totals(full.calculate_total()),
+                                 f"step {step}, after {change}")
+
+    def test_node_data(self):
+        self.check_random_changes(NODE_DATA, 1500, seed=1)
+
+    def test_test_data(self):
+        self.check_random_changes(TEST_DATA, 1000, seed=2)
+
+    def test_map_with_cycles(self):
+        self.check_random_changes(make_cyclic_node_data(seed=3), 1500, seed=3)
+
+    def test_high_degree_hub(self):
+        self.check_random_changes(make_hub_node_data(), 500, seed=4)
+
+class BatchEquivalenceTest(unittest.TestCase):
+    # Random loadouts are evaluated in one batch and compared with calculate_total on each
+
+    def check_random_loadouts(self, node_data, count, seed, extra_setups=None):
+        frontier_nav = FrontierNav(FrontierNav.load_game_data(node_data), incremental=False)
+        rng = random.Random(seed)
+        probes = frontier_nav.probe_index.probes
+
+        setups = list(extra_setups or [])
+        for i in range(count):
+            pool = rng.sample(probes, rng.choice([1, 2, 3, 5, len(probes)]))
+            setups.append(random_loadout(frontier_nav, rng, pool))
+        self.check_loadouts(frontier_nav, setups)
+
+    def check_loadouts(self, frontier_nav, setups, chunk_size=16):
+        evaluator = BatchEvaluator(frontier_nav, chunk_size=chunk_size)
+        results = evaluator.evaluate([evaluator.encode(setup) for setup in setups])
+
+        for i, setup in enumerate(setups):
+            frontier_nav.apply_loadout(setup)
+            expected = get_totals(frontier_nav.calculate_total())
+            got = {key: int(results[key][i]) for key in TOTAL_KEYS}
+            got["possible resources"] = sorted(resource for resource, possible in
+                                               zip(evaluator.resources, results["possible resources"][i]) if possible)
+            self.assertEqual(got, expected, f"loadout {i}: {setup}")
+
+    def test_node_data(self):
+        self.check_random_loadouts(NODE_DATA, 200, seed=1)
+
+    def test_test_data(self):
+        self.check_random_loadouts(TEST_DATA, 100, seed=2)
+
+    def test_map_with_cycles(self):
+        self.check_random_loadouts(make_cyclic_node_data(seed=3), 100, seed=3)
+
+    def test_high_degree_hub(self):
+        # Every pair of a probe at the hub and one probe at all of its leaves, so each neighbour
+        # count gets past what the narrowest packed field could hold
+        node_data = make_hub_node_data()
+        frontier_nav = FrontierNav(FrontierNav.load_game_data(node_data))
+        names = [probe.name for probe in frontier_nav.probe_index.probes]
+        setups = [{key: hub_name if key == "Primordia_hub" else leaf_name for key in frontier_nav.slot_keys}
+                  for hub_name in names for leaf_name in names]
+        self.check_random_loadouts(node_data, 200, seed=4, extra_setups=setups)
+
+    def test_no_loadouts(self):
+        frontier_nav = FrontierNav(FrontierNav.load_game_data(NODE_DATA))
+        results = BatchEvaluator(frontier_nav).evaluate([])
+        for key in TOTAL_KEYS:
+            self.assertEqual(len(results[key]), 0)
+
+if __name__ == "__main__":
+    unittest.main()
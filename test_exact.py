@@ -0,0 +1,44 @@
+import unittest
+from data import NODE_DATA
+from mapgen import make_node_data
+from frontiernav import FrontierNav
+from exact import ExactSolver, compare_with_brute_force
+
+# The exact solver checked against brute force over every loadout of small random trees
+
+PROBES = ["Probe Slot Locked", "Mining G1 Probe", "Booster G1 Probe", "Duplicator Probe", "Research G1 Probe"]
+
+class ExactSolverTest(unittest.TestCase):
+
+    def test_matches_brute_force(self):
+        # 6 nodes and 5 probes is 15625 loadouts for brute force
+        cases = [
+            (make_node_data(6, seed=1), "miranium", None),
+            (make_node_data(6, seed=1), {"credits": 1, "miranium": 0.5}, 12000),
+            (make_node_data(6, seed=2, max_degree=6), "miranium", 9000),
+            (make_node_data(6, seed=3, max_degree=6), "credits", None)
+        ]
+        for node_data, objective, budget in cases:
+            comparison = compare_with_brute_force(node_data, objective, budget, {"probes": PROBES})
+            self.assertEqual(comparison["exact score"], comparison["brute force score"], f"{objective}, budget {budget}")
+
+    def test_installs_the_loadout_it_scores(self):
+        frontier_nav = FrontierNav(FrontierNav.load_game_data(make_node_data(6, seed=1)))
+        result = ExactSolver(frontier_nav, "miranium", 9000, {"probes": PROBES}).run()
+        totals = frontier_nav.calculate_total()
+        self.assertEqual(result["score"], totals["total miranium"])
+        self.assertLessEqual(totals["total cost"], 9000)
+        self.assertEqual(result["loadout"], frontier_nav.get_loadout())
+
+    def test_rejects_maps_with_cycles(self):
+        frontier_nav = FrontierNav(FrontierNav.load_game_data(make_node_data(30, seed=1, cross_region_edges=5)))
+        with self.assertRaises(ValueError):
+            ExactSolver(frontier_nav, "miranium", None, {"probes": PROBES}).run()
+
+    def test_rejects_intractable_budgets(self):
+        frontier_nav = FrontierNav(FrontierNav.load_game_data(NODE_DATA))
+        with self.assertRaises(ValueError):
+            ExactSolver(frontier_nav, "miranium", 2000000)
+
+if __name__ == "__main__":
+    unittest.main()
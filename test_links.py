@@ -0,0 +1,63 @@
+import random
+import unittest
+from data import NODE_DATA
+from mapgen import make_node_data
+from frontiernav import FrontierNav
+from links import LinkIndex
+
+# The link index kept up to date one probe change at a time checked against one built from scratch
+# (a search over the whole loadout) after random probe changes
+
+LINK_PROBES = ["Mining G1 Probe", "Mining G2 Probe", "Research G1 Probe", "Storage Probe", "Duplicator Probe",
+               "Probe Slot Locked"]
+
+def get_components(link_index, slots):
+    # Each slot's component as the set of its slots' indices, with its multiplier
+    return [(frozenset(linked_slot.index for linked_slot in link_index.get_linked_slots(slot)), link_index.get_multiplier(slot))
+            for slot in slots]
+
+class LinkIndexTest(unittest.TestCase):
+
+    def check_random_changes(self, node_data, steps, seed):
+        frontier_nav = FrontierNav(FrontierNav.load_game_data(node_data))
+        keys = frontier_nav.slot_keys
+        rng = random.Random(seed)
+
+        for step in range(steps):
+            # A few probes at a time, so changes join and split large components
+            change = {rng.choice(keys): rng.choice(LINK_PROBES[:2] if step % 200 < 150 else LINK_PROBES)}
+            frontier_nav.apply_loadout(change)
+            if rng.random() < 0.1:
+                rebuilt = LinkIndex(frontier_nav.slot_table)
+                self.assertEqual(get_components(frontier_nav.link_index, frontier_nav.slot_table),
+                                 get_components(rebuilt, frontier_nav.slot_table), f"step {step}, after {change}")
+
+    def test_node_data(self):
+        self.check_random_changes(NODE_DATA, 2000, seed=1)
+
+    def test_map_with_cycles(self):
+        # Removing a slot from a cycle mustn't split its component
+        self.check_random_changes(make_node_data(200, seed=2, cross_region_edges=40), 2000, seed=2)
+
+    def test_split_and_join(self):
+        # The busiest slot of a tree where every slot has the same probe is taken out of its
+        # component and put back
+        frontier_nav = FrontierNav(FrontierNav.load_game_data(make_node_data(60, seed=3)))
+        link_index = frontier_nav.link_index
+        slot = max(frontier_nav.slot_table, key=lambda slot: len(slot.get_adjacent_slots()))
+        key = frontier_nav.slot_keys[slot.index]
+        frontier_nav.apply_loadout({slot_key: "Mining G1 Probe" for slot_key in frontier_nav.slot_keys})
+        size = len(link_index.get_linked_slots(slot))
+
+        # Each neighbour ends up in its own part of the component
+        frontier_nav.apply_loadout({key: "Research G1 Probe"})
+        parts = {link_index.get_component(adj_slot) for adj_slot in slot.get_adjacent_slots()}
+        self.assertEqual(len(parts), len(slot.get_adjacent_slots()))
+        self.assertEqual(sum(len(part) for part in parts), size - 1)
+
+        frontier_nav.apply_loadout({key: "Mining G1 Probe"})
+        self.assertEqual(len(link_index.get_linked_slots(slot)), size)
+        self.assertEqual(len({link_index.get_component(adj_slot) for adj_slot in slot.get_adjacent_slots()}), 1)
+
+if __name__ == "__main__":
+    unittest.main()
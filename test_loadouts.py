@@ -0,0 +1,79 @@
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from data import NODE_DATA, TEST_DATA
+from mapgen import random_loadout
+from frontiernav import FrontierNav
+from loadouts import LoadoutCodec, LoadoutStore
+
+# Saved probe setups packed and read back unchanged
+
+class LoadoutStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.file_name = os.path.join(self.directory, "test.loadouts")
+        self.frontier_nav = FrontierNav(FrontierNav.load_game_data(NODE_DATA))
+        self.codec = LoadoutCodec.from_frontier_nav(self.frontier_nav)
+        rng = random.Random(0)
+        self.setups = [random_loadout(self.frontier_nav, rng) for i in range(50)]
+        # Setups that only mention some slots keep the rest out of the decoded setup
+        self.setups.append({self.frontier_nav.slot_keys[0]: "Basic Probe"})
+        self.setups.append({})
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_codec(self):
+        for setup in self.setups:
+            packed = self.codec.encode(setup)
+            self.assertEqual(len(packed), len(self.frontier_nav.slot_keys))
+            self.assertEqual(self.codec.decode(packed), setup)
+        with self.assertRaises(ValueError):
+            self.codec.encode({"Primordia_nowhere": "Basic Probe"})
+        with self.assertRaises(ValueError):
+            self.codec.encode({self.frontier_nav.slot_keys[0]: "Mining G99 Probe"})
+
+    def test_round_trip(self):
+        with LoadoutStore(self.file_name, self.codec) as store:
+            self.assertEqual(store.append(self.setups[0]), 0)
+            self.assertEqual(store.extend(self.setups[1:]), 1)
+
+        # Reopened without a codec, from the names saved in the header
+        with LoadoutStore(self.file_name) as store:
+            self.assertEqual(len(store), len(self.setups))
+            self.assertEqual(list(store), self.setups)
+            self.assertEqual(store[-1], self.setups[-1])
+            self.assertEqual(store[3], self.setups[3])
+            with self.assertRaises(IndexError):
+                store[len(self.setups)]
+
+    def test_cut_short_record(self):
+        with LoadoutStore(self.file_name, self.codec) as store:
+            store.extend(self.setups[:3])
+        with open(self.file_name, "ab") as f:
+            f.write(b"\0\0\0")
+        with LoadoutStore(self.file_name) as store:
+            self.assertEqual(len(store), 3)
+            self.assertEqual(store.append(self.setups[3]), 3)
+            self.assertEqual(list(store), self.setups[:4])
+
+    def test_other_map(self):
+        with LoadoutStore(self.file_name, self.codec):
+            pass
+        other = LoadoutCodec.from_frontier_nav(FrontierNav(FrontierNav.load_game_data(TEST_DATA)))
+        with self.assertRaises(ValueError):
+            LoadoutStore(self.file_name, other)
+
+    def test_damaged(self):
+        with open(self.file_name, "wb") as f:
+            f.write(b"not a store")
+        with self.assertRaises(ValueError):
+            LoadoutStore(self.file_name)
+        with self.assertRaises(ValueError):
+            self.codec.decode(bytes([200]) * len(self.codec))
+
+if __name__ == "__main__":
+    unittest.main()
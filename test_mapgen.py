@@ -0,0 +1,87 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from mapgen import make_node_data, random_loadouts, main
+from frontiernav import FrontierNav
+from snapshot import load_snapshot
+from test_snapshot import describe_nodes
+
+# Synthetic maps are the same for the same seed, have the requested shape and load like NODE_DATA
+
+def get_edges(node_data):
+    # Every connection once, as a pair of node ids, after checking each is listed at both ends
+    connections = {node[0]: node[7] for region_nodes in node_data.values() for node in region_nodes}
+    edges = set()
+    for node_id, connected in connections.items():
+        for other_id in connected:
+            assert node_id in connections[other_id], f"{node_id} -> {other_id} only goes one way"
+            edges.add(frozenset((node_id, other_id)))
+    return connections, edges
+
+def count_parts(connections):
+    # Number of separate parts of the map
+    parts = 0
+    seen = set()
+    for start in connections:
+        if start in seen:
+            continue
+        parts += 1
+        seen.add(start)
+        stack = [start]
+        while stack:
+            for other_id in connections[stack.pop()]:
+                if other_id not in seen:
+                    seen.add(other_id)
+                    stack.append(other_id)
+    return parts
+
+class MapGenTest(unittest.TestCase):
+
+    def test_same_seed_same_map(self):
+        self.assertEqual(make_node_data(500, seed=1), make_node_data(500, seed=1))
+        self.assertNotEqual(make_node_data(500, seed=1), make_node_data(500, seed=2))
+
+        frontier_nav = FrontierNav(FrontierNav.load_game_data(make_node_data(50, seed=1)))
+        self.assertEqual(list(random_loadouts(frontier_nav, 3, seed=1)), list(random_loadouts(frontier_nav, 3, seed=1)))
+        self.assertNotEqual(list(random_loadouts(frontier_nav, 3, seed=1)), list(random_loadouts(frontier_nav, 3, seed=2)))
+
+    def test_tree(self):
+        node_data = make_node_data(1000, seed=1, regions=3)
+        connections, edges = get_edges(node_data)
+        self.assertEqual(list(node_data), ["Primordia", "Noctilum", "Oblivia"])
+        self.assertEqual([len(region_nodes) for region_nodes in node_data.values()], [334, 333, 333])
+        self.assertEqual(len(edges), 999)
+        self.assertEqual(count_parts(connections), 1)
+        self.assertLessEqual(max(len(connected) for connected in connections.values()), 4)
+
+    def test_cross_region_edges(self):
+        node_data = make_node_data(1000, seed=2, cross_region_edges=50)
+        connections, edges = get_edges(node_data)
+        self.assertEqual(len(edges), 999 + 50)
+        self.assertEqual(count_parts(connections), 1)
+        self.assertLessEqual(max(len(connected) for connected in connections.values()), 4)
+
+    def test_degree_weights(self):
+        node_data = make_node_data(1000, seed=3, degree_weights={1: 1, 8: 1})
+        connections, edges = get_edges(node_data)
+        self.assertEqual(count_parts(connections), 1)
+        self.assertGreater(max(len(connected) for connected in connections.values()), 4)
+
+    def test_snapshot_from_main(self):
+        # The command line writes the same map as make_node_data
+        directory = tempfile.mkdtemp()
+        try:
+            file_name = os.path.join(directory, "synthetic.snapshot")
+            with redirect_stdout(io.StringIO()):
+                main(["300", "--seed", "4", "--regions", "2", "--output", file_name])
+            from_snapshot = FrontierNav(load_snapshot(file_name))
+            expected = FrontierNav(FrontierNav.load_game_data(make_node_data(300, seed=4, regions=2)))
+            self.assertEqual(describe_nodes(from_snapshot), describe_nodes(expected))
+        finally:
+            shutil.rmtree(directory)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import random
+import unittest
+from data import NODE_DATA
+from mapgen import make_node_data, random_loadout
+from frontiernav import FrontierNav
+
+# FrontierNav.get_marginal_gains checked against making each swap and recalculating the whole map
+
+class MarginalGainsTest(unittest.TestCase):
+
+    def check_gains(self, node_data, seed, probe_names=None):
+        frontier_nav = FrontierNav(FrontierNav.load_game_data(node_data))
+        reference = FrontierNav(FrontierNav.load_game_data(node_data), incremental=False)
+        setup = random_loadout(frontier_nav, random.Random(seed))
+        frontier_nav.apply_loadout(setup)
+        reference.apply_loadout(setup)
+        probes = None if probe_names is None else [frontier_nav.find_probe(name) for name in probe_names]
+
+        totals = frontier_nav.calculate_total()
+        gains = frontier_nav.get_marginal_gains(probes)
+
+        # Nothing is left changed
+        self.assertEqual(frontier_nav.get_loadout(), setup)
+        self.assertEqual(frontier_nav.calculate_total(), totals)
+
+        start = reference.calculate_total()
+        for gain in random.Random(seed).sample(gains, min(300, len(gains))):
+            reference.apply_loadout({gain["slot"]: gain["probe"]})
+            swapped = reference.calculate_total()
+            reference.apply_loadout({gain["slot"]: setup[gain["slot"]]})
+            expected = {name: swapped[f"total {name}"] - start[f"total {name}"] for name in ("miranium", "credits", "storage", "cost")}
+            self.assertEqual({name: gain[name] for name in expected}, expected, f"{gain['slot']} to {gain['probe']}")
+
+        # One gain per slot for every probe but the installed one
+        names = probe_names or [probe.name for probe in frontier_nav.probe_index.probes]
+        self.assertEqual(len(gains), sum(len(set(names) - {setup[key]}) for key in frontier_nav.slot_keys))
+
+    def test_node_data(self):
+        self.check_gains(NODE_DATA, seed=1)
+
+    def test_map_with_cycles(self):
+        self.check_gains(make_node_data(200, seed=2, cross_region_edges=40), seed=2,
+                         probe_names=["Mining G1 Probe", "Booster G2 Probe", "Duplicator Probe", "Storage Probe"])
+
+    def test_cancelled(self):
+        frontier_nav = FrontierNav(FrontierNav.load_game_data(NODE_DATA))
+        frontier_nav.apply_loadout(random_loadout(frontier_nav, random.Random(3)))
+        setup = frontier_nav.get_loadout()
+        totals = frontier_nav.calculate_total()
+        calls = []
+        self.assertIsNone(frontier_nav.get_marginal_gains(cancelled=lambda: calls.append(1) or len(calls) > 5))
+        self.assertEqual(frontier_nav.get_loadout(), setup)
+        self.assertEqual(frontier_nav.calculate_total(), totals)
+
+    def test_needs_incremental(self):
+        frontier_nav = FrontierNav(FrontierNav.load_game_data(NODE_DATA), incremental=False)
+        with self.assertRaises(ValueError):
+            frontier_nav.get_marginal_gains()
+
+if __name__ == "__main__":
+    unittest.main()
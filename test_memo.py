@@ -0,0 +1,67 @@
+import random
+import unittest
+from data import NODE_DATA
+from mapgen import make_node_data
+from frontiernav import FrontierNav
+
+# The memoized slot outputs (OutputCache and CopiedOutputCache) checked against calculating every
+# slot with no memo, after random probe changes, with caches large enough to keep every entry and
+# small enough to drop entries all the time
+
+DUPLICATOR_HEAVY = ["Duplicator Probe", "Duplicator Probe", "Mining G1 Probe", "Research G1 Probe", "Booster G1 Probe",
+                    "Storage Probe"]
+
+def get_slot_breakdowns(frontier_nav):
+    slots = frontier_nav.get_breakdown()["slots"]
+    for breakdown in slots.values():
+        breakdown["possible resources"] = sorted(breakdown["possible resources"])
+    return slots
+
+class OutputCacheTest(unittest.TestCase):
+
+    def check_random_changes(self, node_data, steps, seed):
+        reference = FrontierNav(FrontierNav.load_game_data(node_data), output_cache_size=0, copied_output_cache_size=0)
+        memoized = FrontierNav(FrontierNav.load_game_data(node_data))
+        small = FrontierNav(FrontierNav.load_game_data(node_data), output_cache_size=8, copied_output_cache_size=4)
+        self.assertIsNone(reference.output_cache)
+        self.assertIsNone(reference.copied_output_cache)
+
+        keys = reference.slot_keys
+        names = [probe.name for probe in reference.probe_index.probes]
+        rng = random.Random(seed)
+        for step in range(steps):
+            pool = DUPLICATOR_HEAVY if step % 200 < 100 else names
+            change = {rng.choice(keys): rng.choice(pool)}
+            for frontier_nav in (reference, memoized, small):
+                frontier_nav.apply_loadout(change)
+            if rng.random() < 0.05:
+                expected = get_slot_breakdowns(reference)
+                self.assertEqual(get_slot_breakdowns(memoized), expected, f"step {step}, after {change}")
+                self.assertEqual(get_slot_breakdowns(small), expected, f"step {step}, after {change} (small caches)")
+
+        # Both memos were used, and the small ones had to drop entries
+        self.assertGreater(memoized.output_cache.hits, 0)
+        self.assertGreater(memoized.copied_output_cache.hits, 0)
+        self.assertGreater(small.output_cache.get_stats()["evictions"], 0)
+        self.assertGreater(small.copied_output_cache.get_stats()["clears"], 0)
+        self.assertLessEqual(len(small.output_cache), 8)
+        self.assertLessEqual(len(small.copied_output_cache), 4)
+
+    def test_node_data(self):
+        self.check_random_changes(NODE_DATA, 1000, seed=1)
+
+    def test_map_with_cycles(self):
+        self.check_random_changes(make_node_data(200, seed=2, cross_region_edges=40), 1000, seed=2)
+
+    def test_shared_entries(self):
+        # Slots with the same local setup share one entry, so a map full of one probe needs few
+        frontier_nav = FrontierNav(FrontierNav.load_game_data(NODE_DATA))
+        frontier_nav.apply_loadout({key: "Mining G1 Probe" for key in frontier_nav.slot_keys})
+        frontier_nav.calculate_total()
+        stats = frontier_nav.output_cache.get_stats()
+        self.assertEqual(stats["size"], stats["misses"])
+        self.assertLess(stats["size"], len(frontier_nav.slot_table))
+        self.assertGreater(stats["hits"], 0)
+
+if __name__ == "__main__":
+    unittest.main()
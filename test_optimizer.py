@@ -0,0 +1,47 @@
+import unittest
+from data import TEST_DATA
+from mapgen import make_node_data
+from frontiernav import FrontierNav
+
+# The annealer (FrontierNav.optimize with method="anneal") checked against the exact solver's optimum
+# on small trees, where ExactSolver runs in about a second
+
+PROBES = ["Probe Slot Locked", "Mining G10 Probe", "Booster G2 Probe", "Duplicator Probe", "Research G6 Probe"]
+CHEAP_PROBES = ["Basic Probe", "Mining G1 Probe", "Mining G2 Probe", "Duplicator Probe"]
+
+class AnnealTest(unittest.TestCase):
+
+    def check_against_exact(self, node_data, objective, budget, probes, ratio):
+        frontier_nav = FrontierNav(FrontierNav.load_game_data(node_data))
+        constraints = {"probes": probes}
+        exact = frontier_nav.optimize(objective, budget, constraints, method="exact")
+        anneal = frontier_nav.optimize(objective, budget, constraints, seed=0)
+
+        # The annealer leaves its loadout installed, within the budget and using only the allowed probes
+        totals = frontier_nav.calculate_total()
+        if budget is not None:
+            self.assertLessEqual(totals["total cost"], budget)
+        self.assertTrue(set(anneal["loadout"].values()) <= set(probes) | {"Probe Slot Locked"})
+
+        self.assertLessEqual(anneal["score"], exact["score"])
+        self.assertGreaterEqual(anneal["score"], ratio * exact["score"],
+                                f"anneal reached {anneal['score']}, the optimum is {exact['score']}")
+
+    def test_test_data(self):
+        for objective, budget in (("miranium", None), ("miranium", 150000), ({"miranium": 1, "credits": 1}, 120000)):
+            self.check_against_exact(TEST_DATA, objective, budget, PROBES, 0.99)
+
+    def test_tree_with_budget(self):
+        # Cheap probes and a tight budget, where the score depends on building link groups
+        self.check_against_exact(make_node_data(60, seed=1), "miranium", 20000, CHEAP_PROBES, 0.97)
+
+    def test_constraints(self):
+        frontier_nav = FrontierNav(FrontierNav.load_game_data(TEST_DATA))
+        keys = frontier_nav.slot_keys
+        constraints = {"probes": PROBES, "fixed": {keys[0]: "Basic Probe"}, "locked": [keys[1]]}
+        result = frontier_nav.optimize("miranium", 100000, constraints, restarts=2, seed=0)
+        self.assertEqual(result["loadout"][keys[0]], "Basic Probe")
+        self.assertEqual(result["loadout"][keys[1]], "Probe Slot Locked")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+import numpy as np
+from data import TEST_DATA
+from mapgen import make_node_data
+from frontiernav import FrontierNav
+from pareto import AXES, SIGNS, get_non_dominated, ParetoExplorer
+
+# The Pareto front checked against brute-force dominance, its totals against calculate_total, and
+# its best miranium at a budget against the exact solver's optimum
+
+CHEAP_PROBES = ["Basic Probe", "Mining G1 Probe", "Mining G2 Probe", "Duplicator Probe"]
+
+def dominates(a, b):
+    return all(x >= y for x, y in zip(a, b)) and any(x > y for x, y in zip(a, b))
+
+class ParetoTest(unittest.TestCase):
+
+    def test_non_dominated(self):
+        # Small integer values, so there are ties and duplicate points
+        rng = np.random.default_rng(1)
+        for count, chunk_size in ((1, 256), (50, 256), (300, 7)):
+            points = rng.integers(0, 5, size=(count, 4))
+            expected = [not any(dominates(other, point) for other in points) for point in points]
+            self.assertEqual(get_non_dominated(points, chunk_size).tolist(), expected)
+
+    def test_front(self):
+        frontier_nav = FrontierNav(FrontierNav.load_game_data(make_node_data(60, seed=1)))
+        keys = frontier_nav.slot_keys
+        constraints = {"probes": CHEAP_PROBES, "fixed": {keys[0]: "Duplicator Probe"}, "locked": [keys[1]]}
+        front = ParetoExplorer(frontier_nav, constraints, budget=30000, archive_size=64, batch_size=256).run(20, seed=1)
+        self.assertLessEqual(len(front), 64)
+
+        points = []
+        for entry in front:
+            frontier_nav.apply_loadout(entry["loadout"])
+            totals = frontier_nav.calculate_total()
+            self.assertEqual(entry["totals"], {name: totals[name] for name in AXES})
+            self.assertLessEqual(totals["total cost"], 30000)
+            self.assertEqual(entry["loadout"][keys[0]], "Duplicator Probe")
+            self.assertEqual(entry["loadout"][keys[1]], "Probe Slot Locked")
+            self.assertTrue(set(entry["loadout"].values()) <= set(CHEAP_PROBES) | {"Probe Slot Locked"})
+            points.append([entry["totals"][name] * sign for name, sign in zip(AXES, SIGNS)])
+
+        # Nothing on the front dominates anything else on it, and it's cheapest first
+        self.assertTrue(get_non_dominated(points).all())
+        costs = [entry["totals"]["total cost"] for entry in front]
+        self.assertEqual(costs, sorted(costs))
+
+        # No loadout on the front beats the most miranium possible for its cost
+        for entry in front[::8]:
+            cost = entry["totals"]["total cost"]
+            exact = frontier_nav.optimize("miranium", cost, constraints, method="exact")
+            self.assertLessEqual(entry["totals"]["total miranium"], exact["score"])
+
+    def test_fixed_probes_over_budget(self):
+        frontier_nav = FrontierNav(FrontierNav.load_game_data(TEST_DATA))
+        constraints = {"fixed": {frontier_nav.slot_keys[0]: "Mining G10 Probe"}}
+        with self.assertRaises(ValueError):
+            ParetoExplorer(frontier_nav, constraints, budget=1000, batch_size=16).run(1, seed=1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+from data import TEST_DATA
+from mapgen import make_node_data
+from frontiernav import FrontierNav
+from exact import ExactSolver
+
+# The upgrade planner checked against the exact solver's cheapest loadout for the target on a small
+# tree, and checked to describe the purchases it plans
+
+CHEAP_PROBES = ["Basic Probe", "Mining G1 Probe", "Mining G2 Probe", "Duplicator Probe"]
+
+class UpgradePlannerTest(unittest.TestCase):
+
+    def test_matches_exact_cheapest(self):
+        # The beam alone needs 20000 for this target, the cheapest loadout costs 14000
+        frontier_nav = FrontierNav(FrontierNav.load_game_data(make_node_data(60, seed=1)))
+        constraints = {"probes": CHEAP_PROBES}
+        plan = frontier_nav.plan_upgrades({"miranium": 18000}, constraints)
+        self.assertTrue(plan["reached"])
+
+        solver = ExactSolver(frontier_nav, "miranium", plan["cost"], {"probes": CHEAP_PROBES + ["Probe Slot Locked"]})
+        cheapest = solver.find_cheapest(18000)
+        self.assertEqual(plan["cost"], cheapest["totals"]["total cost"])
+
+    def test_describes_its_purchases(self):
+        # A single total (where the exact solver may replace the beam's plan) and several (the beam alone)
+        for target in ({"miranium": 3000}, {"miranium": 3000, "credits": 500}):
+            frontier_nav = FrontierNav(FrontierNav.load_game_data(TEST_DATA))
+            start = frontier_nav.get_loadout()
+            plan = frontier_nav.plan_upgrades(target)
+
+            # The installed loadout isn't changed
+            self.assertEqual(frontier_nav.get_loadout(), start)
+
+            # Buying the steps in order gives each step's totals, and the plan's cost and totals at the end
+            for step in plan["steps"]:
+                self.assertEqual(frontier_nav.get_loadout()[step["slot"]], step["from"])
+                frontier_nav.apply_loadout({step["slot"]: step["to"]})
+                self.assertEqual(frontier_nav.calculate_total(), step["totals"])
+            self.assertEqual(sum(step["cost"] for step in plan["steps"]), plan["cost"])
+            self.assertEqual(frontier_nav.get_loadout(), plan["loadout"])
+            self.assertTrue(plan["reached"])
+            for name, value in target.items():
+                self.assertGreaterEqual(plan["totals"][f"total {name}"], value)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import os
+import shutil
+import tempfile
+import unittest
+from data import NODE_DATA
+from frontiernav import FrontierNav
+from profiler import STAGES, EvaluationProfiler
+from test_equivalence import get_totals
+
+# Profiling a calculation gives the same totals, counts each stage's calls, and puts every
+# original function back afterwards
+
+class EvaluationProfilerTest(unittest.TestCase):
+
+    def setUp(self):
+        # No memo, so every slot goes through every stage of its calculation
+        self.frontier_nav = FrontierNav(FrontierNav.load_game_data(NODE_DATA), output_cache_size=0)
+        self.frontier_nav.apply_loadout({key: "Mining G1 Probe" if i % 3 else "Duplicator Probe"
+                                         for i, key in enumerate(self.frontier_nav.slot_keys)})
+        self.originals = [getattr(owner, attribute) for owner, attribute, stage, get_slot, get_visits in STAGES]
+
+    def assert_restored(self):
+        self.assertEqual([getattr(owner, attribute) for owner, attribute, stage, get_slot, get_visits in STAGES],
+                         self.originals)
+
+    def test_same_totals(self):
+        unprofiled = FrontierNav(FrontierNav.load_game_data(NODE_DATA))
+        unprofiled.apply_loadout(self.frontier_nav.get_loadout())
+        expected = get_totals(unprofiled.calculate_total())
+        with EvaluationProfiler(self.frontier_nav) as profiler:
+            totals = get_totals(self.frontier_nav.calculate_total())
+        self.assertEqual(totals, expected)
+        self.assert_restored()
+
+        # One full calculation updates each slot once
+        summary = {row["stage"]: row for row in profiler.get_summary()}
+        self.assertEqual(summary["calculate_total"]["calls"], 1)
+        self.assertEqual(summary["update_slot_output"]["calls"], len(self.frontier_nav.slot_table))
+        slot_rows = profiler.get_slot_summary("update_slot_output")
+        self.assertEqual(sorted(row["slot"] for row in slot_rows), sorted(self.frontier_nav.slot_keys))
+        self.assertTrue(all(row["calls"] == 1 for row in slot_rows))
+        for row in summary.values():
+            self.assertLessEqual(row["self seconds"], row["seconds"] + 1e-9)
+
+    def test_folded(self):
+        directory = tempfile.mkdtemp()
+        try:
+            file_name = os.path.join(directory, "calculate.folded")
+            with EvaluationProfiler(self.frontier_nav) as profiler:
+                self.frontier_nav.calculate_total()
+            profiler.write_folded(file_name)
+            with open(file_name) as f:
+                lines = f.read().splitlines()
+        finally:
+            shutil.rmtree(directory)
+
+        # Every stack starts at the outermost call, and the self times add up to the whole calculation
+        self.assertTrue(lines)
+        stacks = [line.rsplit(" ", 1) for line in lines]
+        self.assertTrue(all(stack.split(";")[0] == "calculate_total" for stack, microseconds in stacks))
+        total = sum(int(microseconds) for stack, microseconds in stacks)
+        calculate_seconds = profiler.get_summary()[0]["seconds"]
+        self.assertAlmostEqual(total / 1e6, calculate_seconds, delta=calculate_seconds * 0.01 + len(lines) * 1e-6)
+
+    def test_one_at_a_time(self):
+        with EvaluationProfiler(self.frontier_nav):
+            with self.assertRaises(RuntimeError):
+                EvaluationProfiler().start()
+        self.assert_restored()
+
+    def test_restored_after_an_error(self):
+        with self.assertRaises(ValueError):
+            with EvaluationProfiler(self.frontier_nav):
+                self.frontier_nav.calculate_total()
+                raise ValueError("stopped in the middle")
+        self.assert_restored()
+        with EvaluationProfiler(self.frontier_nav):
+            pass
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import csv
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from data import NODE_DATA
+from mapgen import make_node_data
+from frontiernav import FrontierNav
+from report import ReportWriter, iter_report, write_report
+
+# The streaming report in each format, against the records it was made from
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+def make_frontier_nav():
+    frontier_nav = FrontierNav(FrontierNav.load_game_data(NODE_DATA))
+    frontier_nav.apply_loadout({key: "Mining G3 Probe" for key in frontier_nav.slot_keys[::3]})
+    return frontier_nav
+
+def render(frontier_nav, output_format, terminal=False):
+    out = io.StringIO()
+    writer = ReportWriter(out, output_format, terminal)
+    for record in iter_report(frontier_nav):
+        writer.write(record)
+    writer.close()
+    return out.getvalue()
+
+class ReportTest(unittest.TestCase):
+
+    def setUp(self):
+        self.frontier_nav = make_frontier_nav()
+        self.records = list(iter_report(self.frontier_nav))
+
+    def test_records(self):
+        self.assertEqual(len(self.records), len(self.frontier_nav.slot_keys))
+        self.assertEqual([f"{record['region']}_{record['node id']}" for record in self.records], self.frontier_nav.slot_keys)
+        self.assertEqual([record["installed probe"] for record in self.records],
+                         [slot.installed_probe.name for slot in self.frontier_nav.slot_table])
+
+    def test_jsonl(self):
+        lines = render(self.frontier_nav, "jsonl").splitlines()
+        self.assertEqual([json.loads(line) for line in lines], self.records)
+
+    def test_csv(self):
+        rows = list(csv.reader(io.StringIO(render(self.frontier_nav, "csv"))))
+        self.assertEqual(len(rows), len(self.records) + 1)
+        self.assertEqual(rows[1][:6], [str(self.records[0][column]) for column in rows[0][:6]])
+
+    def test_text_layouts(self):
+        # Saved files have a blank line before each node name, the terminal one after it
+        first = self.records[0]
+        saved = render(self.frontier_nav, "text")
+        printed = render(self.frontier_nav, "text", terminal=True)
+        self.assertIn(f"\n\n>>> {first['region']} <<<\n\n{first['name']}\n- Production Rank:", saved)
+        self.assertIn(f"\n\n>>> {first['region']} <<<\n{first['name']}\n\n- Production Rank:", printed)
+        self.assertEqual(saved.count("- Installed Probe:"), len(self.records))
+
+        stdout = io.StringIO()
+        with redirect_stdout(stdout):
+            self.frontier_nav.print_game_data()
+        self.assertEqual(stdout.getvalue(), printed)
+
+    def test_closed_pipe(self):
+        # A reader that stops early ends the report without a traceback
+        from snapshot import write_snapshot
+        directory = tempfile.mkdtemp()
+        try:
+            snapshot_file = os.path.join(directory, "map.snapshot")
+            write_snapshot(FrontierNav.load_game_data(make_node_data(5000)), snapshot_file)
+            process = subprocess.Popen([sys.executable, os.path.join(ROOT, "main.py"), "report", "--snapshot", snapshot_file],
+                                       stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            process.stdout.readline()
+            process.stdout.close()
+            stderr = process.stderr.read().decode()
+            process.stderr.close()
+            self.assertEqual(process.wait(), 0, stderr)
+            self.assertNotIn("Traceback", stderr)
+        finally:
+            shutil.rmtree(directory)
+
+if __name__ == "__main__":
+    unittest.main()
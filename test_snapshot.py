@@ -0,0 +1,75 @@
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from data import NODE_DATA, TEST_DATA
+from mapgen import make_node_data, random_loadout
+from frontiernav import FrontierNav
+from snapshot import write_snapshot, load_snapshot, GameDataSnapshot, SnapshotError
+from test_equivalence import get_totals
+
+# Game data written to a snapshot and read back gives the same map and the same totals
+
+MAPS = [NODE_DATA, TEST_DATA, make_node_data(300, seed=3, cross_region_edges=40)]
+
+def describe_nodes(frontier_nav):
+    return [(key, slot.node.name, slot.node.prod_rank, slot.node.rev_rank, slot.node.combat_rank, slot.node.sightseeing,
+             slot.node.prec_resources, [node.index for node in slot.node.get_adjacent_nodes()])
+            for key, slot in zip(frontier_nav.slot_keys, frontier_nav.slot_table)]
+
+class SnapshotTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.file_name = os.path.join(self.directory, "map.snapshot")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_round_trip(self):
+        for node_data in MAPS:
+            write_snapshot(FrontierNav.load_game_data(node_data), self.file_name)
+            original = FrontierNav(FrontierNav.load_game_data(node_data))
+            loaded = FrontierNav(load_snapshot(self.file_name))
+
+            self.assertEqual(describe_nodes(loaded), describe_nodes(original))
+            self.assertEqual([(probe.name, probe.probe_type, probe.gen, probe.cost) for probe in loaded.probe_index],
+                             [(probe.name, probe.probe_type, probe.gen, probe.cost) for probe in original.probe_index])
+
+            rng = random.Random(0)
+            for i in range(20):
+                setup = random_loadout(original, rng)
+                original.apply_loadout(setup)
+                loaded.apply_loadout(setup)
+                self.assertEqual(get_totals(loaded.calculate_total()), get_totals(original.calculate_total()))
+
+    def test_evaluator_from_snapshot(self):
+        try:
+            import numpy as np
+            from batch import BatchEvaluator
+        except ImportError:
+            self.skipTest("numpy is not installed")
+
+        for node_data in MAPS:
+            write_snapshot(FrontierNav.load_game_data(node_data), self.file_name)
+            frontier_nav = FrontierNav(FrontierNav.load_game_data(node_data))
+            expected = BatchEvaluator(frontier_nav)
+            evaluator = BatchEvaluator.from_snapshot(GameDataSnapshot(self.file_name))
+            self.assertEqual(evaluator.keys, expected.keys)
+            self.assertEqual(evaluator.resources, expected.resources)
+
+            rng = random.Random(1)
+            rows = [expected.encode(random_loadout(frontier_nav, rng)) for i in range(50)]
+            results = evaluator.evaluate(rows)
+            for key, values in expected.evaluate(rows).items():
+                self.assertTrue(np.array_equal(results[key], values), key)
+
+    def test_not_a_snapshot(self):
+        with open(self.file_name, "wb") as f:
+            f.write(b"not a snapshot at all")
+        with self.assertRaises(SnapshotError):
+            load_snapshot(self.file_name)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import itertools
+import unittest
+import numpy as np
+from data import NODE_DATA
+from frontiernav import FrontierNav
+from batch import BatchEvaluator
+from sweep import LoadoutSweep
+
+# LoadoutSweep checked against scoring every combination one at a time with calculate_total, with
+# the work split over worker processes
+
+CHOICES = {
+    "Primordia_fn101": ["Probe Slot Locked", "Mining G1 Probe", "Duplicator Probe"],
+    "Primordia_fn102": ["Mining G1 Probe", "Booster G1 Probe", "Research G1 Probe"],
+    "Primordia_fn103": ["Mining G1 Probe", "Booster G2 Probe", "Storage Probe"],
+    "Primordia_fn104": ["Probe Slot Locked", "Mining G1 Probe", "Mining G2 Probe"]
+}
+
+class LoadoutSweepTest(unittest.TestCase):
+
+    def test_sweep_matches_calculate_total(self):
+        frontier_nav = FrontierNav(FrontierNav.load_game_data(NODE_DATA))
+        base = {"Primordia_fn105": "Mining G1 Probe"}
+
+        # Every combination in the sweep's order (the last slot changes fastest), best first
+        expected = []
+        for probe_names in itertools.product(*CHOICES.values()):
+            setup = dict(base)
+            setup.update(zip(CHOICES, probe_names))
+            frontier_nav.apply_loadout({key: "Probe Slot Locked" for key in frontier_nav.slot_keys})
+            frontier_nav.apply_loadout(setup)
+            totals = frontier_nav.calculate_total()
+            expected.append((totals["total miranium"], setup))
+        expected.sort(key=lambda item: -item[0])
+
+        with LoadoutSweep(frontier_nav, workers=2, batch_size=16) as sweep:
+            result = sweep.sweep(CHOICES, "miranium", base, top=5)
+
+        self.assertEqual(result["count"], len(expected))
+        self.assertEqual([best["score"] for best in result["best"]], [score for score, setup in expected[:5]])
+        for best, (score, setup) in zip(result["best"], expected):
+            self.assertEqual(best["totals"]["total miranium"], score)
+            self.assertEqual({key: best["loadout"][key] for key in setup}, setup)
+
+    def test_evaluate_matches_one_process(self):
+        frontier_nav = FrontierNav(FrontierNav.load_game_data(NODE_DATA))
+        evaluator = BatchEvaluator(frontier_nav)
+        rows = np.random.default_rng(0).integers(0, len(evaluator.probes), size=(100, len(evaluator.keys)))
+        expected = evaluator.evaluate(rows)
+        with LoadoutSweep(frontier_nav, workers=2, batch_size=16) as sweep:
+            result = sweep.evaluate(rows)
+        for name in expected:
+            self.assertTrue(np.array_equal(result[name], expected[name]), name)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,8 +2,19 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import json
 import os
+import queue
+import threading
 from frontiernav import FrontierNav
 
+# Totals are recalculated live as probes change. Dropdown changes are collected until none have
+# been made for UPDATE_DELAY_MS, then handed to a worker thread that installs them and runs an
+# incremental calculate_total, so only the changed slots and their neighbourhoods are recalculated
+# and the Tk main loop never waits on it. The worker is the only thread that touches
+# self.frontier_nav after setup; results come back through a queue polled from the main loop.
+UPDATE_DELAY_MS = 150
+RESULT_POLL_MS = 30
+UPGRADE_COUNT = 5               # Best single probe swaps listed in the side panel
+
 class GUI:
     def __init__(self, game_data):
         self.__root = tk.Tk()
@@ -16,24 +27,103 @@ class GUI:
         self.frontier_nav = FrontierNav(processed_game_data)
         self.available_probes = self._get_available_probes()
         self.probe_dropdown_vars = {}
+        self.slot_output_labels = {}    # "Region_nodeid" -> label showing the slot's output
+        self._shown_outputs = [None] * len(self.frontier_nav.slot_table)
+
+        self._pending_changes = {}      # "Region_nodeid" -> probe name, not yet sent to the worker
+        self._gains = None              # Latest FrontierNav.get_marginal_gains from the worker, None until it arrives
+        self._update_job = None
+        self._requests = queue.Queue()
+        self._results = queue.Queue()
+        self._worker = threading.Thread(target=self._run_worker, daemon=True)
+        self._worker.start()
 
         self.setup_ui()
+        self.__root.after(RESULT_POLL_MS, self._poll_results)
+        self.request_update()
         self.run()
 
     def run(self):
         self.__root.mainloop()
 
     def close(self):
+        self._requests.put(None)
         self.__root.destroy()
 
-    def _get_available_probes(self):
-        probe_list = []
+    def _run_worker(self):
+        # Installs queued probe changes and recalculates, skipping straight to the newest changes
+        # when several batches are waiting
+        while True:
+            changes = self._requests.get()
+            if changes is None:
+                return
+            try:
+                while True:
+                    more_changes = self._requests.get_nowait()
+                    if more_changes is None:
+                        return
+                    changes.update(more_changes)
+            except queue.Empty:
+                pass
+
+            # A failed update is reported to the UI thread, which shows it, and the worker keeps going
+            try:
+                self.frontier_nav.apply_loadout(changes)
+                totals = self.frontier_nav.calculate_total()
+                self._results.put(("totals", totals, self.frontier_nav.get_slot_outputs()))
+
+                # The gains table takes far longer than the totals, so it comes afterwards and is given
+                # up as soon as newer changes are waiting (their own gains replace it)
+                gains = self.frontier_nav.get_marginal_gains(cancelled=lambda: not self._requests.empty())
+                if gains is not None:
+                    self._results.put(("gains", gains))
+            except Exception as e:
+                self._results.put(("error", e))
+
+    def _poll_results(self):
+        # Shows the newest totals and the newest gains; gains posted before the newest totals are
+        # for an older loadout and are dropped
+        totals = None
+        gains = None
+        errors = []
+        try:
+            while True:
+                result = self._results.get_nowait()
+                if result[0] == "totals":
+                    totals = result[1:]
+                    gains = None
+                elif result[0] == "gains":
+                    gains = result[1]
+                else:
+                    errors.append(result[1])
+        except queue.Empty:
+            pass
+        if totals is not None:
+            self.show_totals(*totals)
+        if gains is not None:
+            self.show_gains(gains)
+        self.__root.after(RESULT_POLL_MS, self._poll_results)
+        for e in errors:
+            messagebox.showerror("Error", f"Failed to update the totals:\n{e}")
+
+    def queue_probe_change(self, key, probe_name):
+        # Restarts the update delay, so a burst of changes is recalculated once
+        self._pending_changes[key] = probe_name
+        if self._update_job is not None:
+            self.__root.after_cancel(self._update_job)
+        self._update_job = self.__root.after(UPDATE_DELAY_MS, self.request_update)
+
+    def request_update(self):
+        # Sends the pending changes (if any) to the worker right away
+        if self._update_job is not None:
+            self.__root.after_cancel(self._update_job)
+            self._update_job = None
+        changes = self._pending_changes
+        self._pending_changes = {}
+        self._requests.put(changes)
 
-        for probe_type, generations in self.frontier_nav.probes.items():
-            for gen_key, probe in generations.items():
-                probe_list.append(probe.name)
-        
-        return probe_list
+    def _get_available_probes(self):
+        return [probe.name for probe in self.frontier_nav.probe_index.probes]
 
     def setup_ui(self):
         main_container = ttk.Frame(self.__root)
@@ -74,6 +164,11 @@ class GUI:
             probe_dropdown = ttk.Combobox(scrollable_frame, textvariable=probe_var, values=self.available_probes, state="readonly")
             probe_dropdown.grid(row=row, column=1, sticky="w", padx=(0, 10), pady=5)
 
+            # Slot output, filled in by show_totals
+            output_label = ttk.Label(scrollable_frame, text="")
+            output_label.grid(row=row, column=2, sticky="w", pady=5)
+            self.slot_output_labels[f"{region}_{node_id}"] = output_label
+
             # Store the dropdown variable for access
             self.probe_dropdown_vars[f"{region}_{node_id}"] = probe_var
 
@@ -85,20 +180,8 @@ class GUI:
         scrollbar.pack(side="right", fill="y")
 
     def on_probe_changed(self, region, node_id):
-        selected_probe_name = self.probe_dropdown_vars[f"{region}_{node_id}"].get()
-        selected_probe = self._find_probe_by_name(selected_probe_name)
-        probe_slot = self.frontier_nav.slots[region][node_id]
-        if selected_probe:
-            probe_slot.install_probe(selected_probe)
-        else:
-            probe_slot.lock_probe()
-
-    def _find_probe_by_name(self, probe_name):
-        for probe_type, generations in self.frontier_nav.probes.items():
-            for gen_key, probe in generations.items():
-                if probe.name == probe_name:
-                    return probe
-        return None
+        key = f"{region}_{node_id}"
+        self.queue_probe_change(key, self.probe_dropdown_vars[key].get())
 
     def create_side_panel(self, parent):
         side_panel = ttk.Frame(parent)
@@ -124,6 +207,18 @@ class GUI:
         self.cost_warning = ttk.Label(totals_frame, text="(Warning: Excludes Cost of Battle Probes)", font=("Arial", 6))
         self.cost_warning.pack(anchor="w", pady=2)
 
+        upgrades_frame = ttk.LabelFrame(side_panel, text="Best Upgrades", padding="10")
+        upgrades_frame.pack(fill="both", expand=True, pady=(0, 10))
+
+        self.upgrade_axis_var = tk.StringVar(value="Miranium")
+        upgrade_axis_dropdown = ttk.Combobox(upgrades_frame, textvariable=self.upgrade_axis_var,
+                                             values=["Miranium", "Credits", "Storage"], state="readonly")
+        upgrade_axis_dropdown.pack(anchor="w", pady=2)
+        upgrade_axis_dropdown.bind('<<ComboboxSelected>>', lambda event: self.show_upgrades())
+
+        self.upgrades_label = ttk.Label(upgrades_frame, text="", justify="left")
+        self.upgrades_label.pack(anchor="w", pady=2)
+
         calculate_button = ttk.Button(side_panel, text="Calculate Totals", command=self.update_totals)
         calculate_button.pack(pady=(10, 0))
 
@@ -137,7 +232,14 @@ class GUI:
         load_button.pack(side="left", padx=(5, 0), pady=(10, 0))
 
     def update_totals(self):
-        totals = self.frontier_nav.calculate_total()
+        self.request_update()
+
+    def show_totals(self, totals, slot_outputs):
+        # Only the labels of slots whose output changed are redrawn
+        for i, (key, output) in enumerate(zip(self.frontier_nav.slot_keys, slot_outputs)):
+            if output != self._shown_outputs[i]:
+                self.slot_output_labels[key].config(text=self._format_slot_output(output))
+        self._shown_outputs = slot_outputs
 
         self.miranium_label.config(text=f"Miranium: {totals["total miranium"]}")
         self.credits_label.config(text=f"Credits: {totals["total credits"]}")
@@ -153,14 +255,47 @@ class GUI:
 
         self.cost_label.config(text=f"Cost: {totals["total cost"]}")
 
+        # The upgrades shown were for the old loadout, until its gains arrive
+        self._gains = None
+        self.show_upgrades()
+
+    def show_gains(self, gains):
+        self._gains = gains
+        self.show_upgrades()
+
+    def show_upgrades(self):
+        # Lists the single probe swaps that would raise the chosen total the most
+        if self._gains is None:
+            self.upgrades_label.config(text="Calculating...")
+            return
+        axis = self.upgrade_axis_var.get().lower()
+        upgrades = sorted((gain for gain in self._gains if gain[axis] > 0), key=lambda gain: (-gain[axis], gain["cost"]))
+
+        lines = []
+        for gain in upgrades[:UPGRADE_COUNT]:
+            site_name = self.frontier_nav.slot_lookup[gain["slot"]].node.name
+            lines.append(f"{site_name}: {gain['probe']}\n     +{gain[axis]} {axis}, {gain['cost']:+} cost")
+        self.upgrades_label.config(text="\n".join(lines) if lines else "None")
+
+    def _format_slot_output(self, output):
+        if output is None:
+            return ""
+        miranium, credits, storage, prec_resources, cost = output
+        parts = []
+        if miranium:
+            parts.append(f"Miranium: {miranium}")
+        if credits:
+            parts.append(f"Credits: {credits}")
+        if storage:
+            parts.append(f"Storage: {storage}")
+        return "  ".join(parts)
+
     def install_basic_probes(self):
         basic_probe = self.frontier_nav.probes["basic"][0]
 
-        for region in self.frontier_nav.nodes.keys():
-            for node_id, node in self.frontier_nav.nodes[region].items():
-                node.probe_slot.install_probe(basic_probe)
-                probe_var = self.probe_dropdown_vars[f"{region}_{node_id}"]
-                probe_var.set(basic_probe.name)
+        for key, probe_var in self.probe_dropdown_vars.items():
+            probe_var.set(basic_probe.name)
+            self._pending_changes[key] = basic_probe.name
         
         self.update_totals()
 
@@ -198,16 +333,17 @@ class GUI:
             with open(filename, "r") as f:
                 setup = json.load(f)
 
+            # Checked before anything is changed, so a bad file leaves the current setup alone
+            if not isinstance(setup, dict):
+                raise ValueError("Expected an object of \"Region_nodeid\": probe name")
+            for key, probe_name in setup.items():
+                if not isinstance(probe_name, str) or probe_name not in self.available_probes:
+                    raise ValueError(f"Unknown probe for {key}: {json.dumps(probe_name)}")
+
             for key, probe_name in setup.items():
                 if key in self.probe_dropdown_vars:
                     self.probe_dropdown_vars[key].set(probe_name)
-                    region, node_id = key.split("_", 1)
-                    selected_probe = self._find_probe_by_name(probe_name)
-                    probe_slot = self.frontier_nav.slots[region][node_id]
-                    if selected_probe:
-                        probe_slot.install_probe(selected_probe)
-                    else:
-                        probe_slot.lock_probe()
+                    self._pending_changes[key] = probe_name
             self.update_totals()
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load probe setup:\n{e}")